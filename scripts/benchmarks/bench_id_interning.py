@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+bench_id_interning.py
+
+Compares the set-of-strings distinct counting used before with the
+interned integer path (id_interning) on the cached EmpiRE corpus.
+Both paths must return identical per-paper and global numbers; the script
+reports wall time, peak traced memory and the memory retained by the
+global distinct-ID state (what stays alive once bundles are released).
+
+Usage:
+    python benchmarks/bench_id_interning.py
+    python benchmarks/bench_id_interning.py --cache_dir ./orkg-cache
+    python benchmarks/bench_id_interning.py --results ./nlp4re_results.csv --repeat 20
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import numpy as np  # noqa: E402
+
+from id_interning import DistinctIds, IdInterner, per_paper_distinct  # noqa: E402
+
+ID_COLUMNS = ("resource_ids", "literal_ids", "predicate_ids")
+
+
+def load_from_results(path):
+    """Per-paper ID lists from a results CSV."""
+    csv.field_size_limit(sys.maxsize)
+    with open(path, newline="") as f:
+        return [tuple(json.loads(row[column]) for column in ID_COLUMNS) for row in csv.DictReader(f)]
+
+
+def load_from_cache(cache_dir):
+    """Per-paper ID lists from a directory of cached bundles."""
+    papers = []
+    for item in os.scandir(cache_dir):
+        if not item.name.endswith(".json"):
+            continue
+        with open(item.path) as f:
+            statements = json.load(f)["statements"]
+        if isinstance(statements, dict):
+            statements = statements["statements"]
+        res_ids, lit_ids, pred_ids = [], [], []
+        for stmt in statements:
+            for node in (stmt["subject"], stmt["object"]):
+                (res_ids if node["_class"] == "resource" else lit_ids).append(node["id"])
+            pred_ids.append(stmt["predicate"]["id"])
+        papers.append((res_ids, lit_ids, pred_ids))
+    return papers
+
+
+def count_with_sets(papers):
+    per_paper = []
+    globals_ = [set(), set(), set()]
+    for ids in papers:
+        per_paper.append(tuple(len(set(column)) for column in ids))
+        for acc, column in zip(globals_, ids):
+            acc.update(column)
+    retained = sum(sys.getsizeof(acc) + sum(sys.getsizeof(item) for item in acc) for acc in globals_)
+    return (per_paper, tuple(len(acc) for acc in globals_)), retained
+
+
+def count_with_interning(papers):
+    interner = IdInterner()
+    globals_ = [DistinctIds(interner), DistinctIds(interner), DistinctIds(interner)]
+    per_column = []
+    for position, acc in enumerate(globals_):
+        columns = [ids[position] for ids in papers]
+        for column in columns:
+            acc.update(column)
+        offsets = np.concatenate(([0], np.cumsum([len(column) for column in columns])))
+        codes = interner.encode([item for column in columns for item in column])
+        per_column.append(per_paper_distinct(codes, offsets))
+    per_paper = [tuple(int(counts[i]) for counts in per_column) for i in range(len(papers))]
+    retained = sum(acc.codes().nbytes for acc in globals_)
+    return (per_paper, tuple(len(acc) for acc in globals_)), retained
+
+
+def measure(fn, papers):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result, retained = fn(papers)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark interned ID counting against Python sets")
+    parser.add_argument("--cache_dir", help="Read bundles from a JSON cache directory")
+    parser.add_argument(
+        "--results",
+        default=os.path.join(SCRIPTS_DIR, "daily_results_incremental.csv"),
+        help="Read ID lists from a results CSV (default: the EmpiRE results)",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Replicate the corpus N times")
+    args = parser.parse_args()
+
+    papers = load_from_cache(args.cache_dir) if args.cache_dir else load_from_results(args.results)
+    papers = papers * args.repeat
+    occurrences = sum(len(column) for ids in papers for column in ids)
+    print(f"Corpus: {len(papers)} papers, {occurrences:,} ID occurrences")
+
+    set_result, set_time, set_peak, set_kept = measure(count_with_sets, papers)
+    int_result, int_time, int_peak, int_kept = measure(count_with_interning, papers)
+
+    if set_result != int_result:
+        print("❌ Interned counts differ from set-based counts")
+        return 1
+
+    res, lit, pred = int_result[1]
+    print(f"Global distinct: resources={res:,} literals={lit:,} predicates={pred:,} (identical)")
+    print(f"{'method':<12}{'time (s)':>12}{'peak (MiB)':>14}{'retained (KiB)':>18}")
+    for name, elapsed, peak, kept in (
+        ("sets", set_time, set_peak, set_kept),
+        ("interned", int_time, int_peak, int_kept),
+    ):
+        print(f"{name:<12}{elapsed:>12.3f}{peak / 2**20:>14.2f}{kept / 1024:>18.1f}")
+    print(
+        f"Interned vs sets: {set_time / int_time:.2f}x speed, "
+        f"{set_kept / max(int_kept, 1):.1f}x smaller retained distinct-ID state"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
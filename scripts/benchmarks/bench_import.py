@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+bench_import.py
+
+Startup cost of orkg-statistics.py, measured with `python -X importtime`.
+Runs `orkg-statistics.py --help` in fresh interpreters and reports the
+wall time, the import time the script adds on top of a bare interpreter,
+and the most expensive imports. Heavy dependencies (pandas, NumPy,
+firebase_admin, requests, ...) are loaded on first use, so none of them
+may show up here; --check turns that and a time budget into a regression
+check (exit status 1).
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 10 --top 15
+    python benchmarks/bench_import.py --check --max_ms 150
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(SCRIPTS_DIR, "orkg-statistics.py")
+
+# Modules that must only be imported once a run actually needs them
+HEAVY_MODULES = ("pandas", "numpy", "firebase_admin", "google.cloud.firestore", "requests", "httpx", "orkg")
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us, depth)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def top_level_us(modules):
+    return sum(cumulative for _, cumulative, depth in modules.values() if depth == 0)
+
+
+def run(args):
+    """Run a fresh interpreter with -X importtime; return (wall_s, modules)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        cwd=SCRIPTS_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup cost of orkg-statistics.py")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="Number of most expensive imports to list")
+    parser.add_argument("--check", action="store_true", help="Exit with 1 on heavy imports or a blown time budget")
+    parser.add_argument("--max_ms", type=float, default=200.0, help="Import-time budget of the script for --check")
+    args = parser.parse_args()
+
+    baseline = [run(["-c", "pass"]) for _ in range(args.repeat)]
+    script = [run([SCRIPT, "--help"]) for _ in range(args.repeat)]
+
+    baseline_ms = statistics.median(top_level_us(modules) for _, modules in baseline) / 1000
+    script_ms = statistics.median(top_level_us(modules) for _, modules in script) / 1000
+    wall_ms = statistics.median(wall for wall, _ in script) * 1000
+    added_ms = max(0.0, script_ms - baseline_ms)
+
+    modules = script[-1][1]
+    print(f"⏱️  orkg-statistics.py --help: {wall_ms:.0f} ms wall, {added_ms:.1f} ms of imports "
+          f"on top of the interpreter's {baseline_ms:.1f} ms")
+    print(f"\n{'module':<40}{'cumulative (ms)':>16}")
+    interpreter = set(baseline[-1][1])
+    own = [(name, cumulative) for name, (_, cumulative, depth) in modules.items() if depth == 0 and name not in interpreter]
+    for name, cumulative in sorted(own, key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<40}{cumulative / 1000:>16.1f}")
+
+    heavy = [name for name in HEAVY_MODULES if name in modules]
+    if heavy:
+        print(f"\n⚠️  Heavy modules imported at startup: {', '.join(heavy)}")
+    if args.check:
+        if heavy or added_ms > args.max_ms:
+            print(f"❌ Startup regression (budget {args.max_ms:.0f} ms)")
+            return 1
+        print(f"✅ Startup within budget ({args.max_ms:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+bench_pipeline.py
+
+End-to-end benchmark of orkg-statistics.py against the local stand-in
+server (fake_orkg_server.py), so runs are repeatable and never touch the
+live ORKG. For every template it runs these scenarios in a scratch
+directory, each in its own process:
+- cold:        empty bundle cache, every bundle is fetched
+- warm:        cache populated by the cold run
+- incremental: --incremental on an unchanged corpus (after one priming run)
+- revalidate:  --refresh_older_than 0, revalidating every cached bundle with
+               conditional requests (answered 304 by the server)
+- reload:      --reload_data, refetching every bundle over a warm cache
+
+Each scenario reports wall time, bundle requests/s, peak RSS of the
+process (VmHWM) and the per-stage timers of the script's own run report
+(--metrics_json, see run_metrics.py).
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --templates nlp4re --scenarios cold warm --workers 4
+    python benchmarks/bench_pipeline.py --latency_ms 40 --jitter_ms 20 --error_rate 0.02 --json report.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+from fake_orkg_server import FakeOrkgServer, fixture_path, load_fixture, load_template_configs, record_fixture  # noqa: E402
+
+SCENARIOS = ("cold", "warm", "incremental", "revalidate", "reload")
+# Extra arguments per scenario; incremental is primed by one unmeasured run
+SCENARIO_ARGS = {
+    "cold": [],
+    "warm": [],
+    "incremental": ["--incremental"],
+    "revalidate": ["--refresh_older_than", "0"],
+    "reload": ["--reload_data"],
+}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Harness
+# ──────────────────────────────────────────────────────────────────────────────
+def run_scenario(server, script_args, workdir, log):
+    """Run one orkg-statistics process and return its measurements."""
+    report_path = os.path.join(workdir, "metrics.json")
+    env = dict(os.environ, ORKG_HOST=server.url, ORKG_SPARQL_ENDPOINT=server.sparql_url)
+    before = server.snapshot()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPTS_DIR, "orkg-statistics.py")] + script_args + ["--metrics_json", report_path],
+        cwd=workdir,
+        env=env,
+        stdout=log,
+        stderr=log,
+    )
+    proc.wait()
+    wall = time.perf_counter() - start
+    after = server.snapshot()
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"orkg-statistics.py exited with {proc.returncode}, see {log.name}")
+    with open(report_path) as f:
+        report = json.load(f)
+    stages = {name: timer["seconds"] for name, timer in report["timers"].items()}
+    fetch = report["histograms"].get("bundle_fetch")
+    if fetch:
+        # Summed over requests, so it can exceed wall time with several workers
+        stages["bundle_fetch"] = fetch["sum"]
+    bundles = after["bundle"] - before["bundle"]
+    return {
+        "wall_s": wall,
+        "bundle_requests": bundles,
+        "errors": after["errors"] - before["errors"],
+        "not_modified": after["not_modified"] - before["not_modified"],
+        "requests_per_s": bundles / wall if wall > 0 else 0.0,
+        "peak_rss_mib": report["gauges"].get("peak_rss_mib", 0.0),
+        "stages_s": stages,
+        "counters": report["counters"],
+    }
+
+
+def bench_template(template, config, args):
+    path = fixture_path(template)
+    if args.record or not os.path.exists(path):
+        record_fixture(template, config)
+    server = FakeOrkgServer(
+        load_fixture(path),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    ).start()
+
+    workdir = tempfile.mkdtemp(prefix=f"orkg-bench-{template}-")
+    base_args = [
+        "--template", template,
+        "--no_firebase",
+        "--workers", str(args.workers),
+        "--cache_backend", args.cache_backend,
+        "--cache_dir", os.path.join(workdir, "cache"),
+        "--output_csv", os.path.join(workdir, "results.csv"),
+    ]
+    results = {}
+    try:
+        with open(os.path.join(workdir, "run.log"), "w") as log:
+            # Scenarios build on each other's cache, so cold always runs first
+            for scenario in SCENARIOS:
+                script_args = base_args + SCENARIO_ARGS[scenario]
+                if scenario == "incremental" and scenario in args.scenarios:
+                    run_scenario(server, script_args, workdir, log)
+                measured = run_scenario(server, script_args, workdir, log)
+                if scenario in args.scenarios:
+                    results[scenario] = measured
+                    print_row(template, scenario, measured)
+    finally:
+        server.stop()
+        if args.keep:
+            print(f"   scratch directory kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {"papers": len(server.bundles), "scenarios": results}
+
+
+def print_row(template, scenario, m):
+    stages = ", ".join(f"{name}={seconds:.2f}" for name, seconds in m["stages_s"].items())
+    print(
+        f"{template:<10}{scenario:<13}{m['wall_s']:>9.2f}{m['bundle_requests']:>10}"
+        f"{m['requests_per_s']:>10.1f}{m['peak_rss_mib']:>10.1f}   {stages}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orkg-statistics.py against a local stand-in ORKG")
+    parser.add_argument("--templates", nargs="+", help="Templates to benchmark (default: all)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--workers", type=int, default=1, help="--workers passed to orkg-statistics.py")
+    parser.add_argument("--cache_backend", default="json", help="--cache_backend passed to orkg-statistics.py")
+    parser.add_argument("--latency_ms", type=float, default=0.0, help="Server latency per request")
+    parser.add_argument("--jitter_ms", type=float, default=0.0, help="Additional random latency per request")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency jitter and injected errors")
+    parser.add_argument("--record", action="store_true", help="Re-record fixtures before benchmarking")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directories (cache, CSV, log)")
+    parser.add_argument("--json", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    configs = load_template_configs()
+    templates = args.templates or list(configs)
+    unknown = [t for t in templates if t not in configs]
+    if unknown:
+        parser.error(f"Unknown template(s): {', '.join(unknown)}. Available: {', '.join(configs)}")
+
+    print(f"{'template':<10}{'scenario':<13}{'wall (s)':>9}{'requests':>10}{'req/s':>10}{'RSS (MiB)':>10}   stages (s)")
+    report = {
+        "settings": {
+            key: getattr(args, key)
+            for key in ("workers", "cache_backend", "latency_ms", "jitter_ms", "error_rate", "seed")
+        },
+        "templates": {template: bench_template(template, configs[template], args) for template in templates},
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
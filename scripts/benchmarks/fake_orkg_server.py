@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+fake_orkg_server.py
+
+Local stand-in for the ORKG endpoints used by orkg-statistics.py, serving a
+recorded fixture instead of the live graph:
+- GET /api/statements/<id>/bundle/  the recorded statements bundle (404 if unknown)
+- GET /triplestore                  SPARQL JSON results listing the fixture papers
+                                    (per template when serving several), paged
+                                    like the queries of sparql_listing.py; the
+                                    aggregate queries of sparql_pushdown.py and
+                                    the batch queries of sparql_bundles.py are
+                                    answered from the fixture bundles
+
+SPARQL literals are served with their ORKG id as value by default, which
+keeps distinct literals distinct; --literal_labels serves their labels
+instead, which, like values in the real triplestore, are not unique ids.
+
+Responses carry an ETag, and a matching If-None-Match is answered with
+304 Not Modified (disable with --no_etag to exercise the body-digest
+fallback). Latency (fixed + uniform jitter) and a rate of 503 responses
+can be injected to exercise the scheduler and retry policy.
+
+A fixture is a gzipped JSON file {"template": ..., "papers": {id: statements}}.
+`record` builds one per template from the bundle cache; papers missing from
+the cache are rebuilt from the ID lists in the template's results CSV, so a
+fixture can be produced without ever having fetched from ORKG. Rebuilt
+bundles yield the same per-paper and global statistics as the originals.
+
+Usage:
+    python benchmarks/fake_orkg_server.py record --template empire
+    python benchmarks/fake_orkg_server.py serve --template nlp4re --port 8765 --latency_ms 50
+    python benchmarks/fake_orkg_server.py serve --template empire nlp4re
+    python benchmarks/fake_orkg_server.py serve --template empire --literal_labels
+    ORKG_HOST=http://127.0.0.1:8765/ ORKG_SPARQL_ENDPOINT=http://127.0.0.1:8765/triplestore \\
+        python orkg-statistics.py --template nlp4re --no_firebase --cache_dir /tmp/cache
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from bundle_cache import open_cache  # noqa: E402
+from cache_policy import paper_cache_keys  # noqa: E402
+from sparql_listing import split_prologue  # noqa: E402
+
+SPARQL_PATH = "/triplestore"
+RESOURCE_IRI = "http://orkg.org/orkg/resource/"
+_BUNDLE_PATH = re.compile(r"^/api/statements/([^/]+)/bundle/?$")
+# Keyset and limit of a paged listing query (see sparql_listing.paged_query)
+_AFTER = re.compile(r'FILTER\(STR\(\?paper\) > "((?:[^"\\]|\\.)*)"\)')
+_LIMIT = re.compile(r"\bLIMIT (\d+)\s*$")
+_PUSHDOWN = re.compile(r"^# orkg-statistics pushdown: (.+)$", re.MULTILINE)
+_BATCH = "# orkg-statistics batch: bundles"
+# IRI namespace of each node class (literals are answered with their id or label as value)
+_NODE_IRI = {
+    "resource": RESOURCE_IRI,
+    "predicate": "http://orkg.org/orkg/predicate/",
+    "class": "http://orkg.org/orkg/class/",
+}
+_VALUES_IRI = re.compile(r"<" + re.escape(RESOURCE_IRI) + r"([^>]+)>")
+
+
+def load_template_configs():
+    """TEMPLATE_CONFIGS from orkg-statistics.py (the file name is not importable as-is)."""
+    spec = importlib.util.spec_from_file_location("orkg_statistics", os.path.join(SCRIPTS_DIR, "orkg-statistics.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.TEMPLATE_CONFIGS
+
+
+def fixture_path(template: str) -> str:
+    return os.path.join(FIXTURES_DIR, f"{template}.json.gz")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fixtures
+# ──────────────────────────────────────────────────────────────────────────────
+def _node(node_id, klass, index):
+    return {"id": node_id, "label": f"{klass} {index}", "_class": klass}
+
+
+def rebuild_statements(paper_id, res_ids, lit_ids, pred_ids):
+    """Recreate a bundle whose analysis yields exactly these ID lists.
+
+    Subjects and objects are taken pairwise from the resource IDs followed
+    by the literal IDs, which preserves the order of both lists.
+    """
+    nodes = [(item, "resource") for item in res_ids] + [(item, "literal") for item in lit_ids]
+    statements = []
+    for i, predicate in enumerate(pred_ids):
+        (s_id, s_class), (o_id, o_class) = nodes[2 * i], nodes[2 * i + 1]
+        statements.append({
+            "id": f"S{paper_id[1:]}_{i}",
+            "subject": _node(s_id, s_class, i),
+            "predicate": {"id": predicate, "label": f"predicate {predicate}", "_class": "predicate"},
+            "object": _node(o_id, o_class, i),
+            "created_at": "2024-01-01T00:00:00Z",
+            "created_by": "00000000-0000-0000-0000-000000000000",
+        })
+    return statements
+
+
+def _cached_statements(cache, paper_id):
+    for key in paper_cache_keys(paper_id):
+        entry = cache.get(key)
+        if entry:
+            statements = entry["statements"]
+            if isinstance(statements, dict) and "statements" in statements:
+                statements = statements["statements"]
+            return statements
+    return None
+
+
+def record_fixture(template, config, cache_backend="json", output=None):
+    """Write the fixture for a template and return its path."""
+    csv.field_size_limit(sys.maxsize)
+    results_csv = os.path.join(SCRIPTS_DIR, config["output_csv"])
+    cache_dir = os.path.join(SCRIPTS_DIR, config["cache_dir"])
+    # Do not let the JSON backend create an empty cache directory
+    cache_exists = os.path.exists(cache_dir if cache_backend == "json" else cache_dir.rstrip("/\\") + ".sqlite")
+    cache = open_cache(cache_backend, cache_dir) if cache_exists else None
+
+    papers, from_cache = {}, 0
+    try:
+        with open(results_csv, newline="") as f:
+            for row in csv.DictReader(f):
+                paper_id = row["paper_id"]
+                if paper_id in papers:
+                    continue
+                statements = _cached_statements(cache, paper_id) if cache else None
+                if statements is not None:
+                    from_cache += 1
+                else:
+                    statements = rebuild_statements(
+                        paper_id,
+                        json.loads(row["resource_ids"]),
+                        json.loads(row["literal_ids"]),
+                        json.loads(row["predicate_ids"]),
+                    )
+                papers[paper_id] = statements
+    finally:
+        if cache:
+            cache.close()
+
+    path = output or fixture_path(template)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"template": template, "papers": papers}, f, separators=(",", ":"))
+    print(f"📼 Recorded {len(papers)} papers for {template} ({from_cache} from cache, "
+          f"{len(papers) - from_cache} rebuilt from {os.path.basename(results_csv)}) → {path}")
+    return path
+
+
+def load_fixture(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)["papers"]
+
+
+def load_fixtures(templates, configs, path=None, record=False):
+    """Load (recording if needed) the fixtures of several templates.
+
+    Returns (papers, listings): the union of all bundles, and each template's
+    SPARQL query mapped to its own paper ids.
+    """
+    papers, listings = {}, {}
+    for template in templates:
+        template_path = path or fixture_path(template)
+        if record or not os.path.exists(template_path):
+            template_path = record_fixture(template, configs[template])
+        template_papers = load_fixture(template_path)
+        papers.update(template_papers)
+        listings[configs[template]["sparql_query"]] = list(template_papers)
+    return papers, listings
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Server
+# ──────────────────────────────────────────────────────────────────────────────
+class FakeOrkgServer:
+    """Threaded HTTP server answering bundle and SPARQL requests from a fixture."""
+
+    def __init__(
+        self,
+        papers,
+        host="127.0.0.1",
+        port=0,
+        latency_ms=0.0,
+        jitter_ms=0.0,
+        error_rate=0.0,
+        seed=0,
+        listings=None,
+        etag=True,
+        literal_labels=False,
+    ):
+        """Create the server (call start() to serve in a background thread).
+
+        Args:
+            papers: Mapping paper_id -> statements
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            latency_ms: Fixed delay added to every response
+            jitter_ms: Additional uniformly distributed delay
+            error_rate: Fraction of requests answered with 503
+            seed: Seed for the jitter and error draws
+            listings: Optional mapping SPARQL query -> paper ids, to answer each
+                      template's query with its own papers (default: all papers)
+            etag: Send ETags and answer matching If-None-Match with 304
+            literal_labels: Serve SPARQL literals with their labels as values
+                            instead of their (unique) ids
+        """
+        # Bodies are serialized once so the server is never the bottleneck
+        self.bundles = {
+            paper_id: json.dumps({"root": paper_id, "statements": statements}).encode("utf-8")
+            for paper_id, statements in papers.items()
+        }
+        self.papers = list(papers)
+        self.statements = papers
+        self.literal_labels = literal_labels
+        # Each bundle as the distinct RDF triples the aggregate queries see
+        self.triples = {paper_id: self._triples(statements) for paper_id, statements in papers.items()}
+        self.listings = {split_prologue(query)[1]: list(ids) for query, ids in (listings or {}).items()}
+        self.etag = etag
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {"bundle": 0, "sparql": 0, "errors": 0, "not_found": 0, "not_modified": 0}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this, Nagle's
+            # algorithm and delayed ACKs add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    def _triples(self, statements):
+        return {
+            tuple(
+                (term["type"], term["value"])
+                for term in (self._term(stmt["subject"]), self._predicate(stmt), self._term(stmt["object"]))
+            )
+            for stmt in statements
+        }
+
+    @staticmethod
+    def _is_resource(term):
+        """is_resource() of sparql_pushdown: an IRI in the ORKG resource namespace."""
+        kind, value = term
+        return kind == "uri" and value.startswith(RESOURCE_IRI)
+
+    def _template_papers(self, query):
+        return next((ids for body, ids in self.listings.items() if body in query), self.papers)
+
+    def _aggregate(self, kind, query) -> bytes:
+        """Answer a pushdown query (see sparql_pushdown.py) by evaluating its
+        semantics on the fixture bundles as RDF: DISTINCT triples per paper,
+        nodes classified by term type and namespace, literals compared by value."""
+        def number(value):
+            return {"type": "literal", "datatype": "http://www.w3.org/2001/XMLSchema#integer", "value": str(value)}
+
+        def resources(triples):
+            return sum(self._is_resource(s) + self._is_resource(o) for s, _, o in triples)
+
+        bindings = []
+        if kind == "paper counts":
+            for paper_id in dict.fromkeys(_VALUES_IRI.findall(query)):
+                triples = self.triples.get(paper_id)
+                if triples:
+                    bindings.append({
+                        "paper": {"type": "uri", "value": RESOURCE_IRI + paper_id},
+                        "total": number(len(triples)),
+                        "resources": number(resources(triples)),
+                    })
+        else:
+            paper_ids = [paper_id for paper_id in self._template_papers(query) if paper_id in self.triples]
+            if kind == "template totals":
+                bindings.append({
+                    "total": number(sum(len(self.triples[paper_id]) for paper_id in paper_ids)),
+                    "resources": number(sum(resources(self.triples[paper_id]) for paper_id in paper_ids)),
+                })
+            else:
+                triples = set().union(*(self.triples[paper_id] for paper_id in paper_ids))
+                nodes = {node for s, _, o in triples for node in (s, o)}
+                bindings.append({
+                    "resources": number(sum(map(self._is_resource, nodes))),
+                    "literals": number(sum(not self._is_resource(node) for node in nodes)),
+                    "predicates": number(len({p for _, p, _ in triples})),
+                })
+        return json.dumps({"head": {"vars": []}, "results": {"bindings": bindings}}).encode("utf-8")
+
+    def _term(self, node):
+        namespace = _NODE_IRI.get(node["_class"])
+        if namespace is None:
+            # The literal's id as its value keeps distinct literals distinct; labels need not be
+            return {"type": "literal", "value": node.get("label", "") if self.literal_labels else node["id"]}
+        return {"type": "uri", "value": namespace + node["id"]}
+
+    def _predicate(self, stmt):
+        return self._term({**stmt["predicate"], "_class": "predicate"})
+
+    def _batch(self, query) -> bytes:
+        """Answer a batched bundle query (see sparql_bundles.py) from the fixture bundles."""
+        bindings = []
+        for paper_id in dict.fromkeys(_VALUES_IRI.findall(query)):
+            paper = {"type": "uri", "value": RESOURCE_IRI + paper_id}
+            for stmt in self.statements.get(paper_id, ()):
+                bindings.append({
+                    "paper": paper,
+                    "s": self._term(stmt["subject"]),
+                    "p": self._predicate(stmt),
+                    "o": self._term(stmt["object"]),
+                })
+        return json.dumps({"head": {"vars": ["paper", "s", "p", "o"]}, "results": {"bindings": bindings}}).encode("utf-8")
+
+    def _listing(self, query) -> bytes:
+        """Answer a listing query: the template's papers (all papers for an
+        unknown query), one page of them for a paged query."""
+        paper_ids = self._template_papers(query)
+        iris = [RESOURCE_IRI + paper_id for paper_id in paper_ids]
+        if "ORDER BY" in query:
+            iris.sort()
+        after = _AFTER.search(query)
+        if after:
+            cursor = re.sub(r"\\(.)", r"\1", after.group(1))
+            iris = [iri for iri in iris if iri > cursor]
+        limit = _LIMIT.search(query)
+        if limit:
+            iris = iris[:int(limit.group(1))]
+        return json.dumps({
+            "head": {"vars": ["paper"]},
+            "results": {"bindings": [{"paper": {"type": "uri", "value": iri}} for iri in iris]},
+        }).encode("utf-8")
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def sparql_url(self) -> str:
+        return self.url.rstrip("/") + SPARQL_PATH
+
+    def _draw(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        return delay, fail
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def handle(self, request):
+        url = urlsplit(request.path)
+        path = url.path
+        match = _BUNDLE_PATH.match(path)
+        if match:
+            kind, body = "bundle", self.bundles.get(match.group(1))
+            content_type = "application/json"
+        elif path == SPARQL_PATH:
+            query = parse_qs(url.query).get("query", [""])[0].strip()
+            pushdown = _PUSHDOWN.search(query)
+            if pushdown:
+                kind, body = "sparql", self._aggregate(pushdown.group(1), query)
+            elif query.startswith(_BATCH):
+                kind, body = "sparql", self._batch(query)
+            else:
+                kind, body = "sparql", self._listing(query)
+            content_type = "application/sparql-results+json"
+        else:
+            kind, body, content_type = None, None, "application/json"
+
+        delay, fail = self._draw()
+        if delay:
+            time.sleep(delay)
+        if kind:
+            self._count(kind)
+
+        if fail:
+            self._count("errors")
+            status, body = 503, b'{"error":"Service Unavailable"}'
+        elif body is None:
+            self._count("not_found")
+            status, body = 404, b'{"error":"Not Found"}'
+        else:
+            status = 200
+
+        etag = None
+        if status == 200 and self.etag:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if request.headers.get("If-None-Match") == etag:
+                self._count("not_modified")
+                status, body = 304, b""
+
+        request.send_response(status)
+        if etag:
+            request.send_header("ETag", etag)
+        if status != 304:
+            request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in ORKG/SPARQL server for benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="Record a fixture from the bundle cache / results CSV")
+    record.add_argument("--template", "-t", required=True)
+    record.add_argument("--cache_backend", default="json")
+    record.add_argument("--output", help="Fixture path (default: benchmarks/fixtures/<template>.json.gz)")
+
+    serve = sub.add_parser("serve", help="Serve a fixture until interrupted")
+    serve.add_argument("--template", "-t", nargs="+", required=True)
+    serve.add_argument("--fixture", help="Fixture path (single template; default: benchmarks/fixtures/<template>.json.gz)")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency_ms", type=float, default=0.0)
+    serve.add_argument("--jitter_ms", type=float, default=0.0)
+    serve.add_argument("--error_rate", type=float, default=0.0)
+    serve.add_argument("--no_etag", action="store_true", help="Send no ETags (no 304 responses)")
+    serve.add_argument(
+        "--literal_labels",
+        action="store_true",
+        help="Serve SPARQL literals with their labels as values, which are not unique like ids",
+    )
+    args = parser.parse_args()
+
+    configs = load_template_configs()
+    templates = args.template if isinstance(args.template, list) else [args.template]
+    unknown = [template for template in templates if template not in configs]
+    if unknown:
+        parser.error(f"Unknown template(s): {', '.join(unknown)}. Available: {', '.join(configs)}")
+
+    if args.command == "record":
+        record_fixture(args.template, configs[args.template], args.cache_backend, args.output)
+        return 0
+
+    papers, listings = load_fixtures(templates, configs, args.fixture if len(templates) == 1 else None)
+    server = FakeOrkgServer(
+        papers,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        listings=listings,
+        etag=not args.no_etag,
+        literal_labels=args.literal_labels,
+    )
+    print(f"🛰️  Serving {len(server.bundles)} bundles for {', '.join(templates)}")
+    print(f"   ORKG_HOST={server.url}")
+    print(f"   ORKG_SPARQL_ENDPOINT={server.sparql_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
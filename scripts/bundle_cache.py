@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Cache backends for ORKG statement bundles.
+
+Two interchangeable backends are provided:
+- JsonDirCache: the original layout, one sha256-named JSON file per key
+- SQLiteCache: a single SQLite file holding zlib-compressed entries keyed
+  by cache key, with bulk get/put and a one-pass warm-up read
+
+Entries are dictionaries shaped like {"fetched_at": "...", "statements": [...]},
+optionally with the "validators" of the response they came from. Each
+cache carries a schema version stamp; caches written before the stamp
+existed are brought up to date by cache_migration.py.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CACHE_BACKENDS = ("json", "sqlite")
+
+# Version 2: one entry per paper under paper_v2_<id>, shaped like new_entry()
+CACHE_SCHEMA_VERSION = 2
+
+# SQLite limits the number of bound parameters per statement
+_SQLITE_BATCH = 500
+
+
+def parse_fetched_at(value) -> Optional[datetime]:
+    """Parse a stored fetched_at ISO timestamp into an aware datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def new_entry(
+    statements, validators: Optional[Dict[str, str]] = None, source: Optional[str] = None
+) -> Dict[str, Any]:
+    entry = {
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "statements": statements,
+    }
+    if validators:
+        # Response validators for conditional refreshes (see conditional_http)
+        entry["validators"] = validators
+    if source:
+        # Where a bundle came from when not from the REST endpoint (e.g. "sparql")
+        entry["source"] = source
+    return entry
+
+
+class JsonDirCache:
+    """One JSON file per key, named after the sha256 of the key."""
+
+    # Schema stamp next to the entries (not *.json, so it is never taken for one)
+    SCHEMA_FILE = "schema-version"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def location(self) -> str:
+        return self.cache_dir
+
+    def path_for(self, key: str) -> str:
+        h = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{h}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    @staticmethod
+    def _write(path: str, entry: Dict[str, Any]):
+        # Write then rename, so a template sharing the directory never reads a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        self._write(self.path_for(key), entry)
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]):
+        for key, entry in items:
+            self.put(key, entry)
+
+    def delete(self, key: str) -> int:
+        """Delete an entry and return the number of bytes reclaimed."""
+        path = self.path_for(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    def token(self, key: str):
+        """Cheap change marker [mtime_ns, size] of an entry, or None."""
+        try:
+            st = os.stat(self.path_for(key))
+        except FileNotFoundError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    def fetched_at(self, key: str) -> Optional[datetime]:
+        """When an entry was written; the file's mtime avoids parsing the JSON."""
+        try:
+            mtime = os.path.getmtime(self.path_for(key))
+        except FileNotFoundError:
+            return None
+        return datetime.fromtimestamp(mtime, tz=timezone.utc)
+
+    def entry_id(self, key: str) -> str:
+        return self.path_for(key)
+
+    def iter_entries(self) -> Iterator[Tuple[str, datetime, int]]:
+        """Yield (entry_id, fetched_at, size) for every stored entry."""
+        for item in os.scandir(self.cache_dir):
+            if item.is_file() and item.name.endswith(".json"):
+                st = item.stat()
+                yield item.path, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc), st.st_size
+
+    def delete_entry(self, entry_id: str) -> int:
+        try:
+            size = os.path.getsize(entry_id)
+            os.remove(entry_id)
+            return size
+        except FileNotFoundError:
+            return 0
+
+    # ── Schema migration support (see cache_migration.py) ────────────────────
+    def schema_version(self) -> int:
+        """Schema version the cache is stamped with (0 before the first stamp)."""
+        try:
+            with open(os.path.join(self.cache_dir, self.SCHEMA_FILE)) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def set_schema_version(self, version: int):
+        path = os.path.join(self.cache_dir, self.SCHEMA_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f"{version}\n")
+        os.replace(tmp_path, path)
+
+    def known_keys(self) -> Optional[List[str]]:
+        """Stored keys, or None: file names are hashes, so keys cannot be listed."""
+        return None
+
+    def move(self, key: str, new_key: str):
+        """Store an entry under another key, keeping its fetched_at (the file's mtime)."""
+        os.replace(self.path_for(key), self.path_for(new_key))
+
+    def rewrite_entries(self, fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> int:
+        """Replace every entry e for which fn(e) is not None; returns the number replaced.
+
+        Rewritten files keep their mtime, which stands for fetched_at.
+        """
+        rewritten = 0
+        for item in os.scandir(self.cache_dir):
+            if not (item.is_file() and item.name.endswith(".json")):
+                continue
+            st = item.stat()
+            with open(item.path, "r") as f:
+                entry = fn(json.load(f))
+            if entry is None:
+                continue
+            self._write(item.path, entry)
+            os.utime(item.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            rewritten += 1
+        return rewritten
+
+    def warm(self):
+        """Nothing to preload for the file-per-key layout."""
+
+    def close(self):
+        pass
+
+
+class SQLiteCache:
+    """All entries in one SQLite file, compressed with zlib."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bundles ("
+            " key TEXT PRIMARY KEY,"
+            " fetched_at TEXT NOT NULL,"
+            " data BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        # Compressed rows read by warm(), served without touching the database
+        self._warm: Dict[str, Tuple[str, bytes]] = {}
+
+    @property
+    def location(self) -> str:
+        return self.path
+
+    @staticmethod
+    def _encode(entry: Dict[str, Any]) -> bytes:
+        return zlib.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def _decode(data: bytes) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(data).decode("utf-8"))
+
+    def warm(self):
+        """Read every row in one sequential scan and keep the compressed blobs in memory."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, fetched_at, data FROM bundles").fetchall()
+            self._warm = {key: (fetched_at, data) for key, fetched_at, data in rows}
+
+    def _row(self, key: str) -> Optional[Tuple[str, bytes]]:
+        row = self._warm.get(key)
+        if row is not None:
+            return row
+        with self._lock:
+            return self._conn.execute(
+                "SELECT fetched_at, data FROM bundles WHERE key = ?", (key,)
+            ).fetchone()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._row(key)
+        return self._decode(row[1]) if row is not None else None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(keys)
+        found = {key: self._warm[key][1] for key in keys if key in self._warm}
+        missing = [key for key in keys if key not in found]
+        with self._lock:
+            for start in range(0, len(missing), _SQLITE_BATCH):
+                chunk = missing[start:start + _SQLITE_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                for key, data in self._conn.execute(
+                    f"SELECT key, data FROM bundles WHERE key IN ({placeholders})", chunk
+                ):
+                    found[key] = data
+        return {key: self._decode(data) for key, data in found.items()}
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        self.put_many([(key, entry)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]):
+        rows: List[Tuple[str, str, bytes]] = [
+            (key, entry.get("fetched_at", ""), self._encode(entry)) for key, entry in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bundles (key, fetched_at, data) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            for key, fetched_at, data in rows:
+                if key in self._warm:
+                    self._warm[key] = (fetched_at, data)
+
+    def delete(self, key: str) -> int:
+        """Delete an entry and return the number of (compressed) bytes reclaimed."""
+        with self._lock:
+            self._warm.pop(key, None)
+            row = self._conn.execute("SELECT length(data) FROM bundles WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return 0
+            self._conn.execute("DELETE FROM bundles WHERE key = ?", (key,))
+            self._conn.commit()
+            return row[0]
+
+    def token(self, key: str):
+        """Change marker of an entry (its fetched_at timestamp), or None."""
+        row = self._row(key)
+        return row[0] if row is not None else None
+
+    def fetched_at(self, key: str) -> Optional[datetime]:
+        return parse_fetched_at(self.token(key))
+
+    def entry_id(self, key: str) -> str:
+        return key
+
+    def iter_entries(self) -> Iterator[Tuple[str, datetime, int]]:
+        """Yield (entry_id, fetched_at, size) for every stored entry."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, fetched_at, length(data) FROM bundles").fetchall()
+        for key, fetched_at, size in rows:
+            yield key, parse_fetched_at(fetched_at), size
+
+    def delete_entry(self, entry_id: str) -> int:
+        return self.delete(entry_id)
+
+    # ── Schema migration support (see cache_migration.py) ────────────────────
+    def schema_version(self) -> int:
+        """Schema version the cache is stamped with (0 before the first stamp)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'schema_version'").fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def set_schema_version(self, version: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('schema_version', ?)", (str(version),)
+            )
+            self._conn.commit()
+
+    def known_keys(self) -> Optional[List[str]]:
+        with self._lock:
+            return [key for key, in self._conn.execute("SELECT key FROM bundles")]
+
+    def move(self, key: str, new_key: str):
+        """Store an entry under another key, keeping its fetched_at."""
+        with self._lock:
+            self._warm.pop(key, None)
+            self._warm.pop(new_key, None)
+            self._conn.execute("DELETE FROM bundles WHERE key = ?", (new_key,))
+            self._conn.execute("UPDATE bundles SET key = ? WHERE key = ?", (new_key, key))
+            self._conn.commit()
+
+    def rewrite_entries(self, fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> int:
+        """Replace every entry e for which fn(e) is not None; returns the number replaced."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, data FROM bundles").fetchall()
+        updates = []
+        for key, data in rows:
+            entry = fn(self._decode(data))
+            if entry is not None:
+                updates.append((self._encode(entry), key))
+        with self._lock:
+            self._conn.executemany("UPDATE bundles SET data = ? WHERE key = ?", updates)
+            self._conn.commit()
+            self._warm.clear()
+        return len(updates)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_cache(backend: str, cache_dir: str):
+    """Open the cache backend for a template's cache_dir.
+
+    The SQLite store lives next to the directory, e.g. ./orkg-cache.sqlite.
+    """
+    if backend == "json":
+        return JsonDirCache(cache_dir)
+    if backend == "sqlite":
+        return SQLiteCache(cache_dir.rstrip("/\\") + ".sqlite")
+    raise ValueError(f"Unknown cache backend: {backend}. Available: {', '.join(CACHE_BACKENDS)}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+One-time migration of bundle caches to the current schema.
+
+Older runs stored bundles under the bare paper id and nested them as
+{"statements": {"statements": [...]}}, so every lookup probed two keys and
+checked the entry shape. migrate_cache moves every entry to
+paper_v2_<id>, flattens the old shape and stamps the cache with
+CACHE_SCHEMA_VERSION; afterwards lookups probe one key and read
+entry["statements"] directly. Unmigrated caches can still be read with
+--legacy_cache.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+from bundle_cache import CACHE_SCHEMA_VERSION
+from cache_policy import PAPER_KEY_PREFIX, SPARQL_KEY_PREFIX, paper_cache_key, sparql_cache_key
+
+log = logging.getLogger(__name__)
+
+
+class CacheSchemaError(Exception):
+    """Raised when a cache predates CACHE_SCHEMA_VERSION and was not migrated."""
+
+
+def legacy_statements(entry: Dict[str, Any]):
+    """Statements of a cache entry, in either the old or the new entry shape."""
+    if isinstance(entry.get("statements"), dict) and "statements" in entry["statements"]:
+        # Old format: {"fetched_at": "...", "statements": {"statements": [...]}}
+        return entry["statements"]["statements"]
+    # New format: {"statements": [...]}
+    return entry["statements"]
+
+
+def normalize_entry(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return entry in the current shape, or None when it already has it."""
+    if not (isinstance(entry.get("statements"), dict) and "statements" in entry["statements"]):
+        return None
+    return {**entry, "statements": legacy_statements(entry)}
+
+
+def recover_legacy_keys(cache) -> Set[str]:
+    """Bare-id keys of the legacy entries of a JSON cache, found on disk.
+
+    The JSON backend names files by the sha256 of their key, so keys cannot
+    be listed. A bundle's paper is the subject of its own statements: each
+    entry's key is recovered by hashing the subject ids it mentions until
+    one matches its file name. Entries without statements cannot be
+    recovered and are left to orphan eviction.
+    """
+    keys = set()
+    for entry_id, _, _ in cache.iter_entries():
+        try:
+            with open(entry_id, "r") as f:
+                statements = legacy_statements(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            continue
+        seen = set()
+        for stmt in statements:
+            candidate = stmt.get("subject", {}).get("id") if isinstance(stmt, dict) else None
+            if not candidate or candidate in seen:
+                continue
+            seen.add(candidate)
+            if cache.entry_id(candidate) == entry_id:
+                keys.add(candidate)
+                break
+            current = (paper_cache_key(candidate), sparql_cache_key(candidate))
+            if entry_id in {cache.entry_id(key) for key in current}:
+                break  # already under a current key
+    return keys
+
+
+def migrate_cache(cache, paper_ids: Iterable[str] = ()) -> Dict[str, int]:
+    """Bring a cache to CACHE_SCHEMA_VERSION.
+
+    Args:
+        cache: Cache backend (see bundle_cache)
+        paper_ids: Papers whose legacy bare-id entries should be moved, e.g.
+                   from the stored listing or results CSV; legacy keys the
+                   backend cannot list are also recovered from the entries
+                   on disk (see recover_legacy_keys)
+
+    Returns:
+        Counts of entries "moved" to the current key, legacy "duplicates"
+        dropped in favour of a newer current entry, and entries "reshaped"
+    """
+    stats = {"moved": 0, "duplicates": 0, "reshaped": 0}
+    if cache.schema_version() >= CACHE_SCHEMA_VERSION:
+        return stats
+
+    legacy_keys = set(paper_ids)
+    known = cache.known_keys()
+    if known is not None:
+        legacy_keys |= {key for key in known if not key.startswith((PAPER_KEY_PREFIX, SPARQL_KEY_PREFIX))}
+    else:
+        legacy_keys |= recover_legacy_keys(cache)
+
+    for paper_id in sorted(legacy_keys):
+        if cache.token(paper_id) is None:
+            continue
+        key = paper_cache_key(paper_id)
+        legacy_at, current_at = cache.fetched_at(paper_id), cache.fetched_at(key)
+        if cache.token(key) is None or (legacy_at and current_at and legacy_at > current_at):
+            cache.move(paper_id, key)
+            stats["moved"] += 1
+        else:
+            cache.delete(paper_id)
+            stats["duplicates"] += 1
+
+    stats["reshaped"] = cache.rewrite_entries(normalize_entry)
+    cache.set_schema_version(CACHE_SCHEMA_VERSION)
+    log.debug(f"Migrated {cache.location} to schema v{CACHE_SCHEMA_VERSION}: {stats}")
+    return stats
+
+
+def check_schema(cache) -> bool:
+    """Whether cache is at CACHE_SCHEMA_VERSION; a new (empty) cache is stamped right away."""
+    if cache.schema_version() >= CACHE_SCHEMA_VERSION:
+        return True
+    if next(iter(cache.iter_entries()), None) is None:
+        cache.set_schema_version(CACHE_SCHEMA_VERSION)
+        return True
+    return False
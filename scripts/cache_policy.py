@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cache freshness and eviction policy for ORKG statement bundles.
+Decides which cached bundles to refetch in a run (expired entries plus a
+rolling slice of the oldest ones), deletes every entry of papers that left
+the listing, and evicts other orphaned entries by age and size.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+PAPER_KEY_PREFIX = "paper_v2_"
+# Bundles assembled from SPARQL rows (--batch_fetch, see sparql_bundles) carry
+# value-based literal ids, so they live apart from the REST bundles
+SPARQL_KEY_PREFIX = "sparql_v1_"
+
+
+def paper_cache_key(paper_id: str) -> str:
+    """Cache key a paper's bundle is stored under."""
+    return f"{PAPER_KEY_PREFIX}{paper_id}"
+
+
+def sparql_cache_key(paper_id: str) -> str:
+    """Cache key a paper's SPARQL-built bundle is stored under."""
+    return f"{SPARQL_KEY_PREFIX}{paper_id}"
+
+
+def paper_cache_keys(paper_id: str) -> List[str]:
+    """Cache keys a paper may be stored under (current and legacy layout)."""
+    return [paper_cache_key(paper_id), paper_id]
+
+
+def all_cache_keys(paper_id: str) -> List[str]:
+    """Keys of every entry a paper may have, including its SPARQL-built bundle."""
+    return paper_cache_keys(paper_id) + [sparql_cache_key(paper_id)]
+
+
+class CachePolicy:
+    def __init__(
+        self,
+        cache,
+        max_age_days: Optional[float] = None,
+        refresh_slice: int = 0,
+        evict_orphans_after_days: Optional[float] = None,
+        max_cache_bytes: Optional[int] = None,
+        legacy_keys: bool = False,
+        sparql_bundles: bool = False,
+    ):
+        """Create a policy for one cache backend.
+
+        Args:
+            cache: Cache backend (see bundle_cache)
+            max_age_days: Entries older than this are refetched (None = never expire)
+            refresh_slice: Number of the oldest non-expired entries revalidated per run
+            evict_orphans_after_days: Orphaned entries older than this are deleted
+            max_cache_bytes: Orphaned entries are deleted oldest-first while the
+                             cache is larger than this
+            legacy_keys: Also look entries up under the legacy bare-id key
+                         (for caches that were not migrated, see cache_migration)
+            sparql_bundles: Look entries up under the SPARQL-built bundle key
+                            instead of the REST one (for --batch_fetch runs)
+        """
+        self.cache = cache
+        self.max_age = timedelta(days=max_age_days) if max_age_days is not None else None
+        self.refresh_slice = max(0, int(refresh_slice or 0))
+        self.evict_orphans_after = (
+            timedelta(days=evict_orphans_after_days) if evict_orphans_after_days is not None else None
+        )
+        self.max_cache_bytes = max_cache_bytes
+        self.legacy_keys = legacy_keys
+        self.sparql_bundles = sparql_bundles
+
+    def lookup_keys(self, paper_id: str) -> List[str]:
+        """Keys to probe for a paper's entry, in order."""
+        if self.sparql_bundles:
+            return [sparql_cache_key(paper_id)]
+        return paper_cache_keys(paper_id) if self.legacy_keys else [paper_cache_key(paper_id)]
+
+    def fetched_at(self, paper_id: str) -> Optional[datetime]:
+        for key in self.lookup_keys(paper_id):
+            fetched_at = self.cache.fetched_at(key)
+            if fetched_at is not None:
+                return fetched_at
+        return None
+
+    def plan_refresh(self, papers: Iterable[str], now: Optional[datetime] = None) -> Set[str]:
+        """Return the ids of cached papers that should be refetched in this run.
+
+        Missing entries are not included; they are fetched anyway.
+        """
+        now = now or datetime.now(timezone.utc)
+        expired = set()
+        candidates = []
+        for paper_id in dict.fromkeys(papers):
+            fetched_at = self.fetched_at(paper_id)
+            if fetched_at is None:
+                continue
+            if self.max_age is not None and now - fetched_at > self.max_age:
+                expired.add(paper_id)
+            else:
+                candidates.append((fetched_at, paper_id))
+
+        candidates.sort()
+        rolling = {paper_id for _, paper_id in candidates[:self.refresh_slice]}
+        if expired or rolling:
+            log.info(f"🔄 Refreshing {len(expired)} expired and {len(rolling)} oldest cached bundles")
+        return expired | rolling
+
+    def delete_papers(self, paper_ids: Iterable[str], keep: Iterable[str] = ()) -> Tuple[int, int]:
+        """Delete the entries of papers under every key version (and their
+        SPARQL-built bundles).
+
+        Args:
+            paper_ids: Papers that are gone
+            keep: Papers whose entries must stay (e.g. still used by another
+                  template of a shared cache)
+
+        Returns:
+            (entries deleted, bytes reclaimed)
+        """
+        keep = set(keep)
+        deleted = 0
+        reclaimed = 0
+        for paper_id in paper_ids:
+            if paper_id in keep:
+                continue
+            for key in all_cache_keys(paper_id):
+                size = self.cache.delete(key)
+                if size:
+                    deleted += 1
+                    reclaimed += size
+        return deleted, reclaimed
+
+    def evict_orphans(self, papers: Iterable[str], now: Optional[datetime] = None) -> int:
+        """Delete entries that belong to none of the given papers.
+
+        Orphans older than evict_orphans_after are removed; if the cache is
+        still larger than max_cache_bytes, further orphans are removed
+        oldest-first. Returns the number of bytes reclaimed.
+        """
+        if self.evict_orphans_after is None and self.max_cache_bytes is None:
+            return 0
+
+        now = now or datetime.now(timezone.utc)
+        live = {self.cache.entry_id(key) for paper_id in papers for key in all_cache_keys(paper_id)}
+        total_bytes = 0
+        orphans = []
+        for entry_id, fetched_at, size in self.cache.iter_entries():
+            total_bytes += size
+            if entry_id not in live:
+                orphans.append((fetched_at or datetime.min.replace(tzinfo=timezone.utc), entry_id, size))
+        orphans.sort()
+
+        reclaimed = 0
+        evicted = 0
+        for fetched_at, entry_id, size in orphans:
+            too_old = self.evict_orphans_after is not None and now - fetched_at > self.evict_orphans_after
+            too_big = self.max_cache_bytes is not None and total_bytes - reclaimed > self.max_cache_bytes
+            if not (too_old or too_big):
+                continue
+            reclaimed += self.cache.delete_entry(entry_id)
+            evicted += 1
+
+        if evicted:
+            log.info(f"🧹 Evicted {evicted} orphaned cache entries ({reclaimed / 1024:.1f} KiB)")
+        return reclaimed
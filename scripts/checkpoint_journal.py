@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Crash-safe checkpoint journal for the ORKG statistics scripts.
+
+Results are only written once every paper is processed, so a run that is
+killed (e.g. by the workflow timeout) used to lose all of its work. While
+a template is processed, every completed paper's row (metrics and ID
+lists) is appended to <output base>.journal.jsonl; rows are flushed and
+fsync'd in batches, so at most one batch is lost. --resume replays the
+journal and only processes the remaining papers. The journal is removed
+once the results are saved.
+
+The first line identifies the run (template, query hash, mode, bundle
+source and ID interning) and when it started; a journal of another run,
+or one older than --resume_max_age, is not replayed. A line torn by a
+crash ends the replay.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 2
+DEFAULT_CHECKPOINT_EVERY = 25
+# Shorter than the weekly schedule: a rerun the same day resumes, the next
+# scheduled run starts from scratch on the current ORKG data
+DEFAULT_MAX_AGE_HOURS = 24
+
+
+def journal_path_for(output_csv: str) -> str:
+    """Return the checkpoint journal path that belongs to a results CSV."""
+    return os.path.splitext(output_csv)[0] + ".journal.jsonl"
+
+
+def run_header(
+    template_key: str, query: str, mode: str, source: str = "rest", intern_ids: bool = False
+) -> Dict[str, Any]:
+    """The journal header identifying a run whose rows can be replayed.
+
+    Args:
+        template_key: Template of the run
+        query: The template's paper listing query
+        mode: "full" or "incremental"
+        source: Where bundles come from: "rest", "sparql" (--batch_fetch) or
+                "offline" (--offline); their literal ids differ
+        intern_ids: Whether distinct IDs are interned (--intern_ids)
+    """
+    return {
+        "journal": JOURNAL_VERSION,
+        "template": template_key,
+        "query": hashlib.sha256(query.encode("utf-8")).hexdigest()[:16],
+        "mode": mode,
+        "source": source,
+        "intern_ids": intern_ids,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _same_run(stored: Any, header: Dict[str, Any]) -> bool:
+    if not isinstance(stored, dict):
+        return False
+    return {k: v for k, v in stored.items() if k != "created_at"} == {
+        k: v for k, v in header.items() if k != "created_at"
+    }
+
+
+def _age(stored: Dict[str, Any]) -> Optional[timedelta]:
+    try:
+        created_at = datetime.fromisoformat(stored["created_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return datetime.now(timezone.utc) - created_at
+
+
+def _replay(
+    path: str, header: Dict[str, Any], max_age: Optional[timedelta] = None
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+    """Header and rows of a journal written by a matching run, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    rows = {}
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            stored = json.loads(f.readline())
+        except json.JSONDecodeError:
+            stored = None
+        if not _same_run(stored, header):
+            log.warning(f"⚠️  Ignoring checkpoint journal {path} of a different run")
+            return None
+        age = _age(stored)
+        if age is None or (max_age is not None and age > max_age):
+            log.warning(f"⚠️  Ignoring checkpoint journal {path} started {stored.get('created_at')}, too old to resume")
+            return None
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                log.warning(f"⚠️  Checkpoint journal {path} ends with a torn line, dropping it")
+                break
+            rows[row["paper_id"]] = row
+    return stored, rows
+
+
+class CheckpointJournal:
+    """Append-only journal of the rows completed in a run."""
+
+    def __init__(self, path: str, header: Dict[str, Any], resume: bool = False,
+                 checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                 max_age: Optional[timedelta] = timedelta(hours=DEFAULT_MAX_AGE_HOURS)):
+        """Start a journal, replaying the previous one with resume.
+
+        Args:
+            path: Journal file (see journal_path_for)
+            header: Run identity (see run_header)
+            resume: Keep the rows of a previous journal of the same run
+                    (available in rows); otherwise it is discarded
+            checkpoint_every: Rows per flush + fsync
+            max_age: Journals started longer ago are not replayed (None: no limit)
+        """
+        self.path = path
+        self.checkpoint_every = max(1, checkpoint_every)
+        replayed = _replay(path, header, max_age) if resume else None
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        if replayed is not None:
+            # A resumed run keeps the start time of the run it continues
+            header, self.rows = replayed
+        self._pending = 0
+
+        # Rewrite the replayed rows into a fresh journal, so appends never
+        # follow a torn line
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in [header, *self.rows.values()]:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, row: Dict[str, Any]):
+        """Record a completed paper; the batch is made durable every checkpoint_every rows."""
+        self._file.write(json.dumps(row, separators=(",", ":")) + "\n")
+        self._pending += 1
+        if self._pending >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        if self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        """Make the journal durable and close it, e.g. when a run fails."""
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def discard(self):
+        """Remove the journal once the results are saved."""
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
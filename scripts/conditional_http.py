@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Conditional HTTP requests for the ORKG statistics scripts.
+
+Cached bundles and paper listings keep the validators of the response
+they came from (ETag, Last-Modified, and a sha256 of the body as a
+fallback). A refresh sends them back as If-None-Match/If-Modified-Since.
+A 304 response, or a body with an unchanged digest when the server sends
+no validators, counts as "not modified" and the cached copy is reused.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+LISTING_VERSION = 2
+
+
+def response_validators(response) -> Dict[str, str]:
+    """Validators of a response, to be stored with the cached copy."""
+    validators = {"sha256": hashlib.sha256(response.content).hexdigest()}
+    if response.headers.get("ETag"):
+        validators["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["last_modified"] = response.headers["Last-Modified"]
+    return validators
+
+
+def conditional_headers(validators: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Request headers that let the server answer 304 for an unchanged resource."""
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def is_not_modified(response, validators: Optional[Dict[str, str]]) -> bool:
+    """Whether a response confirms the cached copy described by validators.
+
+    The body digest is only compared when the server sends no validators of
+    its own; it saves no download, but the cached copy is kept as is.
+    """
+    if not validators:
+        return False
+    if response.status_code == 304:
+        return True
+    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+        return False
+    return validators.get("sha256") == hashlib.sha256(response.content).hexdigest()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Cached paper listing (one small JSON file next to the results CSV)
+# ──────────────────────────────────────────────────────────────────────────────
+def listing_path_for(output_csv: str) -> str:
+    return os.path.splitext(output_csv)[0] + ".listing.json"
+
+
+def query_digest(query: str) -> str:
+    return hashlib.sha256(query.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def load_listing(path: str, query: str) -> Optional[Dict[str, Any]]:
+    """Return the stored listing {"papers": [...], "pages": [...]} for query, or None."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning(f"⚠️  Ignoring unreadable paper listing {path}: {e}")
+        return None
+    if data.get("version") != LISTING_VERSION or data.get("query") != query_digest(query):
+        return None
+    return data
+
+
+def save_listing(path: str, query: str, pages: List[Dict[str, Any]]):
+    """Store a listing's paper ids and, per page, its cursor, validators and
+    paper IRIs (see sparql_listing.iter_listing_pages)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "version": LISTING_VERSION,
+            "query": query_digest(query),
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "papers": [paper_id for page in pages for paper_id in page["papers"]],
+            "pages": [
+                {"after": page["after"], "validators": page["validators"], "iris": page["iris"]}
+                for page in pages
+            ],
+        }, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Bounded-concurrency fetch scheduling for the ORKG statistics scripts.
+Runs fetch jobs on a thread pool while capping concurrent requests per host,
+and lets several templates in one run share a single fetch per paper.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+from urllib.parse import urlparse
+
+# Default cap for simultaneous requests against a single host
+DEFAULT_PER_HOST_LIMIT = 4
+
+
+class FetchScheduler:
+    def __init__(self, max_workers: int = 1, per_host_limit: int = DEFAULT_PER_HOST_LIMIT):
+        """Create a scheduler.
+
+        Args:
+            max_workers: Number of worker threads (1 runs everything inline)
+            per_host_limit: Maximum concurrent requests allowed per host
+        """
+        self.max_workers = max(1, int(max_workers or 1))
+        self.per_host_limit = max(1, int(per_host_limit or 1))
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Return the network location used as the concurrency key for a URL."""
+        return urlparse(url).netloc or url
+
+    @contextmanager
+    def host_slot(self, url: str):
+        """Hold one of the per-host request slots for the duration of the block."""
+        host = self.host_of(url)
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+        with slot:
+            yield
+
+    def map_ordered(self, fn: Callable, items: Iterable) -> Iterator[Tuple[object, Future]]:
+        """Run fn over items concurrently and yield (item, future) in input order.
+
+        At most 2 * max_workers jobs are in flight at any time, so results are
+        consumed as a stream instead of being collected up front. Callers
+        should call future.result() to get the value or re-raise the error.
+        """
+        if self.max_workers == 1:
+            for item in items:
+                future = Future()
+                try:
+                    future.set_result(fn(item))
+                except Exception as e:
+                    future.set_exception(e)
+                yield item, future
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        iterator = iter(items)
+        for item in iterator:
+            pending.append((item, executor.submit(fn, item)))
+            if len(pending) >= self.max_workers * 2:
+                break
+
+        while pending:
+            item, future = pending.popleft()
+            next_item = next(iterator, _EXHAUSTED)
+            if next_item is not _EXHAUSTED:
+                pending.append((next_item, executor.submit(fn, next_item)))
+            future.exception()  # wait without raising
+            yield item, future
+
+    def shutdown(self):
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="orkg-fetch"
+                )
+            return self._executor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+
+class SharedFetches:
+    """Runs a keyed fetch once per run and hands the result to every caller.
+
+    Only keys expected more than once are shared; each holds its result
+    until the expected number of callers has received it, so bundles are
+    not kept around longer than needed.
+    """
+
+    def __init__(self, expected: Dict[str, int]):
+        """Create a registry.
+
+        Args:
+            expected: Number of callers per key (keys with a count below 2 are
+                      fetched directly)
+        """
+        self._remaining = {key: count for key, count in expected.items() if count > 1}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._remaining)
+
+    def fetch(self, key: str, fn: Callable, *args) -> Tuple[object, bool]:
+        """Return (fn(*args), shared); shared is True if another caller fetched it."""
+        with self._lock:
+            if key not in self._remaining:
+                future, owner = None, True
+            else:
+                future = self._futures.get(key)
+                owner = future is None
+                if owner:
+                    future = self._futures[key] = Future()
+                self._remaining[key] -= 1
+                if self._remaining[key] == 0:
+                    del self._remaining[key]
+                    self._futures.pop(key)
+
+        if future is None:
+            return fn(*args), False
+        if owner:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result(), not owner
+
+    def release(self, key: str) -> bool:
+        """Account for a caller that did not need the fetch (e.g. a cache hit).
+
+        Returns True if another caller already fetched the key in this run.
+        """
+        with self._lock:
+            if key not in self._remaining:
+                return False
+            future = self._futures.get(key)
+            self._remaining[key] -= 1
+            if self._remaining[key] == 0:
+                del self._remaining[key]
+                self._futures.pop(key, None)
+        return future is not None and future.done() and future.exception() is None
+
+
+_EXHAUSTED = object()
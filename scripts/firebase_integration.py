@@ -6,8 +6,9 @@ This script handles reading from and writing to Firebase Firestore.
 
 import os
 import json
+import hashlib
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Tuple
 
 try:
     import firebase_admin
@@ -19,6 +20,94 @@ except ImportError:
     )
 
 
+# Firestore accepts at most 500 writes per batch commit
+MAX_BATCH_WRITES = 500
+
+# Fields a statistics document must contain to be usable by the frontend
+CRITICAL_FIELDS = ("total_statements", "paperCount", "global_distinct_resources")
+
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(output_csv: str) -> str:
+    """Return the per-paper sync manifest path that belongs to a results CSV."""
+    return os.path.splitext(output_csv)[0] + ".firestore.json"
+
+
+def paper_digest(data: Dict[str, Any]) -> str:
+    """Content hash of a per-paper document, independent of key order."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_sync_manifest(path: str, template_id: str, statistic_id: str) -> Optional[Dict[str, str]]:
+    """Return {paper_id: digest} of the last sync to this document, or None."""
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("template_id") != template_id
+        or manifest.get("statistic_id") != statistic_id
+    ):
+        return None
+    return manifest.get("papers", {})
+
+
+def save_sync_manifest(path: str, template_id: str, statistic_id: str, digests: Dict[str, str]):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "template_id": template_id,
+        "statistic_id": statistic_id,
+        "syncedAt": datetime.now(timezone.utc).isoformat(),
+        "papers": digests,
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class BatchWriter:
+    """Collects Firestore writes and commits them in batches of MAX_BATCH_WRITES.
+
+    Writes queued before the first commit land in one atomic batch, so
+    callers should queue the documents that must change together first.
+    """
+
+    def __init__(self, db, max_writes: int = MAX_BATCH_WRITES):
+        self.db = db
+        self.max_writes = max_writes
+        self.batch = db.batch()
+        self.pending = 0
+        self.writes = 0
+        self.commits = 0
+
+    def set(self, ref, data: Dict[str, Any], merge: bool = False):
+        self.batch.set(ref, data, merge=merge)
+        self._queued()
+
+    def delete(self, ref):
+        self.batch.delete(ref)
+        self._queued()
+
+    def _queued(self):
+        self.pending += 1
+        if self.pending >= self.max_writes:
+            self.commit()
+
+    def commit(self):
+        if self.pending:
+            self.batch.commit()
+            self.commits += 1
+            self.writes += self.pending
+            self.batch = self.db.batch()
+            self.pending = 0
+
+
 class FirebaseManager:
     def __init__(self, service_account_path: str = None):
         """Initialize Firebase connection.
@@ -207,6 +296,151 @@ class FirebaseManager:
             print(f"   Traceback: {traceback.format_exc()}")
             return False
 
+    def statistics_ref(self, template_id: str, statistic_id: str):
+        return (
+            self.db.collection("Templates")
+            .document(template_id)
+            .collection("Statistics")
+            .document(statistic_id)
+        )
+
+    def commit_statistics(
+        self,
+        statistics_data: Dict[str, Any],
+        template_id: str = "R186491",
+        statistic_id: str = "empire-statistics",
+        paper_docs: Optional[Iterable[Tuple[str, Dict[str, Any]]]] = None,
+        delete_paper_ids: Optional[Iterable[str]] = None,
+        verify: bool = False,
+    ) -> bool:
+        """Write statistics with batched writes instead of read/write/sleep/read.
+
+        The Template document is upserted (merge) and the statistics document
+        overwritten in the same batch, so both change atomically in a single
+        round trip. Per-paper documents, if given, follow in further batches
+        under Templates/{template_id}/Statistics/{statistic_id}/Papers.
+
+        Args:
+            statistics_data: Dictionary containing statistics data to write
+            template_id: Template ID (defaults to "R186491")
+            statistic_id: Statistic document ID (defaults to "empire-statistics")
+            paper_docs: Optional (paper_id, data) pairs to write as well
+            delete_paper_ids: Optional per-paper documents to delete
+            verify: Read the statistics document back and check critical fields
+        """
+        try:
+            now = datetime.now(timezone.utc).isoformat()
+            stats_copy = statistics_data.copy()
+            stats_copy["updatedAt"] = now
+            stats_copy["id"] = statistic_id
+
+            stats_ref = self.statistics_ref(template_id, statistic_id)
+            writer = BatchWriter(self.db)
+            # Merging only "id" creates a missing Template document without
+            # touching the fields of an existing one
+            writer.set(self.db.collection("Templates").document(template_id), {"id": template_id}, merge=True)
+            writer.set(stats_ref, stats_copy)
+            papers = stats_ref.collection("Papers")
+            for paper_id, data in paper_docs or ():
+                writer.set(papers.document(paper_id), data)
+            for paper_id in delete_paper_ids or ():
+                writer.delete(papers.document(paper_id))
+            writer.commit()
+            print(
+                f"📝 Wrote Templates/{template_id}/Statistics/{statistic_id} "
+                f"({writer.writes} writes in {writer.commits} batch commit(s))"
+            )
+
+            if verify:
+                verify_data = (stats_ref.get().to_dict() or {})
+                missing_fields = [f for f in CRITICAL_FIELDS if f not in verify_data]
+                if not verify_data or missing_fields:
+                    print(f"❌ Verification failed for {statistic_id}, missing fields: {missing_fields}")
+                    return False
+                print("   ✅ All critical fields present")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error writing statistics to Firebase: {e}")
+            return False
+
+    def remote_paper_digests(self, template_id: str, statistic_id: str) -> Dict[str, str]:
+        """Digests stored on the per-paper documents (one query, digest field only)."""
+        papers = self.statistics_ref(template_id, statistic_id).collection("Papers")
+        return {doc.id: (doc.to_dict() or {}).get("digest") for doc in papers.select(["digest"]).stream()}
+
+    def sync_statistics(
+        self,
+        statistics_data: Dict[str, Any],
+        paper_stats: Dict[str, Dict[str, Any]],
+        manifest_path: str,
+        template_id: str = "R186491",
+        statistic_id: str = "empire-statistics",
+        verify: bool = False,
+        listed: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """Write the aggregate statistics and sync per-paper documents by diff.
+
+        Per-paper documents live under
+        Templates/{template_id}/Statistics/{statistic_id}/Papers/{paper_id}.
+        Only papers whose metrics changed since the last sync are written,
+        compared against the manifest at manifest_path. Without a usable
+        manifest the digests stored on the documents themselves are read once
+        instead. Documents are only deleted for papers missing from listed,
+        the complete paper listing; papers that failed to process are still
+        listed and keep their documents.
+
+        Args:
+            statistics_data: Aggregate statistics for the statistics document
+            paper_stats: Mapping paper_id -> per-paper metrics
+            manifest_path: Local manifest of the last successful sync
+            template_id: Template ID (defaults to "R186491")
+            statistic_id: Statistic document ID (defaults to "empire-statistics")
+            verify: Read the statistics document back and check critical fields
+            listed: Complete paper listing of this run, or None to skip deletions
+                (partial runs such as --limit)
+        """
+        known = load_sync_manifest(manifest_path, template_id, statistic_id)
+        if known is None:
+            try:
+                known = self.remote_paper_digests(template_id, statistic_id)
+                print(f"ℹ️  No sync manifest, compared against {len(known)} stored paper documents")
+            except Exception as e:
+                print(f"❌ Error reading paper documents from Firebase: {e}")
+                return False
+
+        now = datetime.now(timezone.utc).isoformat()
+        digests = {}
+        changed = []
+        for paper_id, data in paper_stats.items():
+            digest = digests[paper_id] = paper_digest(data)
+            if known.get(paper_id) != digest:
+                changed.append((paper_id, dict(data, digest=digest, updatedAt=now)))
+        if listed is None:
+            deleted = []
+        else:
+            listed = set(listed)
+            deleted = [paper_id for paper_id in known if paper_id not in listed]
+
+        print(
+            f"🔁 Paper sync: {len(changed)} changed, {len(deleted)} removed, "
+            f"{len(digests) - len(changed)} unchanged"
+        )
+        success = self.commit_statistics(
+            statistics_data,
+            template_id=template_id,
+            statistic_id=statistic_id,
+            paper_docs=changed,
+            delete_paper_ids=deleted,
+            verify=verify,
+        )
+        if success:
+            for paper_id in deleted:
+                del known[paper_id]
+            known.update(digests)
+            save_sync_manifest(manifest_path, template_id, statistic_id, known)
+        return success
+
     def get_statistics(
         self, template_id: str = "R186491", statistic_id: str = "empire-statistics"
     ) -> Dict[str, Any]:
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP transport for the ORKG statistics scripts.
+
+One Transport per run carries the SPARQL listing and every bundle fetch:
+a requests.Session whose connection pools are sized to the number of
+workers, with keep-alive, gzip and explicit connect/read timeouts. With
+http2=True (and httpx installed with its http2 extra) requests share
+multiplexed HTTP/2 connections instead. Request and connection counts
+feed the run report, so connection reuse can be checked.
+
+requests (and httpx) are imported when the first Transport is created,
+so importing this module is free.
+"""
+
+import importlib.util
+import logging
+import threading
+from typing import Dict, Optional
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONNECT_TIMEOUT = 10.0  # seconds
+DEFAULT_READ_TIMEOUT = 120.0  # seconds; large bundles can take a while
+DEFAULT_HEADERS = {
+    "User-Agent": "orkg-statistics",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+
+class Transport:
+    """Thread-safe pooled HTTP client shared by all requests of a run."""
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        http2: bool = False,
+    ):
+        """Create the transport.
+
+        Args:
+            pool_size: Connections kept alive per host (use at least the
+                       number of concurrent requests)
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait between bytes of a response
+            http2: Use HTTP/2 through httpx when it is installed
+        """
+        httpx_available = http2 and all(importlib.util.find_spec(name) for name in ("httpx", "h2"))
+        if http2 and not httpx_available:
+            log.warning("⚠️  HTTP/2 needs httpx (pip install 'httpx[http2]'); using HTTP/1.1")
+        self.http2 = httpx_available
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = (connect_timeout, read_timeout)
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+
+        if self.http2:
+            import httpx
+
+            self._client = httpx.Client(
+                http2=True,
+                headers=DEFAULT_HEADERS,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+        else:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+            self._session = requests.Session()
+            self._session.headers.update(DEFAULT_HEADERS)
+            self._session.mount("http://", self._adapter)
+            self._session.mount("https://", self._adapter)
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None):
+        """GET url; the response offers status_code, headers, content, text and json().
+
+        Network errors are raised as requests exceptions on both clients,
+        so the retry policy treats them alike.
+        """
+        with self._lock:
+            self.requests_sent += 1
+        if not self.http2:
+            return self._session.get(url, params=params, headers=headers, timeout=self.timeout)
+
+        import httpx
+        import requests
+
+        try:
+            return self._client.get(url, params=params, headers=headers)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+
+    def connections_opened(self) -> Optional[int]:
+        """Connections opened so far (None when the client does not expose it)."""
+        if self.http2:
+            return None
+        pools = self._adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def stats(self) -> Dict[str, float]:
+        """Request and connection counts for the run report."""
+        stats = {"http_requests": self.requests_sent, "http2": int(self.http2)}
+        opened = self.connections_opened()
+        if opened is not None:
+            stats["http_connections_opened"] = opened
+            if self.requests_sent:
+                stats["http_connection_reuse_ratio"] = round(1 - opened / self.requests_sent, 4)
+        return stats
+
+    def close(self):
+        if self.http2:
+            self._client.close()
+        else:
+            self._session.close()
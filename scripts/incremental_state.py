@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Incremental state for the ORKG statistics scripts.
+Keeps per-paper bundle fingerprints, metrics and ID lists between runs so
+unchanged papers are not re-analyzed and global totals are updated by delta.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+log = logging.getLogger(__name__)
+
+# Per-paper metric fields stored alongside the fingerprint
+METRIC_FIELDS = ("total_statements", "resource_count", "literal_count", "predicate_count")
+ID_FIELDS = ("resource_ids", "literal_ids", "predicate_ids")
+
+
+def fingerprint_statements(statements) -> str:
+    """Return a content hash of a statements bundle, independent of key order."""
+    payload = json.dumps(statements, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def state_path_for(output_csv: str) -> str:
+    """Return the state file path that belongs to a results CSV."""
+    return os.path.splitext(output_csv)[0] + ".state.json"
+
+
+class IncrementalState:
+    VERSION = 1
+
+    def __init__(self, path: str):
+        """Create an empty state that will be saved to path."""
+        self.path = path
+        self.papers: Dict[str, Dict[str, Any]] = {}
+        self.timestamp: Optional[str] = None
+        self.changed = False
+        self._totals = Counter()
+        self._distinct = {field: Counter() for field in ID_FIELDS}
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalState":
+        """Load the state from path; a missing or outdated file yields an empty state."""
+        state = cls(path)
+        if not os.path.exists(path):
+            return state
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning(f"⚠️  Ignoring unreadable incremental state {path}: {e}")
+            return state
+        if data.get("version") != cls.VERSION:
+            log.warning(f"⚠️  Ignoring incremental state {path} with version {data.get('version')}")
+            return state
+
+        state.timestamp = data.get("timestamp")
+        for paper_id, record in data.get("papers", {}).items():
+            state._add(paper_id, record)
+        state.changed = False
+        return state
+
+    def get(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        return self.papers.get(paper_id)
+
+    def put(self, paper_id: str, record: Dict[str, Any]):
+        """Store a freshly analyzed paper, replacing its previous record."""
+        self.remove(paper_id)
+        self._add(paper_id, record)
+
+    def touch(self, paper_id: str, cache_token):
+        """Record a new cache token for a paper whose content did not change."""
+        record = self.papers[paper_id]
+        if record.get("cache_token") != cache_token:
+            record["cache_token"] = cache_token
+            self.changed = True
+
+    def remove(self, paper_id: str):
+        record = self.papers.pop(paper_id, None)
+        if record is None:
+            return
+        for field in METRIC_FIELDS:
+            self._totals[field] -= record[field]
+        for field in ID_FIELDS:
+            distinct = self._distinct[field]
+            for item in set(record[field]):
+                distinct[item] -= 1
+                if distinct[item] <= 0:
+                    del distinct[item]
+        self.changed = True
+
+    def prune(self, keep_ids: Iterable[str]) -> List[str]:
+        """Drop every paper not in keep_ids and return the removed ids."""
+        keep = set(keep_ids)
+        removed = [paper_id for paper_id in self.papers if paper_id not in keep]
+        for paper_id in removed:
+            self.remove(paper_id)
+        return removed
+
+    def global_stats(self) -> Dict[str, int]:
+        """Global totals and distinct counts in the shape process_papers returns."""
+        return {
+            "total_statements": self._totals["total_statements"],
+            "total_resources": self._totals["resource_count"],
+            "total_literals": self._totals["literal_count"],
+            "total_predicates": self._totals["predicate_count"],
+            "global_distinct_resources": len(self._distinct["resource_ids"]),
+            "global_distinct_literals": len(self._distinct["literal_ids"]),
+            "global_distinct_predicates": len(self._distinct["predicate_ids"]),
+        }
+
+    def save(self, timestamp: Optional[str] = None):
+        """Atomically write the state file."""
+        if timestamp is not None:
+            self.timestamp = timestamp
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": self.VERSION, "timestamp": self.timestamp, "papers": self.papers}, f)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+    def _add(self, paper_id: str, record: Dict[str, Any]):
+        self.papers[paper_id] = record
+        for field in METRIC_FIELDS:
+            self._totals[field] += record[field]
+        for field in ID_FIELDS:
+            self._distinct[field].update(set(record[field]))
+        self.changed = True
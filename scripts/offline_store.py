@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Offline triple store for the ORKG statistics scripts.
+
+--offline computes the statistics from a local ORKG RDF dump instead of
+the live REST API and triplestore, so runs are reproducible and can be
+benchmarked. The dump is streamed into an indexed SQLite file once
+(<dump>.index.sqlite, rebuilt when the dump changes); N-Triples dumps,
+plain or gzipped, are read line by line in batches, so a multi-GB dump
+never has to fit in memory. Other RDF formats are read with rdflib when
+it is installed (pip install rdflib), which parses the whole file in
+memory.
+
+Queries are answered from the index:
+- template_papers evaluates a template's sparql_query. The basic graph
+  pattern is translated to SQL joins over the triples table; OPTIONAL
+  blocks are skipped (they cannot remove papers) and FILTERs may compare
+  a variable with constants (=, ||). Other SPARQL constructs are rejected.
+- bundle collects a paper's statements with the reachability of
+  sparql_pushdown.BUNDLE_TRIPLES, shaped like sparql_bundles bundles.
+"""
+
+import gzip
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sparql_bundles import node
+from sparql_pushdown import ORKG_PREDICATE_IRI, ORKG_RESOURCE_IRI
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+# Object kinds in the triples table
+IRI, LITERAL, BNODE = 0, 1, 2
+
+_LOAD_BATCH = 50_000
+# SQLite limits the number of bound parameters per statement
+_SQLITE_BATCH = 500
+
+_NT_TERM = r'<[^>]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:\^\^<[^>]*>|@[\w-]+)?'
+_NT_LINE = re.compile(rf"^\s*({_NT_TERM})\s+<([^>]*)>\s+({_NT_TERM})\s*\.\s*$")
+_NT_ESCAPE = re.compile(r"\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)")
+_NT_ESCAPES = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+
+def index_path_for(dump_path: str) -> str:
+    return dump_path if dump_path.endswith(".sqlite") else dump_path + ".index.sqlite"
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Streaming loader
+# ──────────────────────────────────────────────────────────────────────────────
+def _unescape(value: str) -> str:
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in "uU":
+            return chr(int(escape[1:], 16))
+        return _NT_ESCAPES.get(escape, escape)
+
+    return _NT_ESCAPE.sub(replace, value) if "\\" in value else value
+
+
+def _nt_object(term: str) -> Tuple[str, int, str]:
+    """(value, kind, datatype or @language) of an N-Triples object term."""
+    if term.startswith("<"):
+        return term[1:-1], IRI, ""
+    if term.startswith("_:"):
+        return term, BNODE, ""
+    end = term.rindex('"')
+    suffix = term[end + 1:]
+    datatype = suffix[3:-1] if suffix.startswith("^^") else suffix
+    return _unescape(term[1:end]), LITERAL, datatype
+
+
+def iter_ntriples(path: str) -> Iterator[Tuple[str, str, str, int, str]]:
+    """Stream (s, p, o, kind, datatype) rows from an N-Triples file (optionally gzipped)."""
+    opener = gzip.open if path.endswith(".gz") else open
+    skipped = 0
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            match = _NT_LINE.match(line)
+            if match is None:
+                skipped += 1
+                continue
+            subject, predicate, obj = match.groups()
+            yield (subject[1:-1] if subject.startswith("<") else subject, predicate) + _nt_object(obj)
+    if skipped:
+        log.warning(f"⚠️  Skipped {skipped} unparsable lines in {path}")
+
+
+def iter_rdflib(path: str) -> Iterator[Tuple[str, str, str, int, str]]:
+    """Rows of any RDF format rdflib can parse (the whole graph is held in memory)."""
+    try:
+        import rdflib
+    except ImportError as e:
+        raise RuntimeError(
+            f"{path} is not N-Triples; convert it (e.g. riot --output=nt) or pip install rdflib"
+        ) from e
+
+    log.warning(f"⚠️  Parsing {path} with rdflib, which holds the whole graph in memory")
+    graph = rdflib.Graph()
+    graph.parse(path)
+    for s, p, o in graph:
+        if isinstance(o, rdflib.Literal):
+            row = (str(o), LITERAL, str(o.datatype or (f"@{o.language}" if o.language else "")))
+        elif isinstance(o, rdflib.BNode):
+            row = (f"_:{o}", BNODE, "")
+        else:
+            row = (str(o), IRI, "")
+        yield (f"_:{s}" if isinstance(s, rdflib.BNode) else str(s), str(p)) + row
+
+
+def _rows(dump_path: str) -> Iterator[Tuple[str, str, str, int, str]]:
+    base = dump_path[:-3] if dump_path.endswith(".gz") else dump_path
+    if base.endswith((".nt", ".ntriples")):
+        return iter_ntriples(dump_path)
+    return iter_rdflib(dump_path)
+
+
+def _dump_signature(dump_path: str) -> str:
+    st = os.stat(dump_path)
+    return f"{os.path.abspath(dump_path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def build_index(dump_path: str, index_path: str) -> int:
+    """Stream a dump into a new SQLite index; returns the number of triples."""
+    tmp_path = index_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.execute("CREATE TABLE triples (s TEXT NOT NULL, p TEXT NOT NULL, o TEXT NOT NULL, kind INTEGER NOT NULL, datatype TEXT NOT NULL)")
+
+    count = 0
+    batch: List[Tuple[str, str, str, int, str]] = []
+    for row in _rows(dump_path):
+        batch.append(row)
+        if len(batch) >= _LOAD_BATCH:
+            conn.executemany("INSERT INTO triples VALUES (?, ?, ?, ?, ?)", batch)
+            count += len(batch)
+            batch.clear()
+            if count % (_LOAD_BATCH * 20) == 0:
+                log.info(f"  {count:,} triples loaded")
+    conn.executemany("INSERT INTO triples VALUES (?, ?, ?, ?, ?)", batch)
+    count += len(batch)
+
+    # Indexes are built once after the bulk load, which is much faster than maintaining them
+    conn.execute("CREATE INDEX triples_s ON triples (s, p)")
+    conn.execute("CREATE INDEX triples_po ON triples (p, o)")
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ("version", str(INDEX_VERSION)),
+        ("source", _dump_signature(dump_path)),
+        ("triples", str(count)),
+    ])
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, index_path)
+    return count
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Template queries (a SPARQL subset translated to SQL)
+# ──────────────────────────────────────────────────────────────────────────────
+_TOKEN = re.compile(r"""
+    (?P<skip>\s+|\#[^\n]*)
+  | (?P<iri><[^>\s]*>)
+  | (?P<var>[?$]\w+)
+  | (?P<literal>"(?:[^"\\]|\\.)*"(?:\^\^(?:<[^>]*>|[\w-]*:[\w-]*)|@[\w-]+)?)
+  | (?P<op>\|\||&&|!=|=|[{}().;,*])
+  | (?P<name>[\w-]*:(?:[\w-]|\.(?=[\w-]))*|\w+)
+""", re.VERBOSE)
+
+
+def _tokenize(query: str) -> List[Tuple[str, str]]:
+    tokens, pos = [], 0
+    while pos < len(query):
+        match = _TOKEN.match(query, pos)
+        if match is None:
+            raise ValueError(f"Unsupported SPARQL syntax near: {query[pos:pos + 30]!r}")
+        pos = match.end()
+        if match.lastgroup != "skip":
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+class _TemplateQuery:
+    """Triple patterns and constant filters of a template's SELECT query."""
+
+    def __init__(self, query: str):
+        self.tokens = _tokenize(query)
+        self.pos = 0
+        self.prefixes: Dict[str, str] = {}
+        self.patterns: List[Tuple[Any, Any, Any]] = []
+        self.filters: List[Tuple[str, List[str]]] = []
+        self.variables: List[str] = []
+        self._parse()
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _expect(self, value):
+        kind, text = self._next()
+        if text != value:
+            raise ValueError(f"Expected {value!r} in template query, found {text!r}")
+
+    def _term(self):
+        """A variable ("?name", None) or a constant (value, is_literal)."""
+        kind, text = self._next()
+        if kind == "var":
+            return ("?" + text[1:], None)
+        if kind == "iri":
+            return (text[1:-1], False)
+        if kind == "literal":
+            end = text.rindex('"')
+            return (_unescape(text[1:end]), True)
+        if kind == "name" and text == "a":
+            return (RDF_TYPE, False)
+        if kind == "name" and ":" in text:
+            prefix, local = text.split(":", 1)
+            if prefix not in self.prefixes:
+                raise ValueError(f"Unknown prefix {prefix!r} in template query")
+            return (self.prefixes[prefix] + local, False)
+        raise ValueError(f"Unsupported term {text!r} in template query")
+
+    def _parse(self):
+        while self._peek()[1] and self._peek()[1].upper() in ("PREFIX", "BASE"):
+            keyword = self._next()[1].upper()
+            if keyword == "BASE":
+                raise ValueError("BASE is not supported in template queries")
+            name = self._next()[1].rstrip(":")
+            self.prefixes[name] = self._next()[1][1:-1]
+        if self._next()[1].upper() != "SELECT":
+            raise ValueError("Only SELECT template queries are supported")
+        while self._peek()[1] and self._peek()[1].upper() != "WHERE" and self._peek()[1] != "{":
+            kind, text = self._next()
+            if kind == "var":
+                self.variables.append("?" + text[1:])
+        if self._peek()[1].upper() == "WHERE":
+            self._next()
+        self._expect("{")
+        self._group()
+        if self._peek()[0] is not None:
+            raise ValueError(f"Unsupported SPARQL after the WHERE clause: {self._peek()[1]!r}")
+
+    def _skip_group(self):
+        self._expect("{")
+        depth = 1
+        while depth:
+            text = self._next()[1]
+            if text is None:
+                raise ValueError("Unbalanced braces in template query")
+            depth += {"{": 1, "}": -1}.get(text, 0)
+
+    def _group(self):
+        while True:
+            kind, text = self._peek()
+            if text is None:
+                raise ValueError("Unterminated WHERE clause in template query")
+            if text == "}":
+                self._next()
+                return
+            if text == ".":
+                self._next()
+            elif kind == "name" and text.upper() == "OPTIONAL":
+                # Optional parts never remove solutions, and only ?paper is needed
+                self._next()
+                self._skip_group()
+            elif kind == "name" and text.upper() == "FILTER":
+                self._next()
+                self._filter()
+            elif text == "{":
+                raise ValueError("Nested groups are not supported in template queries")
+            else:
+                self._triples()
+
+    def _triples(self):
+        subject = self._term()
+        while True:
+            predicate = self._term()
+            while True:
+                self.patterns.append((subject, predicate, self._term()))
+                if self._peek()[1] != ",":
+                    break
+                self._next()
+            if self._peek()[1] != ";":
+                return
+            self._next()
+            if self._peek()[1] in (".", "}"):
+                return
+
+    def _filter(self):
+        """FILTER over disjunctions of ?var = constant (parentheses allowed)."""
+        self._expect("(")
+        depth, variable, values = 1, None, []
+        while depth:
+            kind, text = self._peek()
+            if text == "(":
+                depth += 1
+                self._next()
+            elif text == ")":
+                depth -= 1
+                self._next()
+            elif text == "||":
+                self._next()
+            elif kind == "var" or kind in ("iri", "literal", "name"):
+                left = self._term()
+                self._expect("=")
+                right = self._term()
+                var, const = (left, right) if left[1] is None else (right, left)
+                if var[1] is not None or const[1] is None:
+                    raise ValueError("FILTERs must compare a variable with a constant")
+                if variable not in (None, var[0]):
+                    raise ValueError("FILTER disjunctions must test a single variable")
+                variable = var[0]
+                values.append(const[0])
+            else:
+                raise ValueError(f"Unsupported FILTER expression near {text!r}")
+        self.filters.append((variable, values))
+
+    def to_sql(self, variable: str) -> Tuple[str, List[str]]:
+        """SQL selecting the distinct values of variable, ordered like the paged listing."""
+        columns: Dict[str, str] = {}
+        where: List[str] = []
+        params: List[str] = []
+        for i, pattern in enumerate(self.patterns):
+            for column, (value, is_literal) in zip(("s", "p", "o"), pattern):
+                ref = f"t{i}.{column}"
+                if is_literal is None:
+                    if value in columns:
+                        where.append(f"{ref} = {columns[value]}")
+                    else:
+                        columns[value] = ref
+                    continue
+                where.append(f"{ref} = ?")
+                params.append(value)
+                if column == "o":
+                    where.append(f"t{i}.kind = {LITERAL if is_literal else IRI}")
+        for name, values in self.filters:
+            if name not in columns:
+                raise ValueError(f"FILTER on {name}, which no triple pattern binds")
+            where.append(f"{columns[name]} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if variable not in columns:
+            raise ValueError(f"The template query does not bind {variable}")
+        tables = ", ".join(f"triples t{i}" for i in range(len(self.patterns)))
+        sql = f"SELECT DISTINCT {columns[variable]} FROM {tables}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return sql + " ORDER BY 1", params
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Store
+# ──────────────────────────────────────────────────────────────────────────────
+class OfflineStore:
+    """Read-only view of an indexed RDF dump."""
+
+    def __init__(self, dump_path: str, index_path: Optional[str] = None):
+        """Open the index of a dump, building it first if it is missing or stale.
+
+        Args:
+            dump_path: N-Triples dump (.nt / .nt.gz; other formats need rdflib),
+                       or a previously built .sqlite index
+            index_path: Where the index is kept (default: <dump>.index.sqlite)
+        """
+        self.dump_path = dump_path
+        self.index_path = index_path or index_path_for(dump_path)
+        if self.index_path != dump_path and not self._index_current():
+            log.info(f"🗃️  Indexing {dump_path} into {self.index_path}...")
+            count = build_index(dump_path, self.index_path)
+            log.info(f"🗃️  Indexed {count:,} triples")
+        self._conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, check_same_thread=False)
+        # Bundles are loaded from the fetch scheduler's worker threads
+        self._lock = threading.Lock()
+
+    def _index_current(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+            try:
+                meta = dict(conn.execute("SELECT name, value FROM meta").fetchall())
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+        return meta.get("version") == str(INDEX_VERSION) and meta.get("source") == _dump_signature(self.dump_path)
+
+    def template_papers(self, query: str) -> List[str]:
+        """Ids of the papers a template's sparql_query lists, in IRI order."""
+        sql, params = _TemplateQuery(query).to_sql("?paper")
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [iri.rsplit("/", 1)[-1] for iri, in rows]
+
+    def bundle(self, paper_id: str) -> List[Dict[str, Any]]:
+        """A paper's statements: every ORKG statement reachable from it, following
+        any predicate but rdf:type (see sparql_pushdown.BUNDLE_TRIPLES)."""
+        start = ORKG_RESOURCE_IRI + paper_id
+        seen = {start}
+        frontier = [start]
+        statements = []
+        while frontier:
+            reached = []
+            for chunk_start in range(0, len(frontier), _SQLITE_BATCH):
+                chunk = frontier[chunk_start:chunk_start + _SQLITE_BATCH]
+                with self._lock:
+                    rows = self._conn.execute(
+                        f"SELECT s, p, o, kind, datatype FROM triples WHERE s IN ({', '.join('?' * len(chunk))}) "
+                        "GROUP BY s, p, o, kind, datatype ORDER BY MIN(rowid)",
+                        chunk,
+                    ).fetchall()
+                for s, p, o, kind, datatype in rows:
+                    if p.startswith(ORKG_PREDICATE_IRI):
+                        statements.append(_statement(s, p, o, kind, datatype))
+                    if kind != LITERAL and p != RDF_TYPE and o not in seen:
+                        seen.add(o)
+                        reached.append(o)
+            frontier = reached
+        return statements
+
+    def close(self):
+        self._conn.close()
+
+
+def _statement(s: str, p: str, o: str, kind: int, datatype: str) -> Dict[str, Any]:
+    """A bundle statement, shaped like sparql_bundles.split_bundles builds them."""
+    if kind == LITERAL:
+        obj = {"type": "literal", "value": o, "datatype": datatype}
+    else:
+        obj = {"type": "uri", "value": o}
+    return {
+        "subject": node({"type": "uri", "value": s}),
+        "predicate": {"id": p.rsplit("/", 1)[-1], "_class": "predicate"},
+        "object": node(obj),
+    }
@@ -10,41 +10,172 @@ Usage:
     python orkg-statistics.py --template nlp4re
     python orkg-statistics.py --template empire --reload_data
     python orkg-statistics.py --template nlp4re --limit 10
+    python orkg-statistics.py --template empire --reload_data --workers 8
+    python orkg-statistics.py --template empire --incremental
+    python orkg-statistics.py --template all --workers 8
+    python orkg-statistics.py --template all --shared_cache
+    python orkg-statistics.py --template all --migrate_cache
+    python orkg-statistics.py --template empire --engine pushdown --pushdown_per_paper
+    python orkg-statistics.py --template empire --reload_data --batch_fetch 64
+    python orkg-statistics.py --template all --offline orkg-dump.nt.gz
+    python orkg-statistics.py --template all --workers 8 --resume
 
 Features:
 1. Send SPARQL query directly to ORKG to list papers for the specified template.
 2. For each paper IRI, fetch its statements bundle via ORKG library (with caching).
 3. Compute RPL metrics and output results to CSV.
-4. Update Firebase with computed statistics.
+4. Update Firebase with computed statistics (one batched write; --verify_firebase
+   reads the document back). --firebase_papers also syncs per-paper metrics,
+   writing only papers that changed since the last sync.
 5. Supports --reload_data to force re-fetching everything.
-6. Calculates global distinct counts across all papers.
-7. Handles paper deletions by removing them from CSV.
+6. Calculates global distinct counts across all papers (on interned integer
+   codes instead of sets with --intern_ids, see id_interning.py).
+7. Handles paper deletions by removing them from the CSV and every cache key version.
+8. Fetches bundles in parallel with --workers (capped per host via --max_per_host).
+9. Retries transient ORKG failures with jittered backoff, a run-wide retry
+   budget and per-service circuit breakers; failed papers are reported.
+10. Supports --incremental to re-analyze only papers whose bundle changed.
+11. Pluggable bundle cache: per-file JSON (default) or a single compressed
+    SQLite store (--cache_backend sqlite, seeded with --import_json_cache).
+12. Cached bundles expire after the template's cache_max_age_days
+    (override with --refresh_older_than); --refresh_slice revalidates the
+    oldest entries each run, and orphaned entries are evicted by age/size.
+13. --output_format npz writes a compact columnar archive (dictionary-encoded
+    ID lists, global statistics stored once); load it with
+    results_format.load_columnar_results.
+14. Papers stream through list → fetch → analyze → aggregate; CSV rows are
+    written as they complete instead of being collected in memory.
+15. ORKG_HOST / ORKG_SPARQL_ENDPOINT and --cache_dir / --output_csv point a
+    run elsewhere, e.g. at benchmarks/fake_orkg_server.py.
+16. Logging with --log_level (per-paper lines at DEBUG) and run metrics
+    (timers, cache hit/miss counters, bundle latency histogram) exported
+    via --metrics_json, --metrics_prom and --summary_markdown.
+17. --template all (or several templates) runs them concurrently in one
+    process with one fetch scheduler and Firebase app; papers listed by
+    several templates are fetched once.
+18. --shared_cache keeps one bundle cache for all templates, keyed by ORKG
+    resource id, with per-template membership manifests (see shared_cache.py).
+19. Refreshes of cached bundles and of the paper listing are conditional
+    requests (ETag / Last-Modified, see conditional_http.py); unchanged
+    resources are answered with 304 and reused from the cache.
+20. All requests go through one pooled keep-alive transport with explicit
+    timeouts (--connect_timeout, --read_timeout, optional --http2; see
+    http_transport.py); connection reuse is part of the run report.
+21. Caches carry a schema version: --migrate_cache moves old caches to one
+    key per paper and one entry shape in bulk (see cache_migration.py), so
+    lookups probe a single key; --legacy_cache reads unmigrated caches.
+22. The paper listing is paged (--listing_page_size, keyset pagination on
+    the paper IRI) and server-side DISTINCT, so papers with several
+    contributions are listed once (see sparql_listing.py). Paged listings,
+    and so the CSV rows, are ordered by paper IRI.
+23. --engine pushdown computes the statistics with SPARQL aggregate
+    queries instead of bundles (per paper with --pushdown_per_paper), and
+    cross-checks a sample of papers against their bundles, stopping on any
+    difference (see sparql_pushdown.py). Its results are never written to
+    Firebase.
+24. --batch_fetch retrieves the bundles of many papers per SPARQL query
+    instead of one REST request each, and caches them apart from the REST
+    bundles, since their literal ids are value-based (see sparql_bundles.py).
+    For the same reason results go to <output>.batch.csv unless
+    --output_csv is given, and Firebase is not updated.
+25. --offline computes the statistics from a local ORKG N-Triples dump,
+    streamed once into an indexed SQLite store; the template queries and
+    bundles are evaluated locally, without network or cache (see offline_store.py).
+    Literals are counted by value, so results go to <output>.offline.csv
+    unless --output_csv is given.
+26. Completed papers are checkpointed to an append-only journal (fsync'd
+    every --checkpoint_every papers); --resume replays the journal of an
+    interrupted run of the same template, mode and bundle source, started
+    at most --resume_max_age hours ago, and only processes the remaining
+    papers (see checkpoint_journal.py).
 """
 
 import os
-import json
-import hashlib
 import argparse
+import logging
+import sys
+import threading
 import time
-import requests
-import pandas as pd
-from datetime import datetime, timezone
-from orkg import ORKG
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from bundle_cache import CACHE_BACKENDS, CACHE_SCHEMA_VERSION, JsonDirCache, new_entry, open_cache
+from cache_migration import CacheSchemaError, check_schema, legacy_statements, migrate_cache, normalize_entry
+from checkpoint_journal import (
+    DEFAULT_CHECKPOINT_EVERY,
+    DEFAULT_MAX_AGE_HOURS,
+    CheckpointJournal,
+    journal_path_for,
+    run_header,
+)
+from cache_policy import CachePolicy, paper_cache_key, paper_cache_keys, sparql_cache_key
+from conditional_http import (
+    conditional_headers,
+    is_not_modified,
+    listing_path_for,
+    load_listing,
+    response_validators,
+    save_listing,
+)
+from fetch_scheduler import FetchScheduler, SharedFetches, DEFAULT_PER_HOST_LIMIT
+from http_transport import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, Transport
+from incremental_state import IncrementalState, fingerprint_statements, state_path_for
+from results_format import (
+    OUTPUT_FORMATS,
+    StreamingCsvWriter,
+    batch_path_for,
+    counts_path_for,
+    csv_paper_ids,
+    offline_path_for,
+    remove_csv_rows,
+    save_columnar_results,
+    save_counts_csv,
+    save_csv_results,
+)
+from retry_policy import CircuitBreaker, RetryBudget, RetryPolicy, raise_for_status
+from run_metrics import RunMetrics, peak_rss_bytes
+from shared_cache import SharedCacheManifests
+from offline_store import OfflineStore
+from sparql_bundles import DEFAULT_BUNDLE_BATCH, fetch_bundles
+from sparql_listing import DEFAULT_PAGE_SIZE, iter_listing_pages
+from sparql_pushdown import COUNT_FIELDS, DEFAULT_BATCH_SIZE, DEFAULT_CHECK_SAMPLE, compare_counts, paper_counts, template_stats
+
+log = logging.getLogger("orkg_statistics")
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+# Per-paper lines are logged at DEBUG; INFO gets a progress line every N papers
+PROGRESS_EVERY = 100
 
 # Retry configuration
 MAX_RETRIES = 3
-RETRY_DELAY = 5  # seconds
-
-# Import Firebase integration
-try:
-    from firebase_integration import FirebaseManager
-    FIREBASE_AVAILABLE = True
-except ImportError:
-    print("Firebase integration not available. Install firebase-admin to enable Firebase updates.")
-    FIREBASE_AVAILABLE = False
-except Exception as e:
-    print(f"Firebase integration error: {e}")
-    FIREBASE_AVAILABLE = False
+RETRY_DELAY = 5  # seconds, upper bound for the jittered backoff
+RETRY_BUDGET = 100  # retries allowed per run across all requests
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures before a circuit opens
+CIRCUIT_RESET_TIMEOUT = 30  # seconds before an open circuit lets a trial call through
+
+# Heavy dependencies (NumPy, firebase_admin, requests) are imported on
+# first use, so --help and runs that never touch them start quickly
+# (see benchmarks/bench_import.py)
+_firebase_integration = None
+
+
+def load_firebase_integration():
+    """Import the Firebase integration on first use; returns None if unavailable."""
+    global _firebase_integration
+    if _firebase_integration is None:
+        try:
+            import firebase_integration
+            _firebase_integration = firebase_integration
+        except ImportError:
+            log.warning("Firebase integration not available. Install firebase-admin to enable Firebase updates.")
+            _firebase_integration = False
+        except Exception as e:
+            log.warning(f"Firebase integration error: {e}")
+            _firebase_integration = False
+    return _firebase_integration or None
+
+# Bundle cache used by every template with --shared_cache
+SHARED_CACHE_DIR = "./orkg-cache-shared"
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Template Configurations
@@ -53,6 +184,8 @@ TEMPLATE_CONFIGS = {
     "empire": {
         "name": "KG-EmpiRE",
         "cache_dir": "./orkg-cache",
+        "cache_max_age_days": 30,
+        "cache_evict_orphans_days": 30,
         "output_csv": "./daily_results_incremental.csv",
         "firebase_template_id": "R186491",
         "firebase_statistic_id": "empire-statistics",
@@ -76,6 +209,8 @@ TEMPLATE_CONFIGS = {
     "nlp4re": {
         "name": "NLP4RE",
         "cache_dir": "./orkg-cache-nlp4re",
+        "cache_max_age_days": 30,
+        "cache_evict_orphans_days": 30,
         "output_csv": "./nlp4re_results.csv",
         "firebase_template_id": "R1544125",
         "firebase_statistic_id": "nlp4re-statistics",
@@ -98,87 +233,296 @@ TEMPLATE_CONFIGS = {
 # ──────────────────────────────────────────────────────────────────────────────
 # Configuration
 # ──────────────────────────────────────────────────────────────────────────────
-SPARQL_ENDPOINT = "https://www.orkg.org/triplestore"
+# Both can be overridden from the environment, e.g. to run against a local
+# stand-in server (see benchmarks/bench_pipeline.py)
+SPARQL_ENDPOINT = os.environ.get("ORKG_SPARQL_ENDPOINT", "https://www.orkg.org/triplestore")
+ORKG_HOST = os.environ.get("ORKG_HOST", "https://www.orkg.org/")
+
+# Statements bundle endpoint, requested directly (instead of through the orkg
+# client) so refreshes can send conditional headers and see the validators
+BUNDLE_URL = ORKG_HOST.rstrip("/") + "/api/statements/{thing_id}/bundle/"
+
+
+def paper_summary(row):
+    """Per-paper metrics synced to Firestore (counts only, no ID lists)."""
+    return {
+        "total_statements": row["total_statements"],
+        "resource_count": row["resource_count"],
+        "literal_count": row["literal_count"],
+        "predicate_count": row["predicate_count"],
+        "distinct_resources": len(set(row["resource_ids"])),
+        "distinct_literals": len(set(row["literal_ids"])),
+        "distinct_predicates": len(set(row["predicate_ids"])),
+    }
 
-# Initialize ORKG client
-orkg = ORKG(host="https://www.orkg.org/")
+
+def distinct_id_sets(intern_ids=False):
+    """Accumulators for the global distinct resource, literal and predicate IDs.
+
+    Python sets by default; with intern_ids the IDs are counted on interned
+    integer codes (id_interning, needs NumPy), which is slower but retains
+    far less memory per distinct ID (see benchmarks/bench_id_interning.py).
+    """
+    fields = ("resource_ids", "literal_ids", "predicate_ids")
+    if not intern_ids:
+        return {field: set() for field in fields}
+    from id_interning import DistinctIds, IdInterner
+
+    interner = IdInterner()
+    return {field: DistinctIds(interner) for field in fields}
+
+
+class GlobalStatsAccumulator:
+    """Folds result rows into global totals and distinct counts."""
+
+    def __init__(self, intern_ids=False):
+        self.paper_count = 0
+        # Small per-paper summaries, kept even when the rows are streamed out
+        self.paper_stats = {}
+        self.totals = {field: 0 for field in ("total_statements", "resource_count", "literal_count", "predicate_count")}
+        self.distinct = distinct_id_sets(intern_ids)
+
+    def add(self, row):
+        self.paper_count += 1
+        self.paper_stats[row["paper_id"]] = paper_summary(row)
+        for field in self.totals:
+            self.totals[field] += row[field]
+        for field, distinct in self.distinct.items():
+            distinct.update(row[field])
+
+    def global_stats(self):
+        return {
+            "total_statements": self.totals["total_statements"],
+            "total_resources": self.totals["resource_count"],
+            "total_literals": self.totals["literal_count"],
+            "total_predicates": self.totals["predicate_count"],
+            "global_distinct_resources": len(self.distinct["resource_ids"]),
+            "global_distinct_literals": len(self.distinct["literal_ids"]),
+            "global_distinct_predicates": len(self.distinct["predicate_ids"]),
+        }
 
 
 class ORKGStatisticsProcessor:
     """Processor for calculating ORKG statistics for a specific template."""
     
-    def __init__(self, template_key: str):
+    def __init__(
+        self,
+        template_key: str,
+        workers: int = 1,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        cache_backend: str = "json",
+        refresh_older_than_days: float = None,
+        refresh_slice: int = 0,
+        cache_max_mb: float = None,
+        cache_dir: str = None,
+        output_csv: str = None,
+        scheduler: FetchScheduler = None,
+        shared_cache_dir: str = None,
+        transport: Transport = None,
+        legacy_cache: bool = False,
+        listing_page_size: int = DEFAULT_PAGE_SIZE,
+        batch_size: int = 0,
+        offline_store: OfflineStore = None,
+        intern_ids: bool = False,
+    ):
         if template_key not in TEMPLATE_CONFIGS:
             available = ", ".join(TEMPLATE_CONFIGS.keys())
             raise ValueError(f"Unknown template: {template_key}. Available: {available}")
         
-        self.config = TEMPLATE_CONFIGS[template_key]
+        self.config = dict(TEMPLATE_CONFIGS[template_key])
+        # Location overrides, e.g. for benchmark runs against a scratch directory
+        if cache_dir:
+            self.config["cache_dir"] = cache_dir
+        if output_csv:
+            self.config["output_csv"] = output_csv
+        elif offline_store is not None:
+            # Offline literal ids are value-based, so the results (and the state,
+            # listing and journal files next to them) never replace the template's
+            self.config["output_csv"] = offline_path_for(self.config["output_csv"])
+        elif batch_size:
+            # Likewise for bundles built from SPARQL rows (see sparql_bundles)
+            self.config["output_csv"] = batch_path_for(self.config["output_csv"])
         self.template_key = template_key
         self.cache_dir = self.config["cache_dir"]
-        
-        # Ensure cache directory exists
-        os.makedirs(self.cache_dir, exist_ok=True)
+        # Multi-template runs pass one scheduler shared by all processors
+        self.scheduler = scheduler or FetchScheduler(max_workers=workers, per_host_limit=per_host_limit)
+        # Set by multi-template runs so papers listed by several templates are fetched once
+        self.shared_fetches = None
+        # Papers per SPARQL listing page (0: the whole listing in one request)
+        self.listing_page_size = listing_page_size
+        # Papers per batched SPARQL bundle fetch (0: one REST request per paper)
+        # and the papers whose bundles a batch stored in this run
+        self.batch_size = batch_size
+        self.prefetched = set()
+        # Local dump the listing and bundles come from instead of ORKG (see offline_store)
+        self.offline_store = offline_store
+        # Count global distinct IDs on interned integer codes instead of sets
+        self.intern_ids = intern_ids
+        # Where bundles come from; their literal ids differ (see run_header)
+        self.bundle_source = "offline" if offline_store is not None else "sparql" if batch_size else "rest"
+        # Pooled HTTP client for SPARQL and bundle requests (shared in multi-template runs)
+        self.transport = transport or Transport(pool_size=workers + 1)
+
+        # Retry policies share one run-wide budget; each service has its own breaker
+        self.retry_budget = RetryBudget(RETRY_BUDGET)
+        self.rest_retry = RetryPolicy(
+            MAX_RETRIES,
+            RETRY_DELAY,
+            budget=self.retry_budget,
+            breaker=CircuitBreaker("ORKG REST API", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT),
+        )
+        self.sparql_retry = RetryPolicy(
+            MAX_RETRIES,
+            RETRY_DELAY,
+            budget=self.retry_budget,
+            breaker=CircuitBreaker("ORKG SPARQL endpoint", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT),
+        )
+        # Papers that could not be loaded in this run, as (paper_id, reason)
+        self.failed_papers = []
+        # Whether the last run produced different results than the stored ones
+        self.results_changed = True
+        # Papers of the previous listing (None if unknown), see handle_paper_deletions
+        self.previous_papers = None
+        # Complete listing of this run (None for partial runs), see update_firebase
+        self.listed_papers = None
+        # Number of papers in the last run's results and their per-paper summaries
+        self.paper_count = 0
+        self.paper_stats = {}
+        # Timers, counters and latency histograms of this run (see run_metrics)
+        self.metrics = RunMetrics(labels={"template": template_key})
+
+        # Bundle cache (one JSON file per paper, or a single SQLite file); a
+        # shared cache serves every template, tracked by membership manifests
+        self.shared_cache = SharedCacheManifests(shared_cache_dir, template_key) if shared_cache_dir else None
+        self.cache = open_cache(cache_backend, shared_cache_dir or self.cache_dir)
+        # Also read entries under the legacy bare-id key and nested shape (see cache_migration)
+        self.legacy_cache = legacy_cache
+        self.cache_policy = CachePolicy(
+            self.cache,
+            max_age_days=(
+                refresh_older_than_days
+                if refresh_older_than_days is not None
+                else self.config.get("cache_max_age_days")
+            ),
+            refresh_slice=refresh_slice,
+            evict_orphans_after_days=self.config.get("cache_evict_orphans_days"),
+            max_cache_bytes=int(cache_max_mb * 1024 * 1024) if cache_max_mb else None,
+            legacy_keys=legacy_cache,
+            # Batched runs read only SPARQL-built bundles, and other runs never do,
+            # so one run's statistics never mix the two kinds of literal ids
+            sparql_bundles=bool(batch_size),
+        )
     
     # ──────────────────────────────────────────────────────────────────────────
     # Fetch paper IRIs via SPARQL HTTP request
     # ──────────────────────────────────────────────────────────────────────────
+    def _query_sparql(self, params, headers=None):
+        headers = {"Accept": "application/sparql-results+json", **(headers or {})}
+        resp = self.transport.get(SPARQL_ENDPOINT, params=params, headers=headers)
+        raise_for_status(resp)
+        return resp
+
+    def run_sparql(self, query):
+        """Send a SPARQL query (with retries) and return the response."""
+        with self.metrics.observe_time("sparql_aggregate"):
+            return self.sparql_retry.call(self._query_sparql, {"query": query}, description="SPARQL aggregate")
+
+    def _request_listing_page(self, query, headers):
+        return self.sparql_retry.call(
+            self._query_sparql, {"query": query}, headers, description="SPARQL paper list"
+        )
+
+    def iter_paper_pages(self, stored_pages=None):
+        """Yield the pages of the template's paper listing, in paper IRI order (see sparql_listing)."""
+        for page in iter_listing_pages(
+            self._request_listing_page, self.config["sparql_query"], self.listing_page_size, stored_pages
+        ):
+            self.metrics.inc("listing_pages")
+            if page["not_modified"]:
+                self.metrics.inc("listing_pages_not_modified")
+            log.debug(f"Listing page after {page['after'] or 'the start'}: {len(page['papers'])} papers")
+            yield page
+
     def fetch_paper_list(self):
-        headers = {"Accept": "application/sparql-results+json"}
-        params = {"query": self.config["sparql_query"]}
-        resp = requests.get(SPARQL_ENDPOINT, headers=headers, params=params)
-        resp.raise_for_status()
-
-        print("**" * 100)
-        print(f"Response status: {resp.status_code}")
-        print(f"Response headers: {dict(resp.headers)}")
-        print(f"Response content type: {resp.headers.get('content-type', 'unknown')}")
-        print(f"Response text (first 500 chars): {resp.text[:500]}")
-        print("**" * 100)
-
-        content_type = resp.headers.get("content-type", "").lower()
-        if "json" not in content_type and resp.text.strip():
-            print(f"WARNING: Expected JSON but got content-type: {content_type}")
-            print(f"Full response text: {resp.text}")
-            return []
+        """Return the ids of the template's papers, deduplicated in listing order.
 
-        if not resp.text.strip():
-            print("WARNING: Received empty response")
+        Returns an empty list when the listing could not be read completely,
+        so a partial listing never counts papers as deleted.
+        """
+        query = self.config["sparql_query"]
+        if self.offline_store is not None:
+            return self.fetch_offline_paper_list(query)
+        listing_path = listing_path_for(self.config["output_csv"])
+        stored = load_listing(listing_path, query)
+        # The stored listing doubles as the index of papers the cache and CSV hold
+        self.previous_papers = stored["papers"] if stored else None
+        pages = []
+        try:
+            with self.metrics.timer("sparql_query"):
+                pages.extend(self.iter_paper_pages(stored["pages"] if stored else None))
+        except ValueError as e:
+            log.error(f"❌ Paper listing failed: {e}")
             return []
 
+        resource_ids = [paper_id for page in pages for paper_id in page["papers"]]
+        log.debug(f"Paper IDs: {resource_ids}")
+        self.metrics.set("papers_listed", len(resource_ids))
+        if all(page["not_modified"] for page in pages):
+            log.info(f"📋 Paper listing not modified, reusing {len(resource_ids)} papers")
+            self.metrics.inc("listing_not_modified")
+        elif resource_ids:
+            save_listing(listing_path, query, pages)
+        return resource_ids
+
+    def fetch_offline_paper_list(self, query):
+        """Evaluate the template query against the offline dump."""
         try:
-            data = resp.json()
-            print(f"Successfully parsed JSON response: {data}")
-            bindings = data.get("results", {}).get("bindings", [])
-            papers = [b["paper"]["value"] for b in bindings if "paper" in b]
-            resource_ids = [paper.split("/")[-1] for paper in papers]
-            print(resource_ids)
-            print("*" * 100)
-            return resource_ids
-        except json.JSONDecodeError as e:
-            print(f"ERROR: Failed to parse JSON response: {e}")
-            print(f"Response text: {resp.text}")
+            with self.metrics.timer("sparql_query"):
+                resource_ids = self.offline_store.template_papers(query)
+        except ValueError as e:
+            log.error(f"❌ Template query cannot be evaluated offline: {e}")
             return []
+        log.debug(f"Paper IDs: {resource_ids}")
+        self.metrics.set("papers_listed", len(resource_ids))
+        return resource_ids
 
     # ──────────────────────────────────────────────────────────────────────────
-    # JSON cache helpers
+    # Cache helpers (delegate to the configured cache backend)
     # ──────────────────────────────────────────────────────────────────────────
-    def iri_to_filename(self, iri: str) -> str:
-        h = hashlib.sha256(iri.encode("utf-8")).hexdigest()
-        return os.path.join(self.cache_dir, f"{h}.json")
-
     def load_cached(self, iri: str):
-        path = self.iri_to_filename(iri)
-        if os.path.exists(path):
-            return json.load(open(path, "r"))
+        return self.cache.get(iri)
+
+    def cache_token(self, paper_id: str):
+        """Cheap change marker of a paper's cache entry, or None."""
+        for key in self.cache_policy.lookup_keys(paper_id):
+            token = self.cache.token(key)
+            if token is not None:
+                return token
         return None
 
-    def save_cache(self, iri: str, statements):
-        path = self.iri_to_filename(iri)
-        with open(path, "w") as f:
-            json.dump({
-                "fetched_at": datetime.now(timezone.utc).isoformat(),
-                "statements": statements,
-            }, f)
+    def save_cache(self, iri: str, statements, validators=None, source=None):
+        self.cache.put(iri, new_entry(statements, validators, source))
+
+    def import_json_cache(self, papers):
+        """Copy the listed papers' entries from the template's per-file JSON cache
+        into the configured backend (used to seed a new SQLite or shared cache).
+
+        Entries are read under any key version and stored in the current schema.
+        """
+        source = JsonDirCache(self.cache_dir)
+        entries = {}
+        for paper_id in papers:
+            key = paper_cache_key(paper_id)
+            if self.shared_cache is not None and self.cache.token(key) is not None:
+                # Never replace a bundle another template already stored
+                continue
+            for source_key in paper_cache_keys(paper_id):
+                entry = source.get(source_key)
+                if entry is not None:
+                    entries[key] = normalize_entry(entry) or entry
+                    break
+        self.cache.put_many(entries.items())
+        log.info(f"📦 Imported {len(entries)} cache entries from {self.cache_dir} into {self.cache.location}")
 
     # ──────────────────────────────────────────────────────────────────────────
     # RPL metric calculation
@@ -208,236 +552,508 @@ class ORKGStatisticsProcessor:
         return (total, len(res_ids), len(lit_ids), len(pred_ids), res_ids, lit_ids, pred_ids)
 
     # ──────────────────────────────────────────────────────────────────────────
-    # Main processing loop
+    # Statement loading (cache first, then ORKG)
     # ──────────────────────────────────────────────────────────────────────────
-    def process_papers(self, papers, reload_data=False):
-        """Process all papers and return results with global distinct counts."""
-        results = []
-        all_res_ids = set()
-        all_lit_ids = set()
-        all_pred_ids = set()
-
-        for i, paper in enumerate(papers, 1):
-            paper_id = paper
-            paper_title = paper
-            print(f"[{i}/{len(papers)}] Processing: {paper_title}")
-
-            # Try multiple cache key formats for backward compatibility
-            cache_key_v2 = f"paper_v2_{paper_id}"
-            cache_key_v1 = paper_id  # Old format used just the paper_id
-            
-            statements = None
-            
-            if not reload_data:
-                # Try v2 cache key first, then fall back to v1
-                cached_data = self.load_cached(cache_key_v2)
-                if not cached_data:
-                    cached_data = self.load_cached(cache_key_v1)
-                
-                if cached_data:
-                    print(f"  Using cached data for {paper_id}")
-                    # Handle both old and new cache formats
-                    if isinstance(cached_data.get("statements"), dict) and "statements" in cached_data["statements"]:
-                        # Old format: {"fetched_at": "...", "statements": {"statements": [...]}}
-                        statements = cached_data["statements"]["statements"]
-                    else:
-                        # New format: {"statements": [...]}
-                        statements = cached_data["statements"]
-                else:
-                    print(f"  Fetching fresh data for {paper_id}")
-                    try:
-                        bundle = orkg.statements.bundle(thing_id=paper_id)
-                        statements = bundle.content["statements"]
-                        self.save_cache(cache_key_v2, statements)
-                    except Exception as e:
-                        print(f"  Error fetching {paper_id}: {e}")
-                        continue
-            else:
-                print(f"  Fetching fresh data for {paper_id}")
-                try:
-                    bundle = orkg.statements.bundle(thing_id=paper_id)
-                    statements = bundle.content["statements"]
-                    self.save_cache(cache_key_v2, statements)
-                except Exception as e:
-                    print(f"  Error fetching {paper_id}: {e}")
-                    continue
+    def _request_bundle(self, thing_id, validators=None):
+        """GET a statements bundle; returns (statements, validators), or None
+        when validators show the cached bundle is still current."""
+        headers = {"Accept": "application/json", **conditional_headers(validators)}
+        with self.scheduler.host_slot(ORKG_HOST), self.metrics.observe_time("bundle_fetch"):
+            resp = self.transport.get(BUNDLE_URL.format(thing_id=thing_id), headers=headers)
+        self.metrics.inc("bundle_requests")
+        if is_not_modified(resp, validators):
+            return None
+        raise_for_status(resp)
+        return resp.json()["statements"], response_validators(resp)
+
+    def fetch_statements(self, paper_id, cached=None):
+        """Fetch a paper's statements bundle from ORKG and store it in the cache.
+
+        With the cached entry of a refresh, the request is conditional.
+        Returns (statements, source); source is "not-modified" when the
+        cached bundle was confirmed instead of downloaded again.
+        """
+        validators = cached.get("validators") if cached else None
 
-            total, res_count, lit_count, pred_count, res_ids, lit_ids, pred_ids = self.analyze_paper(statements)
+        def fetch():
+            result = self.rest_retry.call(self._request_bundle, paper_id, validators, description=f"bundle {paper_id}")
+            if result is None:
+                return self.entry_statements(cached), validators, True
+            return result + (False,)
 
-            all_res_ids.update(res_ids)
-            all_lit_ids.update(lit_ids)
-            all_pred_ids.update(pred_ids)
+        if self.shared_fetches is None:
+            (statements, validators, not_modified), shared = fetch(), False
+        else:
+            (statements, validators, not_modified), shared = self.shared_fetches.fetch(paper_id, fetch)
+            if shared:
+                self.metrics.inc("bundle_fetches_deduped")
+        source = "not-modified" if not_modified else "fetched"
+        if shared and self.shared_cache is not None:
+            # The template that fetched it stores it in the shared cache
+            return statements, source
+        # Rewritten even when not modified, which renews the entry's fetched_at
+        self.save_cache(paper_cache_key(paper_id), statements, validators)
+        return statements, source
+
+    def load_cached_entry(self, paper_id):
+        """Return a paper's cache entry, or None on a cache miss."""
+        # One key in a migrated cache; with --legacy_cache the v2 key first,
+        # then the old format that used just the paper_id
+        for key in self.cache_policy.lookup_keys(paper_id):
+            cached_data = self.load_cached(key)
+            if cached_data:
+                return cached_data
+        return None
 
-            results.append({
+    def entry_statements(self, entry):
+        """Statements of a cache entry (either entry shape with --legacy_cache)."""
+        return legacy_statements(entry) if self.legacy_cache else entry["statements"]
+
+    def load_cached_statements(self, paper_id):
+        """Return the cached statements for a paper, or None on a cache miss."""
+        cached_data = self.load_cached_entry(paper_id)
+        return self.entry_statements(cached_data) if cached_data else None
+
+    def load_paper_statements(self, paper_id, reload_data=False, revalidate=False):
+        """Return (statements, source) for a paper, fetching it on a cache miss.
+
+        source is "cache", "fetched", "batched" when a SPARQL batch of this
+        run stored it, "offline" when it was read from the offline dump, "not-modified" when a revalidated bundle was
+        unchanged, or "stale-cache" when a forced reload or revalidation
+        failed and the previously cached bundle was used instead.
+        """
+        if self.offline_store is not None:
+            return self.offline_store.bundle(paper_id), "offline"
+
+        if paper_id in self.prefetched:
+            statements = self.load_cached_statements(paper_id)
+            if statements is not None:
+                if self.shared_fetches is not None:
+                    self.shared_fetches.release(paper_id)
+                return statements, "batched"
+
+        if revalidate and not reload_data:
+            cached = self.load_cached_entry(paper_id)
+            try:
+                return self.fetch_statements(paper_id, cached)
+            except Exception:
+                if cached:
+                    return self.entry_statements(cached), "stale-cache"
+                raise
+
+        if not reload_data:
+            statements = self.load_cached_statements(paper_id)
+            if statements is not None:
+                if self.shared_fetches is not None and self.shared_fetches.release(paper_id):
+                    if self.shared_cache is not None:
+                        # Stored by another template earlier in this run
+                        self.metrics.inc("bundle_fetches_deduped")
+                elif self.shared_cache is not None and self.shared_cache.is_new(paper_id):
+                    # New to this template, but fetched for another one in an earlier run
+                    self.metrics.inc("shared_cache_hits")
+                return statements, "cache"
+
+        try:
+            return self.fetch_statements(paper_id)
+        except Exception:
+            if reload_data:
+                statements = self.load_cached_statements(paper_id)
+                if statements is not None:
+                    return statements, "stale-cache"
+            raise
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Streaming pipeline: list → load/fetch → analyze → fold → emit row
+    # ──────────────────────────────────────────────────────────────────────────
+    def plan_loads(self, papers, reload_data=False):
+        """Prepare loading papers' bundles; returns the papers to revalidate.
+
+        In batched mode the missing, due and (with reload_data) all bundles
+        are fetched in SPARQL batches first; papers a batch could not
+        provide are left to the per-paper REST fetch.
+        """
+        if self.offline_store is not None:
+            return set()
+        refresh = set() if reload_data else self.cache_policy.plan_refresh(papers)
+        if not reload_data:
+            self.cache.warm()
+        if self.batch_size:
+            due = [
+                paper_id for paper_id in dict.fromkeys(papers)
+                if reload_data or paper_id in refresh or self.cache_token(paper_id) is None
+            ]
+            with self.metrics.timer("batch_fetch"):
+                self.prefetched |= self.prefetch_batched(due)
+            refresh -= self.prefetched
+        return refresh
+
+    def prefetch_batched(self, papers):
+        """Fetch bundles in SPARQL batches (see sparql_bundles) and store them in
+        the cache under their own keys, which only batched runs read; returns
+        the ids of the papers stored."""
+        stored = set()
+        batches = 0
+        for start in range(0, len(papers), self.batch_size):
+            batch = papers[start:start + self.batch_size]
+            try:
+                bundles = fetch_bundles(self.run_sparql, batch)
+            except Exception as e:
+                log.warning(f"⚠️  Batch of {len(batch)} bundles failed, fetching them one by one: {e}")
+                continue
+            batches += 1
+            self.metrics.inc("bundle_batches")
+            for paper_id, statements in bundles.items():
+                self.save_cache(sparql_cache_key(paper_id), statements, source="sparql")
+                stored.add(paper_id)
+        if papers:
+            log.info(f"📦 Fetched {len(stored)}/{len(papers)} bundles in {batches} SPARQL batches")
+        return stored
+
+    def iter_statements(self, papers, reload_data=False):
+        """Load or fetch each paper's bundle and yield (paper_id, statements).
+
+        Bundles are loaded through the fetch scheduler, so with more than one
+        worker they are fetched in parallel; they are still yielded in paper
+        order, which keeps the CSV and global statistics deterministic.
+        Papers that cannot be loaded are recorded in failed_papers.
+        """
+        papers = list(papers)
+        refresh = self.plan_loads(papers, reload_data)
+
+        loaded = self.scheduler.map_ordered(
+            lambda paper_id: self.load_paper_statements(
+                paper_id, reload_data=reload_data, revalidate=paper_id in refresh
+            ),
+            papers,
+        )
+        for i, (paper_id, future) in enumerate(loaded, 1):
+            log.debug(f"[{i}/{len(papers)}] Processing: {paper_id}")
+            if i % PROGRESS_EVERY == 0 or i == len(papers):
+                log.info(f"[{i}/{len(papers)}] papers loaded")
+
+            try:
+                statements, source = future.result()
+            except Exception as e:
+                log.error(f"  ❌ Error fetching {paper_id}: {e}")
+                self.failed_papers.append((paper_id, str(e)))
+                continue
+
+            self.count_source(source)
+            if source in ("cache", "not-modified"):
+                log.debug(f"  Using cached data for {paper_id} ({source})")
+            elif source == "stale-cache":
+                log.warning(f"  ⚠️  Refresh failed, using previously cached data for {paper_id}")
+            else:
+                log.debug(f"  Fetched fresh data for {paper_id}")
+            yield paper_id, statements
+
+    def count_source(self, source):
+        """Count where a paper's bundle came from (cache hit/miss, 304, stale fallback)."""
+        self.metrics.inc({
+            "cache": "cache_hits",
+            "not-modified": "bundles_not_modified",
+            "stale-cache": "stale_cache_fallbacks",
+            "batched": "bundles_batched",
+            "offline": "bundles_offline",
+        }.get(source, "cache_misses"))
+
+    def iter_rows(self, loaded):
+        """Analyze each loaded bundle and yield its result row."""
+        for paper_id, statements in loaded:
+            with self.metrics.timer("analyze"):
+                total, res_count, lit_count, pred_count, res_ids, lit_ids, pred_ids = self.analyze_paper(statements)
+            yield {
                 "paper_id": paper_id,
-                "paper_title": paper_title,
+                "paper_title": paper_id,
+                "total_statements": total,
+                "resource_count": res_count,
+                "literal_count": lit_count,
+                "predicate_count": pred_count,
+                "resource_ids": res_ids,
+                "literal_ids": lit_ids,
+                "predicate_ids": pred_ids,
+            }
+
+    def journal_rows(self, papers, journal, rows):
+        """Yield rows in paper order: replayed from the journal, or freshly
+        analyzed (rows, for the papers the journal lacks) and journaled."""
+        row = next(rows, None)
+        for paper_id in papers:
+            if paper_id in journal.rows:
+                self.metrics.inc("papers_resumed")
+                yield journal.rows[paper_id]
+            elif row is not None and row["paper_id"] == paper_id:
+                journal.append(row)
+                yield row
+                row = next(rows, None)
+
+    def process_papers(self, papers, reload_data=False, sink=None, journal=None):
+        """Process all papers and return results with global distinct counts.
+
+        Each row is folded into the global accumulators as soon as it is
+        analyzed. Without a sink the rows are collected and returned; with a
+        sink (e.g. StreamingCsvWriter.write_row) each row is handed over and
+        dropped, so memory stays flat however many papers there are and the
+        returned results list is empty. With a journal (see
+        checkpoint_journal) completed rows are checkpointed, and papers it
+        already holds are replayed instead of processed.
+        """
+        papers = list(papers)
+        results = []
+        accumulator = GlobalStatsAccumulator(self.intern_ids)
+        pending = papers if journal is None else [paper_id for paper_id in papers if paper_id not in journal.rows]
+        rows = self.iter_rows(self.iter_statements(pending, reload_data=reload_data))
+        if journal is not None:
+            rows = self.journal_rows(papers, journal, rows)
+        for row in rows:
+            accumulator.add(row)
+            if sink is not None:
+                sink(row)
+            else:
+                results.append(row)
+
+        self.paper_count = accumulator.paper_count
+        self.paper_stats = accumulator.paper_stats
+        return results, accumulator.global_stats()
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Incremental processing loop
+    # ──────────────────────────────────────────────────────────────────────────
+    def _load_if_changed(self, paper_id, previous, reload_data=False, revalidate=False):
+        """Return (statements, source, cache_token); statements is None when the
+        cache file is untouched since the previous run."""
+        if previous is not None and not reload_data and not revalidate:
+            token = self.cache_token(paper_id)
+            if token is not None and token == previous.get("cache_token"):
+                return None, "unchanged", token
+        statements, source = self.load_paper_statements(paper_id, reload_data=reload_data, revalidate=revalidate)
+        return statements, source, self.cache_token(paper_id)
+
+    def process_papers_incremental(self, papers, state, reload_data=False, journal=None):
+        """Like process_papers, but only re-analyzes new or changed papers.
+
+        Papers whose cache file is untouched, or whose bundle fingerprint
+        matches the stored one, reuse the metrics kept in state. Global
+        totals and distinct counts are updated by delta. Each paper is counted
+        once, even if the listing returns it several times. Records replayed
+        from a journal are put into state first, so their papers count as
+        unchanged.
+        """
+        papers = list(dict.fromkeys(papers))
+        analyzed = 0
+        reused = 0
+        resumed = 0
+        if journal is not None:
+            listed = set(papers)
+            for paper_id, row in journal.rows.items():
+                if paper_id in listed:
+                    state.put(paper_id, {k: v for k, v in row.items() if k != "paper_id"})
+                    resumed += 1
+            self.metrics.inc("papers_resumed", resumed)
+
+        refresh = self.plan_loads(papers, reload_data)
+
+        loaded = self.scheduler.map_ordered(
+            lambda paper_id: self._load_if_changed(
+                paper_id, state.get(paper_id), reload_data=reload_data, revalidate=paper_id in refresh
+            ),
+            papers,
+        )
+        for i, (paper_id, future) in enumerate(loaded, 1):
+            try:
+                statements, source, token = future.result()
+            except Exception as e:
+                if state.get(paper_id) is not None:
+                    log.warning(f"[{i}/{len(papers)}] ⚠️  Error fetching {paper_id}, keeping previous metrics: {e}")
+                    reused += 1
+                else:
+                    log.error(f"[{i}/{len(papers)}] ❌ Error fetching {paper_id}: {e}")
+                    self.failed_papers.append((paper_id, str(e)))
+                continue
+
+            if statements is None:
+                self.metrics.inc("cache_unchanged")
+                reused += 1
+                continue
+
+            self.count_source(source)
+            fingerprint = fingerprint_statements(statements)
+            previous = state.get(paper_id)
+            if previous is not None and previous["fingerprint"] == fingerprint:
+                state.touch(paper_id, token)
+                reused += 1
+                continue
+
+            log.debug(f"[{i}/{len(papers)}] Analyzing {'changed' if previous else 'new'} paper: {paper_id} ({source})")
+            with self.metrics.timer("analyze"):
+                total, res_count, lit_count, pred_count, res_ids, lit_ids, pred_ids = self.analyze_paper(statements)
+            state.put(paper_id, {
+                "fingerprint": fingerprint,
+                "cache_token": token,
                 "total_statements": total,
                 "resource_count": res_count,
                 "literal_count": lit_count,
                 "predicate_count": pred_count,
-                "resource_ids": json.dumps(res_ids),
-                "literal_ids": json.dumps(lit_ids),
-                "predicate_ids": json.dumps(pred_ids),
+                "resource_ids": res_ids,
+                "literal_ids": lit_ids,
+                "predicate_ids": pred_ids,
             })
+            if journal is not None:
+                journal.append({"paper_id": paper_id, **state.get(paper_id)})
+            analyzed += 1
 
-        global_stats = {
-            "total_statements": sum(r["total_statements"] for r in results),
-            "total_resources": sum(r["resource_count"] for r in results),
-            "total_literals": sum(r["literal_count"] for r in results),
-            "total_predicates": sum(r["predicate_count"] for r in results),
-            "global_distinct_resources": len(all_res_ids),
-            "global_distinct_literals": len(all_lit_ids),
-            "global_distinct_predicates": len(all_pred_ids),
-        }
+        failed_ids = {paper_id for paper_id, _ in self.failed_papers}
+        removed = state.prune(paper_id for paper_id in papers if paper_id not in failed_ids)
+        for paper_id in removed:
+            log.debug(f"Removed paper from incremental state: {paper_id}")
+
+        self.results_changed = bool(analyzed or removed or resumed)
+        self.paper_count = len(state.papers)
+        log.info(f"♻️  Incremental run: {analyzed} analyzed, {reused} unchanged, {len(removed)} removed")
+
+        results = []
+        for paper_id in papers:
+            record = state.get(paper_id)
+            if record is None:
+                continue
+            results.append({
+                "paper_id": paper_id,
+                "paper_title": paper_id,
+                "total_statements": record["total_statements"],
+                "resource_count": record["resource_count"],
+                "literal_count": record["literal_count"],
+                "predicate_count": record["predicate_count"],
+                "resource_ids": record["resource_ids"],
+                "literal_ids": record["literal_ids"],
+                "predicate_ids": record["predicate_ids"],
+            })
 
-        return results, global_stats
+        self.paper_stats = {row["paper_id"]: paper_summary(row) for row in results}
+        return results, state.global_stats()
 
     # ──────────────────────────────────────────────────────────────────────────
     # Global distinct count calculation (standalone function for flexibility)
     # ──────────────────────────────────────────────────────────────────────────
     @staticmethod
-    def calculate_global_distinct_counts(all_statements):
+    def calculate_global_distinct_counts(all_statements, intern_ids=False):
         """Calculate global distinct counts across all papers.
 
         Args:
-            all_statements: Dictionary mapping paper_id to list of statements
+            all_statements: Dictionary mapping paper_id to list of statements, or
+                            any iterable of (paper_id, statements) pairs so bundles
+                            can be streamed instead of held in memory at once
+            intern_ids: Count on interned integer codes instead of Python sets
 
         Returns:
             Tuple of (global_distinct_resources, global_distinct_literals, global_distinct_predicates)
         """
-        all_res_ids = set()
-        all_lit_ids = set()
-        all_pred_ids = set()
-
-        for paper_id, statements in all_statements.items():
+        distinct = distinct_id_sets(intern_ids)
+        all_res_ids = distinct["resource_ids"]
+        all_lit_ids = distinct["literal_ids"]
+        all_pred_ids = distinct["predicate_ids"]
+
+        pairs = all_statements.items() if hasattr(all_statements, "items") else all_statements
+        for paper_id, statements in pairs:
+            res_ids, lit_ids, pred_ids = [], [], []
             for stmt in statements:
                 s = stmt.get("subject", {})
                 if s.get("_class") == "resource":
-                    all_res_ids.add(s.get("id"))
+                    res_ids.append(s.get("id"))
                 else:
-                    all_lit_ids.add(s.get("id"))
+                    lit_ids.append(s.get("id"))
 
                 o = stmt.get("object", {})
                 if o.get("_class") == "resource":
-                    all_res_ids.add(o.get("id"))
+                    res_ids.append(o.get("id"))
                 else:
-                    all_lit_ids.add(o.get("id"))
+                    lit_ids.append(o.get("id"))
 
                 p = stmt.get("predicate", {}).get("id")
                 if p:
-                    all_pred_ids.add(p)
-
-        return len(all_res_ids), len(all_lit_ids), len(all_pred_ids)
+                    pred_ids.append(p)
 
-    # ──────────────────────────────────────────────────────────────────────────
-    # Fetch statements bundle with cache
-    # ──────────────────────────────────────────────────────────────────────────
-    def fetch_bundle(self, resource_id, reload_data=False):
-        """Fetch statements bundle for a resource with caching."""
-        if not reload_data:
-            cached = self.load_cached(resource_id)
-            if cached:
-                return resource_id, cached["statements"]
+            all_res_ids.update(res_ids)
+            all_lit_ids.update(lit_ids)
+            all_pred_ids.update(pred_ids)
 
-        try:
-            bundle = orkg.statements.bundle(thing_id=resource_id)
-            stmts = bundle.content["statements"]
-            self.save_cache(resource_id, stmts)
-            return resource_id, stmts
-        except Exception as e:
-            print(f"Resource {resource_id} not found, skipping... ({e})")
-            return resource_id, []
+        return len(all_res_ids), len(all_lit_ids), len(all_pred_ids)
 
     # ──────────────────────────────────────────────────────────────────────────
     # Handle paper deletions - remove papers no longer in SPARQL results
     # ──────────────────────────────────────────────────────────────────────────
     def handle_paper_deletions(self, current_papers):
-        """Remove papers from CSV that are no longer in SPARQL results."""
+        """Drop papers that are no longer listed from the CSV and the cache.
+
+        Vanished papers are found by comparing with the previous listing
+        (or, before one was stored, the paper ids in the CSV). Their cache
+        entries are deleted under every key version, and the CSV is only
+        rewritten when it still holds one of them. Returns the number of
+        bytes reclaimed in the cache.
+        """
         results_file = self.config["output_csv"]
-        
-        if not os.path.exists(results_file):
-            return
+        previous = self.previous_papers
+        if previous is None:
+            previous = csv_paper_ids(results_file) if os.path.exists(results_file) else []
 
         current_papers_set = set(current_papers)
-        temp_file = results_file + ".tmp"
-
-        with open(results_file, "r") as infile, open(temp_file, "w") as outfile:
-            for line in infile:
-                if line.startswith("paper,") or line.startswith("paper_id,"):  # Keep header
-                    outfile.write(line)
-                else:
-                    paper_id = line.split(",")[0].strip()
-                    if paper_id in current_papers_set:
-                        outfile.write(line)
-                    else:
-                        print(f"Removing deleted paper: {paper_id}")
-                        # Also remove from cache
-                        cache_file = self.iri_to_filename(paper_id)
-                        if os.path.exists(cache_file):
-                            os.remove(cache_file)
-                            print(f"  - Removed cache file: {cache_file}")
-
-        # Replace original file with cleaned version
-        os.replace(temp_file, results_file)
-        print(f"Cleaned CSV file - removed deleted papers")
+        vanished = [paper_id for paper_id in dict.fromkeys(previous) if paper_id not in current_papers_set]
+        if not vanished:
+            return 0
+        for paper_id in vanished:
+            log.info(f"Removing deleted paper: {paper_id}")
+        self.metrics.inc("papers_deleted", len(vanished))
+
+        removed_rows = remove_csv_rows(results_file, vanished)
+        # Entries of a shared cache stay while another template references them
+        keep_cached = self.shared_cache.referenced_by_others() if self.shared_cache is not None else set()
+        entries, reclaimed = self.cache_policy.delete_papers(vanished, keep=keep_cached)
+        log.info(
+            f"🗑️  Removed {len(vanished)} deleted papers: {removed_rows} CSV rows, "
+            f"{entries} cache entries ({reclaimed / 1024:.1f} KiB reclaimed)"
+        )
+        return reclaimed
 
     # ──────────────────────────────────────────────────────────────────────────
     # Save results to CSV
     # ──────────────────────────────────────────────────────────────────────────
-    def save_results(self, results, global_stats):
-        """Save results to CSV file."""
-        df = pd.DataFrame(results)
-
-        # Add global statistics as separate columns (matching original format)
-        df["global_total_statements"] = global_stats["total_statements"]
-        df["global_total_resources"] = global_stats["total_resources"]
-        df["global_total_literals"] = global_stats["total_literals"]
-        df["global_total_predicates"] = global_stats["total_predicates"]
-        df["global_distinct_resources"] = global_stats["global_distinct_resources"]
-        df["global_distinct_literals"] = global_stats["global_distinct_literals"]
-        df["global_distinct_predicates"] = global_stats["global_distinct_predicates"]
-
-        # Calculate reuse ratios (with division by zero protection)
-        if global_stats["global_distinct_resources"] > 0:
-            df["resource_reuse_ratio"] = (
-                global_stats["total_resources"] / global_stats["global_distinct_resources"]
-            )
-        else:
-            df["resource_reuse_ratio"] = 0
-
-        if global_stats["global_distinct_literals"] > 0:
-            df["literal_reuse_ratio"] = (
-                global_stats["total_literals"] / global_stats["global_distinct_literals"]
-            )
-        else:
-            df["literal_reuse_ratio"] = 0
-
-        if global_stats["global_distinct_predicates"] > 0:
-            df["predicate_reuse_ratio"] = (
-                global_stats["total_predicates"] / global_stats["global_distinct_predicates"]
-            )
-        else:
-            df["predicate_reuse_ratio"] = 0
-
+    def save_results(self, results, global_stats, output_format="csv"):
+        """Save results to CSV file and/or the columnar .npz format."""
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-        df["timestamp"] = timestamp
+
+        if output_format in ("npz", "both"):
+            npz_path = os.path.splitext(self.config["output_csv"])[0] + ".npz"
+            with self.metrics.timer("npz_write"):
+                save_columnar_results(npz_path, results, global_stats, timestamp)
+            log.info(f"💾 Columnar results saved to {npz_path}")
+            if output_format == "npz":
+                return timestamp
 
         csv_path = self.config["output_csv"]
-        df.to_csv(csv_path, index=False)
-        print(f"💾 Results saved to {csv_path}")
+        with self.metrics.timer("csv_write"):
+            save_csv_results(csv_path, results, global_stats, timestamp)
+        log.info(f"💾 Results saved to {csv_path}")
         
         return timestamp
 
     # ──────────────────────────────────────────────────────────────────────────
     # Update Firebase
     # ──────────────────────────────────────────────────────────────────────────
-    def update_firebase(self, results, global_stats):
-        """Update Firebase with statistics."""
-        if not FIREBASE_AVAILABLE:
-            print("\n⚠️  Firebase not available - skipping update")
+    def update_firebase(self, paper_count, global_stats, verify=False, sync_papers=False):
+        """Update Firebase with statistics in one batched write.
+
+        Args:
+            paper_count: Number of papers in the results
+            global_stats: Global totals and distinct counts
+            verify: Read the document back after writing (one extra round trip)
+            sync_papers: Also sync per-paper documents (changed ones only, see
+                         FirebaseManager.sync_statistics)
+        """
+        firebase = load_firebase_integration()
+        if firebase is None:
+            log.warning("\n⚠️  Firebase not available - skipping update")
             return False
 
-        print("\n🔥 Updating Firebase...")
+        log.info("\n🔥 Updating Firebase...")
         try:
             possible_paths = [
                 "./firebase-service-account.json",
@@ -452,42 +1068,55 @@ class ORKGStatisticsProcessor:
                     break
 
             if not service_account_path:
-                print("Service account file not found, trying environment variable...")
+                log.info("Service account file not found, trying environment variable...")
 
-            firebase_manager = FirebaseManager(service_account_path)
+            firebase_manager = get_firebase_manager(service_account_path)
 
             stats_for_firebase = global_stats.copy()
-            stats_for_firebase["paperCount"] = len(results)
-
-            success = firebase_manager.update_statistics(
-                stats_for_firebase,
-                template_id=self.config["firebase_template_id"],
-                statistic_id=self.config["firebase_statistic_id"],
-            )
+            stats_for_firebase["paperCount"] = paper_count
+
+            with self.metrics.timer("firebase_write"):
+                if sync_papers:
+                    success = firebase_manager.sync_statistics(
+                        stats_for_firebase,
+                        self.paper_stats,
+                        firebase.manifest_path_for(self.config["output_csv"]),
+                        template_id=self.config["firebase_template_id"],
+                        statistic_id=self.config["firebase_statistic_id"],
+                        verify=verify,
+                        listed=self.listed_papers,
+                    )
+                else:
+                    success = firebase_manager.commit_statistics(
+                        stats_for_firebase,
+                        template_id=self.config["firebase_template_id"],
+                        statistic_id=self.config["firebase_statistic_id"],
+                        verify=verify,
+                    )
 
             if success:
-                print("✅ Firebase updated successfully")
+                log.info("✅ Firebase updated successfully")
             else:
-                print("❌ Firebase update failed - check error messages above")
+                log.error("❌ Firebase update failed - check error messages above")
             return success
         except Exception as e:
-            print(f"❌ Firebase update failed: {e}")
+            log.error(f"❌ Firebase update failed: {e}")
             return False
 
     # ──────────────────────────────────────────────────────────────────────────
     # Print summary
     # ──────────────────────────────────────────────────────────────────────────
-    def print_summary(self, results, global_stats):
+    def print_summary(self, paper_count, global_stats):
         """Print processing summary."""
-        print(f"\n📈 Summary for {self.config['name']}:")
-        print(f"  Papers processed: {len(results)}")
-        print(f"  Total statements: {global_stats['total_statements']:,}")
-        print(f"  Total resources: {global_stats['total_resources']:,}")
-        print(f"  Total literals: {global_stats['total_literals']:,}")
-        print(f"  Total predicates: {global_stats['total_predicates']:,}")
-        print(f"  Global distinct resources: {global_stats['global_distinct_resources']:,}")
-        print(f"  Global distinct literals: {global_stats['global_distinct_literals']:,}")
-        print(f"  Global distinct predicates: {global_stats['global_distinct_predicates']:,}")
+        log.info(f"\n📈 Summary for {self.config['name']}:")
+        log.info(f"  Papers processed: {paper_count}")
+        log.info(f"  Total statements: {global_stats['total_statements']:,}")
+        log.info(f"  Total resources: {global_stats['total_resources']:,}")
+        log.info(f"  Total literals: {global_stats['total_literals']:,}")
+        log.info(f"  Total predicates: {global_stats['total_predicates']:,}")
+        log.info(f"  Global distinct resources: {global_stats['global_distinct_resources']:,}")
+        log.info(f"  Global distinct literals: {global_stats['global_distinct_literals']:,}")
+        log.info(f"  Global distinct predicates: {global_stats['global_distinct_predicates']:,}")
 
         # Reuse ratios
         for metric, total_key, distinct_key in [
@@ -496,7 +1125,366 @@ class ORKGStatisticsProcessor:
             ("Predicate", "total_predicates", "global_distinct_predicates"),
         ]:
             ratio = global_stats[total_key] / global_stats[distinct_key] if global_stats[distinct_key] > 0 else 0
-            print(f"  {metric} reuse ratio: {ratio:.2f}")
+            log.info(f"  {metric} reuse ratio: {ratio:.2f}")
+
+        log.info(f"  Retries used: {self.retry_budget.used}/{self.retry_budget.max_retries}")
+        if self.failed_papers:
+            log.warning(f"\n⚠️  {len(self.failed_papers)} paper(s) could not be loaded and are missing from the results:")
+            for paper_id, reason in self.failed_papers:
+                log.warning(f"  - {paper_id}: {reason}")
+
+
+def report_path(path, template_key, multi):
+    """Per-template report path: {template} is substituted, and multi-template
+    runs without the placeholder get the template key appended."""
+    if "{template}" in path:
+        return path.replace("{template}", template_key)
+    if multi:
+        base, ext = os.path.splitext(path)
+        return f"{base}.{template_key}{ext}"
+    return path
+
+
+_report_lock = threading.Lock()
+
+
+def write_run_reports(processor, args, multi=False):
+    """Export the run metrics in the formats requested on the command line."""
+    metrics = processor.metrics
+    metrics.set("papers_processed", processor.paper_count)
+    metrics.set("papers_failed", len(processor.failed_papers))
+    metrics.set("retries_used", processor.retry_budget.used)
+    # Process-wide when several templates share the transport
+    for name, value in processor.transport.stats().items():
+        metrics.set(name, value)
+    peak_rss = peak_rss_bytes()
+    if peak_rss is not None:
+        metrics.set("peak_rss_mib", round(peak_rss / 2**20, 1))
+    if args.metrics_json:
+        path = report_path(args.metrics_json, processor.template_key, multi)
+        metrics.write_json(path)
+        log.info(f"📊 Run report saved to {path}")
+    if args.metrics_prom:
+        metrics.write_prometheus(report_path(args.metrics_prom, processor.template_key, multi))
+    if args.summary_markdown:
+        # Several templates may finish at the same time
+        with _report_lock:
+            metrics.append_markdown(args.summary_markdown, title=f"{processor.config['name']} run metrics")
+
+
+_firebase_lock = threading.Lock()
+_firebase_manager = None
+
+
+def get_firebase_manager(service_account_path):
+    """One FirebaseManager (and Firebase app) per process, shared by all templates."""
+    global _firebase_manager
+    with _firebase_lock:
+        if _firebase_manager is None:
+            _firebase_manager = load_firebase_integration().FirebaseManager(service_account_path)
+        return _firebase_manager
+
+
+class RunAbortedError(Exception):
+    """Raised when a run must stop before it overwrites results or Firebase."""
+
+
+def prepare_template(processor, args):
+    """List a template's papers and clean up after deleted ones; returns the papers to process."""
+    config = processor.config
+    metrics = processor.metrics
+    offline = processor.offline_store is not None
+    if not offline and not processor.legacy_cache and not check_schema(processor.cache):
+        raise CacheSchemaError(
+            f"Cache {processor.cache.location} predates schema v{CACHE_SCHEMA_VERSION}; "
+            f"run once with --migrate_cache (or pass --legacy_cache)"
+        )
+    log.info(f"🔍 Fetching {config['name']} papers from {'the offline dump' if offline else 'ORKG'}...")
+    papers = processor.fetch_paper_list()
+    if not papers:
+        # An empty listing is an outage far more often than an empty template;
+        # keep the previous CSV and Firebase totals instead of zeroing them
+        raise RunAbortedError(f"No papers listed for {config['name']}; keeping the previous results")
+
+    # Handle paper deletions - remove papers no longer in SPARQL results
+    # (an offline run never touches the cache, whose papers are those of ORKG)
+    if not offline:
+        with metrics.timer("deletions"):
+            metrics.set("cache_bytes_deleted", processor.handle_paper_deletions(papers))
+
+    # Evict cache entries of papers that are no longer listed
+    if not offline:
+        shared_cache = processor.shared_cache
+        live = papers
+        if shared_cache is not None:
+            shared_cache.update(papers)
+            live = shared_cache.live_papers()
+        with metrics.timer("cache_eviction"):
+            metrics.set("cache_bytes_evicted", processor.cache_policy.evict_orphans(live))
+
+    if args.limit:
+        papers = papers[:args.limit]
+        log.info(f"📊 Processing limited set of {len(papers)} papers")
+    else:
+        # Only a complete listing may delete per-paper Firebase documents
+        processor.listed_papers = list(papers)
+
+    if args.import_json_cache and (args.cache_backend != "json" or processor.shared_cache is not None):
+        processor.import_json_cache(papers)
+    return papers
+
+
+def report_shared_cache(processor):
+    """Record how much the shared cache saves over per-template caches."""
+    shared, saved_bytes = processor.shared_cache.savings(processor.cache)
+    processor.metrics.set("shared_cache_bundles", shared)
+    processor.metrics.set("shared_cache_bytes_saved", saved_bytes)
+    if shared:
+        log.info(
+            f"🔗 Shared cache: {shared} bundles are used by several templates "
+            f"({saved_bytes / (1024 * 1024):.1f} MiB stored once)"
+        )
+
+
+def run_template(processor, papers, args, multi=False):
+    """Process a template's papers, save the results and update Firebase."""
+    if args.engine == "pushdown":
+        return run_pushdown(processor, papers, args, multi=multi)
+    config = processor.config
+    metrics = processor.metrics
+    log.info(f"📊 Processing {len(papers)} papers...")
+
+    # Completed papers are checkpointed, so an interrupted run can be resumed
+    journal = CheckpointJournal(
+        journal_path_for(config["output_csv"]),
+        run_header(
+            processor.template_key,
+            config["sparql_query"],
+            "incremental" if args.incremental else "full",
+            source=processor.bundle_source,
+            intern_ids=processor.intern_ids,
+        ),
+        resume=args.resume,
+        checkpoint_every=args.checkpoint_every,
+        max_age=timedelta(hours=args.resume_max_age),
+    )
+    if journal.rows:
+        log.info(f"⏯️  Resuming from {journal.path}: {len(journal.rows)} papers already processed")
+
+    # Process papers; plain CSV runs stream rows to disk as they complete
+    state = None
+    writer = None
+    try:
+        with metrics.timer("process"):
+            if args.incremental:
+                state = IncrementalState.load(state_path_for(config["output_csv"]))
+                results, global_stats = processor.process_papers_incremental(
+                    papers, state, reload_data=args.reload_data, journal=journal
+                )
+            elif args.output_format == "csv":
+                writer = StreamingCsvWriter(config["output_csv"])
+                results, global_stats = processor.process_papers(
+                    papers, reload_data=args.reload_data, sink=writer.write_row, journal=journal
+                )
+            else:
+                results, global_stats = processor.process_papers(
+                    papers, reload_data=args.reload_data, journal=journal
+                )
+        if processor.shared_cache is not None:
+            report_shared_cache(processor)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        journal.close()
+        raise
+    finally:
+        processor.cache.close()
+
+    # Save results (an incremental run without changes keeps the existing CSV)
+    if writer is not None:
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        # Rows were already streamed during processing; this is the final pass
+        with metrics.timer("csv_write"):
+            writer.finalize(global_stats, timestamp)
+        log.info(f"💾 Results saved to {config['output_csv']}")
+    elif state is not None and not processor.results_changed and state.timestamp and os.path.exists(config["output_csv"]):
+        timestamp = state.timestamp
+        log.info(f"💾 No changes since {timestamp}, keeping {config['output_csv']}")
+    else:
+        timestamp = processor.save_results(results, global_stats, output_format=args.output_format)
+    if state is not None and (state.changed or state.timestamp != timestamp):
+        with metrics.timer("state_save"):
+            state.save(timestamp)
+    journal.discard()
+
+    # Print summary
+    processor.print_summary(processor.paper_count, global_stats)
+
+    # Update Firebase
+    if not args.no_firebase:
+        processor.update_firebase(
+            processor.paper_count,
+            global_stats,
+            verify=args.verify_firebase,
+            sync_papers=args.firebase_papers,
+        )
+    else:
+        log.info("\n⏭️  Skipping Firebase update (--no_firebase flag)")
+
+    write_run_reports(processor, args, multi=multi)
+    log.info(f"\n✅ Done! Timestamp: {timestamp}")
+
+
+def check_pushdown(processor, papers, sample_size, batch_size=DEFAULT_BATCH_SIZE):
+    """Compare pushdown counts with the bundle engine on an evenly spread sample
+    of papers; returns the number of papers whose counts differ."""
+    step = max(1, len(papers) // sample_size)
+    sample = papers[::step][:sample_size]
+    counts = paper_counts(processor.run_sparql, sample, batch_size)
+    mismatches = 0
+    for row in processor.iter_rows(processor.iter_statements(sample)):
+        differences = compare_counts(counts[row["paper_id"]], row)
+        if differences:
+            mismatches += 1
+            details = ", ".join(f"{field} {pushdown} vs {bundle}" for field, (pushdown, bundle) in differences.items())
+            log.warning(f"⚠️  Pushdown counts of {row['paper_id']} differ from its bundle: {details}")
+    processor.metrics.set("pushdown_check_papers", len(sample))
+    processor.metrics.set("pushdown_check_mismatches", mismatches)
+    if mismatches:
+        log.warning(f"⚠️  Pushdown cross-check: {mismatches}/{len(sample)} sampled papers differ from their bundles")
+    else:
+        log.info(f"✅ Pushdown cross-check: {len(sample)} sampled papers match their bundles")
+    return mismatches
+
+
+def run_pushdown(processor, papers, args, multi=False):
+    """Quick refresh: compute the statistics with SPARQL aggregate queries
+    instead of bundles (see sparql_pushdown.py).
+
+    Pushdown counts can differ from the bundle engine's, so they are never
+    written to Firebase, and the run stops before writing per-paper counts
+    when any paper of the cross-check sample differs from its bundle.
+    """
+    config = processor.config
+    metrics = processor.metrics
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    log.info(f"📊 Computing statistics of {len(papers)} papers with SPARQL aggregates...")
+    try:
+        with metrics.timer("pushdown"):
+            global_stats = template_stats(processor.run_sparql, config["sparql_query"])
+        processor.paper_count = len(papers)
+
+        if args.pushdown_check and papers:
+            with metrics.timer("pushdown_check"):
+                mismatches = check_pushdown(processor, papers, args.pushdown_check, args.pushdown_batch_size)
+            if mismatches:
+                raise RunAbortedError(
+                    f"Pushdown counts of {mismatches} sampled papers differ from their bundles; "
+                    f"use --engine bundle for {config['name']}"
+                )
+
+        if args.pushdown_per_paper:
+            with metrics.timer("pushdown_papers"):
+                counts = paper_counts(processor.run_sparql, papers, args.pushdown_batch_size)
+            path = counts_path_for(config["output_csv"])
+            save_counts_csv(path, counts, COUNT_FIELDS, timestamp)
+            log.info(f"💾 Per-paper counts saved to {path}")
+    finally:
+        processor.cache.close()
+
+    processor.print_summary(processor.paper_count, global_stats)
+    write_run_reports(processor, args, multi=multi)
+    log.info(f"\n✅ Done! Timestamp: {timestamp}")
+
+
+def run_templates(template_keys, args, make_processor, make_transport):
+    """Run several templates concurrently in this process.
+
+    All processors share one fetch scheduler (so --workers and
+    --max_per_host are global limits), one HTTP transport and one Firebase app. Papers listed by
+    more than one template are fetched once per run.
+    """
+    scheduler = FetchScheduler(max_workers=args.workers, per_host_limit=args.max_per_host)
+    transport = make_transport()
+    processors = [make_processor(key, scheduler, transport) for key in template_keys]
+
+    def in_thread(fn, *fn_args):
+        # Name the thread after the template so interleaved log lines can be told apart
+        threading.current_thread().name = fn_args[0].template_key
+        return fn(*fn_args)
+
+    failed = []
+
+    def results_of(futures):
+        """Yield (processor, result) of the templates that did not fail."""
+        for processor, future in futures:
+            try:
+                yield processor, future.result()
+            except Exception as e:
+                log.error(f"❌ {processor.config['name']} failed: {e}")
+                failed.append(processor.template_key)
+                processor.cache.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(processors)) as pool:
+            listed = list(results_of(
+                [(processor, pool.submit(in_thread, prepare_template, processor, args)) for processor in processors]
+            ))
+
+            expected = {}
+            for _, papers in listed:
+                for paper_id in set(papers):
+                    expected[paper_id] = expected.get(paper_id, 0) + 1
+            shared = SharedFetches(expected)
+            if len(shared):
+                log.info(f"🔗 {len(shared)} papers are listed by several templates and fetched once")
+
+            futures = []
+            for processor, papers in listed:
+                processor.shared_fetches = shared
+                futures.append((processor, pool.submit(in_thread, run_template, processor, papers, args, True)))
+            for _ in results_of(futures):
+                pass
+    finally:
+        scheduler.shutdown()
+        transport.close()
+    return 1 if failed else 0
+
+
+def migrate_caches(processors):
+    """Migrate the templates' bundle caches to the current schema (see cache_migration.py).
+
+    Legacy entries are found through the papers of each template's stored
+    listing, results CSV and shared cache manifest, and, for caches that
+    cannot list their keys, on disk; a cache used by several templates is
+    migrated once with all of their papers.
+    """
+    by_location = {}
+    for processor in processors:
+        config = processor.config
+        papers = set()
+        stored = load_listing(listing_path_for(config["output_csv"]), config["sparql_query"])
+        if stored:
+            papers.update(stored["papers"])
+        if os.path.exists(config["output_csv"]):
+            papers.update(csv_paper_ids(config["output_csv"]))
+        if processor.shared_cache is not None:
+            papers |= processor.shared_cache.live_papers()
+        cache, known = by_location.setdefault(processor.cache.location, (processor.cache, set()))
+        known |= papers
+
+    for location, (cache, papers) in by_location.items():
+        start = time.perf_counter()
+        stats = migrate_cache(cache, papers)
+        log.info(
+            f"🧳 Migrated {location} to schema v{CACHE_SCHEMA_VERSION} in {time.perf_counter() - start:.1f}s: "
+            f"{stats['moved']} moved to the current key, {stats['duplicates']} duplicates dropped, "
+            f"{stats['reshaped']} reshaped"
+        )
+    for processor in processors:
+        processor.cache.close()
+        processor.scheduler.shutdown()
+        processor.transport.close()
 
 
 def main():
@@ -511,53 +1499,306 @@ Examples:
   python orkg-statistics.py --template empire
   python orkg-statistics.py --template nlp4re --reload_data
   python orkg-statistics.py --template empire --limit 10 --no_firebase
+  python orkg-statistics.py --template empire --reload_data --workers 8
+  python orkg-statistics.py --template all --workers 8
+  python orkg-statistics.py --template all --shared_cache
+  python orkg-statistics.py --template all --migrate_cache
+  python orkg-statistics.py --template empire --engine pushdown
+  python orkg-statistics.py --template empire --offline orkg-dump.nt.gz --output_csv offline.csv
+  python orkg-statistics.py --template all --workers 8 --resume
 """
     )
     parser.add_argument(
         "--template", "-t",
         type=str,
+        nargs="+",
         required=True,
-        choices=list(TEMPLATE_CONFIGS.keys()),
-        help="Template to process"
+        choices=list(TEMPLATE_CONFIGS.keys()) + ["all"],
+        help="Template(s) to process; several templates (or 'all') run concurrently in one process"
     )
     parser.add_argument("--limit", type=int, help="Limit number of papers to process")
     parser.add_argument("--reload_data", action="store_true", help="Force reload all data")
     parser.add_argument("--no_firebase", action="store_true", help="Skip Firebase update")
+    parser.add_argument(
+        "--verify_firebase",
+        action="store_true",
+        help="Read the statistics document back after the Firebase write",
+    )
+    parser.add_argument(
+        "--firebase_papers",
+        action="store_true",
+        help="Also sync per-paper metrics to Firestore, writing only papers that changed since the last sync",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-analyze papers whose bundle changed since the last run",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: replay its checkpoint journal and process only the remaining papers",
+    )
+    parser.add_argument(
+        "--checkpoint_every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        metavar="N",
+        help=f"Papers per durable (fsync'd) checkpoint of the run journal (default: {DEFAULT_CHECKPOINT_EVERY})",
+    )
+    parser.add_argument(
+        "--resume_max_age",
+        type=float,
+        default=DEFAULT_MAX_AGE_HOURS,
+        metavar="HOURS",
+        help=f"With --resume, start from scratch if the interrupted run began longer ago "
+             f"(default: {DEFAULT_MAX_AGE_HOURS})",
+    )
+    parser.add_argument(
+        "--cache_backend",
+        choices=CACHE_BACKENDS,
+        default="json",
+        help="Bundle cache layout: one JSON file per paper, or a single SQLite file (default: json)",
+    )
+    parser.add_argument(
+        "--import_json_cache",
+        action="store_true",
+        help="Seed the selected cache backend (or the shared cache) from the template's per-file JSON cache",
+    )
+    parser.add_argument(
+        "--migrate_cache",
+        action="store_true",
+        help="Migrate the bundle cache to the current schema (one key per paper, flat entries) and exit",
+    )
+    parser.add_argument(
+        "--legacy_cache",
+        action="store_true",
+        help="Read a cache that was not migrated, probing the legacy bare-id key and entry shape",
+    )
+    parser.add_argument(
+        "--shared_cache",
+        nargs="?",
+        const=SHARED_CACHE_DIR,
+        metavar="DIR",
+        help=f"Use one bundle cache for all templates, keyed by resource id (default DIR: {SHARED_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--refresh_older_than",
+        "--refresh-older-than",
+        type=float,
+        metavar="DAYS",
+        help="Refetch cached bundles older than DAYS (default: the template's cache_max_age_days)",
+    )
+    parser.add_argument(
+        "--refresh_slice",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Also revalidate the N oldest cached bundles this run (rolling refresh)",
+    )
+    parser.add_argument(
+        "--cache_max_mb",
+        type=float,
+        help="Evict orphaned cache entries oldest-first while the cache is larger than this",
+    )
+    parser.add_argument(
+        "--output_format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Results format: CSV, compact columnar .npz (see results_format.py), or both (default: csv)",
+    )
+    parser.add_argument(
+        "--listing_page_size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        metavar="N",
+        help=f"Papers per SPARQL listing page, listed in IRI order; 0 lists all papers in one request, "
+        f"in the server's order (default: {DEFAULT_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("bundle", "pushdown"),
+        default="bundle",
+        help="bundle: analyze every paper's statements bundle; pushdown: quick refresh of the global "
+             "statistics with SPARQL aggregate queries, see sparql_pushdown.py (default: bundle)",
+    )
+    parser.add_argument(
+        "--pushdown_per_paper",
+        action="store_true",
+        help="With --engine pushdown, also count each paper's statements (written to <output>.pushdown.csv)",
+    )
+    parser.add_argument(
+        "--pushdown_batch_size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        metavar="N",
+        help=f"Papers per per-paper aggregate query (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--pushdown_check",
+        type=int,
+        default=DEFAULT_CHECK_SAMPLE,
+        metavar="N",
+        help="With --engine pushdown, cross-check the counts of N sampled papers against their bundles "
+             f"and stop if any differs (0 disables; default: {DEFAULT_CHECK_SAMPLE})",
+    )
+    parser.add_argument(
+        "--batch_fetch",
+        type=int,
+        nargs="?",
+        const=DEFAULT_BUNDLE_BATCH,
+        default=0,
+        metavar="N",
+        help=f"Fetch missing and due bundles N papers per SPARQL query instead of one REST request "
+             f"per paper; literals are counted by value, so these bundles are cached apart from the "
+             f"REST ones, results go to <output>.batch.csv and Firebase is not updated "
+             f"(default N: {DEFAULT_BUNDLE_BATCH}; see sparql_bundles.py)",
+    )
+    parser.add_argument(
+        "--offline",
+        metavar="DUMP",
+        help="Compute the statistics from a local ORKG RDF dump (N-Triples, optionally gzipped; other "
+             "formats need rdflib) instead of ORKG; implies --no_firebase, and results go to "
+             "<output>.offline.csv unless --output_csv is given (see offline_store.py)",
+    )
+    parser.add_argument(
+        "--offline_index",
+        metavar="PATH",
+        help="Where to keep the indexed dump (default: <DUMP>.index.sqlite, rebuilt when the dump changes)",
+    )
+    parser.add_argument(
+        "--intern_ids",
+        action="store_true",
+        help="Count global distinct IDs on interned integer codes (needs NumPy): slower than sets, "
+             "but much less memory on large corpora (see id_interning.py)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of parallel bundle fetches (default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--max_per_host",
+        type=int,
+        default=DEFAULT_PER_HOST_LIMIT,
+        help=f"Maximum concurrent requests per host (default: {DEFAULT_PER_HOST_LIMIT})",
+    )
+    parser.add_argument(
+        "--connect_timeout",
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        metavar="SECONDS",
+        help=f"HTTP connect timeout (default: {DEFAULT_CONNECT_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--read_timeout",
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        metavar="SECONDS",
+        help=f"HTTP read timeout (default: {DEFAULT_READ_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 when httpx is installed (pip install 'httpx[http2]')",
+    )
+    parser.add_argument(
+        "--log_level",
+        choices=LOG_LEVELS,
+        default="INFO",
+        help="Logging verbosity; DEBUG adds per-paper lines and the raw SPARQL response (default: INFO)",
+    )
+    parser.add_argument("--metrics_json", metavar="PATH", help="Write a JSON run report (timers, counters, histograms)")
+    parser.add_argument("--metrics_prom", metavar="PATH", help="Write the run metrics in Prometheus text format")
+    parser.add_argument(
+        "--summary_markdown",
+        metavar="PATH",
+        help="Append a Markdown metrics table to PATH (e.g. $GITHUB_STEP_SUMMARY)",
+    )
+    parser.add_argument("--cache_dir", help="Override the template's bundle cache directory")
+    parser.add_argument("--output_csv", help="Override the template's results CSV path")
     args = parser.parse_args()
 
-    # Initialize processor
-    processor = ORKGStatisticsProcessor(args.template)
-    config = processor.config
-
-    print(f"🔍 Fetching {config['name']} papers from ORKG...")
-    papers = processor.fetch_paper_list()
-
-    # Handle paper deletions - remove papers no longer in SPARQL results
-    processor.handle_paper_deletions(papers)
-
-    if args.limit:
-        papers = papers[:args.limit]
-        print(f"📊 Processing limited set of {len(papers)} papers")
-
-    print(f"📊 Processing {len(papers)} papers...")
-
-    # Process papers
-    results, global_stats = processor.process_papers(papers, reload_data=args.reload_data)
-
-    # Save results
-    timestamp = processor.save_results(results, global_stats)
-
-    # Print summary
-    processor.print_summary(results, global_stats)
-
-    # Update Firebase
-    if not args.no_firebase:
-        processor.update_firebase(results, global_stats)
-    else:
-        print("\n⏭️  Skipping Firebase update (--no_firebase flag)")
-
-    print(f"\n✅ Done! Timestamp: {timestamp}")
+    template_keys = list(TEMPLATE_CONFIGS) if "all" in args.template else list(dict.fromkeys(args.template))
+    multi = len(template_keys) > 1
+    if multi and (args.cache_dir or args.output_csv):
+        parser.error("--cache_dir and --output_csv can only be used with a single template")
+    if args.engine == "pushdown" and (args.limit or args.incremental):
+        parser.error("--limit and --incremental do not apply to --engine pushdown (its totals cover all papers)")
+    if args.offline and (args.engine == "pushdown" or args.batch_fetch or args.migrate_cache):
+        parser.error("--offline cannot be combined with --engine pushdown, --batch_fetch or --migrate_cache")
+    logging.basicConfig(
+        level=args.log_level,
+        format="[%(threadName)s] %(message)s" if multi else "%(message)s",
+        stream=sys.stdout,
+    )
+    offline_store = None
+    if args.engine == "pushdown" and not args.no_firebase:
+        log.info("⏭️  Pushdown run: Firebase will not be updated")
+        args.no_firebase = True
+    if args.batch_fetch and not args.no_firebase:
+        log.info("⏭️  Batched run: Firebase will not be updated")
+        args.no_firebase = True
+    if args.offline:
+        if not args.no_firebase:
+            log.info("⏭️  Offline run: Firebase will not be updated")
+            args.no_firebase = True
+        offline_store = OfflineStore(args.offline, args.offline_index)
+
+    def make_transport():
+        return Transport(
+            pool_size=args.workers + 1,
+            connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout,
+            http2=args.http2,
+        )
+
+    def make_processor(template_key, scheduler=None, transport=None):
+        return ORKGStatisticsProcessor(
+            template_key,
+            workers=args.workers,
+            per_host_limit=args.max_per_host,
+            cache_backend=args.cache_backend,
+            refresh_older_than_days=args.refresh_older_than,
+            refresh_slice=args.refresh_slice,
+            cache_max_mb=args.cache_max_mb,
+            cache_dir=args.cache_dir,
+            output_csv=args.output_csv,
+            scheduler=scheduler,
+            shared_cache_dir=args.shared_cache,
+            transport=transport or make_transport(),
+            legacy_cache=args.legacy_cache,
+            listing_page_size=args.listing_page_size,
+            batch_size=args.batch_fetch,
+            offline_store=offline_store,
+            intern_ids=args.intern_ids,
+        )
+
+    if args.migrate_cache:
+        migrate_caches([make_processor(key) for key in template_keys])
+        return 0
+
+    try:
+        if multi:
+            return run_templates(template_keys, args, make_processor, make_transport)
+
+        processor = make_processor(template_keys[0])
+        try:
+            papers = prepare_template(processor, args)
+            run_template(processor, papers, args)
+        except (CacheSchemaError, RunAbortedError) as e:
+            log.error(f"❌ {e}")
+            processor.cache.close()
+            return 1
+        finally:
+            processor.scheduler.shutdown()
+            processor.transport.close()
+        return 0
+    finally:
+        if offline_store is not None:
+            offline_store.close()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Results formats for the ORKG statistics scripts.
+
+StreamingCsvWriter writes the classic CSV layout row by row while papers
+are processed, and save_csv_results writes rows that were collected in
+memory; both use the stdlib csv module and produce the same bytes pandas'
+to_csv did. The compact columnar format is a compressed NumPy .npz
+archive with:
+- one array per per-paper metric column
+- the resource/literal/predicate ID lists dictionary-encoded against one
+  shared vocabulary, as flat int32 code arrays plus int64 row offsets
+- global statistics, reuse ratios and the timestamp in a single JSON
+  metadata record instead of being repeated on every row
+
+Pushdown runs (see sparql_pushdown.py) only have per-paper counts; they
+are written to a separate <base>.pushdown.csv by save_counts_csv.
+"""
+
+import csv
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
+
+# NumPy is only needed for the .npz format; plain CSV runs never import it
+if TYPE_CHECKING:
+    import numpy as np
+
+FORMAT_VERSION = 1
+OUTPUT_FORMATS = ("csv", "npz", "both")
+
+METRIC_COLUMNS = ("total_statements", "resource_count", "literal_count", "predicate_count")
+ID_COLUMNS = ("resource_ids", "literal_ids", "predicate_ids")
+
+# CSV layout of daily_results_incremental.csv
+PAPER_COLUMNS = ("paper_id", "paper_title") + METRIC_COLUMNS + ID_COLUMNS
+GLOBAL_COLUMNS = (
+    ("global_total_statements", "total_statements"),
+    ("global_total_resources", "total_resources"),
+    ("global_total_literals", "total_literals"),
+    ("global_total_predicates", "total_predicates"),
+    ("global_distinct_resources", "global_distinct_resources"),
+    ("global_distinct_literals", "global_distinct_literals"),
+    ("global_distinct_predicates", "global_distinct_predicates"),
+)
+RATIO_COLUMNS = ("resource_reuse_ratio", "literal_reuse_ratio", "predicate_reuse_ratio")
+CSV_COLUMNS = PAPER_COLUMNS + tuple(column for column, _ in GLOBAL_COLUMNS) + RATIO_COLUMNS + ("timestamp",)
+
+
+def reuse_ratios(global_stats: Dict[str, int]) -> Dict[str, float]:
+    """Reuse ratios (total / distinct) with division by zero protection."""
+    ratios = {}
+    for name, total_key, distinct_key in (
+        ("resource_reuse_ratio", "total_resources", "global_distinct_resources"),
+        ("literal_reuse_ratio", "total_literals", "global_distinct_literals"),
+        ("predicate_reuse_ratio", "total_predicates", "global_distinct_predicates"),
+    ):
+        distinct = global_stats[distinct_key]
+        ratios[name] = global_stats[total_key] / distinct if distinct > 0 else 0
+    return ratios
+
+
+def _paper_cells(row: Dict[str, Any]) -> List[Any]:
+    # ID lists are stored as JSON-encoded strings in the CSV
+    return [json.dumps(row[column]) if column in ID_COLUMNS else row[column] for column in PAPER_COLUMNS]
+
+
+def _global_cells(global_stats: Dict[str, int], timestamp: str) -> List[Any]:
+    """The global columns, identical on every row."""
+    ratios = reuse_ratios(global_stats)
+    return (
+        [global_stats[key] for _, key in GLOBAL_COLUMNS]
+        + [ratios[column] for column in RATIO_COLUMNS]
+        + [timestamp]
+    )
+
+
+def save_csv_results(path: str, results: Iterable[Dict[str, Any]], global_stats: Dict[str, int], timestamp: str):
+    """Write result rows in the CSV layout of daily_results_incremental.csv.
+
+    Args:
+        path: Target CSV file (replaced atomically)
+        results: Per-paper rows as produced by process_papers (ID fields as lists)
+        global_stats: Global totals and distinct counts
+        timestamp: Run timestamp written on every row
+    """
+    suffix = _global_cells(global_stats, timestamp)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS)
+        for row in results:
+            writer.writerow(_paper_cells(row) + suffix)
+    os.replace(tmp_path, path)
+
+
+def counts_path_for(output_csv: str) -> str:
+    return os.path.splitext(output_csv)[0] + ".pushdown.csv"
+
+
+def offline_path_for(output_csv: str) -> str:
+    """Default results path of an --offline run, kept apart from the template's CSV."""
+    return os.path.splitext(output_csv)[0] + ".offline.csv"
+
+
+def batch_path_for(output_csv: str) -> str:
+    """Default results path of a --batch_fetch run, kept apart from the template's CSV."""
+    return os.path.splitext(output_csv)[0] + ".batch.csv"
+
+
+def save_counts_csv(path: str, counts: Dict[str, Dict[str, int]], fields: Iterable[str], timestamp: str):
+    """Write per-paper counts (no ID lists) as paper_id, *fields, timestamp rows."""
+    fields = list(fields)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["paper_id"] + fields + ["timestamp"])
+        for paper_id, paper_counts in counts.items():
+            writer.writerow([paper_id] + [paper_counts[field] for field in fields] + [timestamp])
+    os.replace(tmp_path, path)
+
+
+def _raise_field_limit():
+    # ID list fields of large papers exceed the csv module's default limit
+    csv.field_size_limit(max(csv.field_size_limit(), 2**31 - 1))
+
+
+def csv_paper_ids(path: str) -> List[str]:
+    """Paper ids (first column) of an existing results CSV, without its header."""
+    _raise_field_limit()
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [row[0] for row in reader if row]
+
+
+def remove_csv_rows(path: str, paper_ids: Iterable[str]) -> int:
+    """Drop the rows of the given papers from a results CSV; returns the number removed.
+
+    The file is only rewritten (atomically) when it contains one of the papers.
+    """
+    paper_ids = set(paper_ids)
+    if not paper_ids or not os.path.exists(path):
+        return 0
+    if paper_ids.isdisjoint(csv_paper_ids(path)):
+        return 0
+
+    removed = 0
+    tmp_path = path + ".tmp"
+    with open(path, "r", newline="") as infile, open(tmp_path, "w", newline="") as outfile:
+        reader = csv.reader(infile)
+        writer = csv.writer(outfile, lineterminator="\n")
+        header = next(reader, None)
+        if header is not None:
+            writer.writerow(header)
+        for row in reader:
+            if row and row[0] in paper_ids:
+                removed += 1
+            else:
+                writer.writerow(row)
+    os.replace(tmp_path, path)
+    return removed
+
+
+class StreamingCsvWriter:
+    """Writes result rows to CSV as they are produced.
+
+    Per-paper columns go to a spill file (<path>.partial) right away. The
+    global columns are only known at the end, so finalize() streams the
+    spill into the final CSV, appending them to every row. Memory use does
+    not depend on the number of papers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.spill_path = path + ".partial"
+        self.rows_written = 0
+        self._spill = open(self.spill_path, "w", newline="")
+        self._writer = csv.writer(self._spill, lineterminator="\n")
+
+    def write_row(self, row: Dict[str, Any]):
+        self._writer.writerow(_paper_cells(row))
+        self.rows_written += 1
+
+    def finalize(self, global_stats: Dict[str, int], timestamp: str):
+        """Write the final CSV with the global columns and remove the spill file."""
+        self._spill.close()
+        suffix = _global_cells(global_stats, timestamp)
+        _raise_field_limit()
+        tmp_path = self.path + ".tmp"
+        with open(self.spill_path, "r", newline="") as spill, open(tmp_path, "w", newline="") as out:
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(CSV_COLUMNS)
+            for row in csv.reader(spill):
+                writer.writerow(row + suffix)
+        os.replace(tmp_path, self.path)
+        os.remove(self.spill_path)
+
+    def abort(self):
+        """Drop the spill file after a failed run, leaving the previous CSV alone."""
+        self._spill.close()
+        if os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+
+def save_columnar_results(path: str, results: List[Dict[str, Any]], global_stats: Dict[str, int], timestamp: str):
+    """Write results to a compressed .npz archive.
+
+    Args:
+        path: Target file (NumPy appends .npz if missing)
+        results: Per-paper rows as produced by process_papers (ID fields as lists)
+        global_stats: Global totals and distinct counts
+        timestamp: Run timestamp stored in the metadata record
+    """
+    import numpy as np
+
+    arrays = {
+        "paper_id": np.array([r["paper_id"] for r in results], dtype=str),
+        "paper_title": np.array([r["paper_title"] for r in results], dtype=str),
+    }
+    for column in METRIC_COLUMNS:
+        arrays[column] = np.array([r[column] for r in results], dtype=np.int64)
+
+    # Encode all three ID columns against one vocabulary
+    lengths = {column: np.array([len(r[column]) for r in results], dtype=np.int64) for column in ID_COLUMNS}
+    all_ids = [item for column in ID_COLUMNS for r in results for item in r[column]]
+    vocab, codes = np.unique(np.array(all_ids, dtype=str), return_inverse=True)
+    codes = codes.astype(np.int32)
+    arrays["id_vocab"] = vocab
+
+    start = 0
+    for column in ID_COLUMNS:
+        size = int(lengths[column].sum())
+        arrays[f"{column}_codes"] = codes[start:start + size]
+        arrays[f"{column}_offsets"] = np.concatenate(([0], np.cumsum(lengths[column]))).astype(np.int64)
+        start += size
+
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "timestamp": timestamp,
+        "paper_count": len(results),
+        "global_stats": global_stats,
+        "reuse_ratios": reuse_ratios(global_stats),
+    }
+    arrays["metadata"] = np.array(json.dumps(metadata))
+    np.savez_compressed(path, **arrays)
+
+
+class ColumnarResults:
+    """Read access to a results archive written by save_columnar_results."""
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            self.arrays = {name: data[name] for name in data.files}
+        self.metadata = json.loads(str(self.arrays.pop("metadata")))
+        if self.metadata.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported results format version {self.metadata.get('format_version')} in {path}"
+            )
+
+    @property
+    def global_stats(self) -> Dict[str, int]:
+        return self.metadata["global_stats"]
+
+    @property
+    def timestamp(self) -> str:
+        return self.metadata["timestamp"]
+
+    def __len__(self) -> int:
+        return len(self.arrays["paper_id"])
+
+    def id_codes(self, column: str, index: int) -> "np.ndarray":
+        """Dictionary codes of one paper's IDs for column (no string decoding)."""
+        offsets = self.arrays[f"{column}_offsets"]
+        return self.arrays[f"{column}_codes"][offsets[index]:offsets[index + 1]]
+
+    def ids(self, column: str, index: int) -> List[str]:
+        return self.arrays["id_vocab"][self.id_codes(column, index)].tolist()
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """One paper's row in the same shape process_papers produces."""
+        row = {
+            "paper_id": str(self.arrays["paper_id"][index]),
+            "paper_title": str(self.arrays["paper_title"][index]),
+        }
+        for column in METRIC_COLUMNS:
+            row[column] = int(self.arrays[column][index])
+        for column in ID_COLUMNS:
+            row[column] = self.ids(column, index)
+        return row
+
+    def rows(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+
+def load_columnar_results(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Load a results archive and return (results, metadata)."""
+    columnar = ColumnarResults(path)
+    return list(columnar.rows()), columnar.metadata
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Retry handling for the ORKG statistics scripts.
+Provides exponential backoff with jitter, Retry-After support, a per-run
+retry budget and a circuit breaker shared by all calls against one service.
+"""
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+log = logging.getLogger(__name__)
+
+# HTTP status codes that are worth retrying
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class HTTPStatusError(Exception):
+    """Raised when a service answers with a non-success HTTP status."""
+
+    def __init__(self, status_code: int, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = int(status_code)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def raise_for_status(response):
+    """Like requests' raise_for_status, but keeps the status code and Retry-After."""
+    if response.status_code < 400:
+        return
+    raise HTTPStatusError(
+        response.status_code,
+        f"HTTP {response.status_code} for {response.url}",
+        retry_after=parse_retry_after(response.headers.get("Retry-After")),
+    )
+
+
+def is_retryable(error: Exception) -> bool:
+    """Return True for errors that are likely to go away on a later attempt."""
+    import requests  # deferred: only needed once a call has failed
+
+    if isinstance(error, HTTPStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError))
+
+
+def _retry_after_of(error: Exception) -> Optional[float]:
+    import requests
+
+    if isinstance(error, HTTPStatusError):
+        return error.retry_after
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return parse_retry_after(error.response.headers.get("Retry-After"))
+    return None
+
+
+class RetryBudget:
+    """Caps the number of retries spent during one run across all calls."""
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max(0, int(max_retries))
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.max_retries - self.used)
+
+
+class CircuitBreaker:
+    """Stops calling a service after repeated failures until a cool-down passes.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast with CircuitOpenError. Once reset_timeout seconds have passed a
+    single trial call is let through; success closes the circuit again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError(f"circuit for {self.name} is open")
+            # Half-open: let exactly one trial call through
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    log.warning(f"⚠️  Circuit for {self.name} opened after {self.consecutive_failures} failures")
+                self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """Calls a function, retrying transient failures with backoff and jitter."""
+
+    def __init__(
+        self,
+        max_retries: int,
+        max_delay: float,
+        base_delay: float = 0.5,
+        max_retry_after: float = 60.0,
+        budget: Optional[RetryBudget] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Create a retry policy.
+
+        Args:
+            max_retries: Retries per call after the first attempt
+            max_delay: Upper bound for the computed backoff delay in seconds
+            base_delay: Backoff delay for the first retry in seconds
+            max_retry_after: Upper bound for honouring a server's Retry-After
+            budget: Optional run-wide retry budget shared between policies
+            breaker: Optional circuit breaker for the called service
+            sleep: Sleep function (injectable for benchmarks)
+        """
+        self.max_retries = max(0, int(max_retries))
+        self.max_delay = max_delay
+        self.base_delay = base_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+        self.breaker = breaker
+        self.sleep = sleep
+
+    def backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Delay before retry number `attempt` (1-based), using full jitter."""
+        retry_after = _retry_after_of(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def call(self, fn: Callable, *args, description: str = "", **kwargs):
+        """Run fn(*args, **kwargs) and return its result, retrying transient errors."""
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_call()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                retryable = is_retryable(e)
+                if self.breaker is not None:
+                    # A definitive answer (e.g. 404) still shows the service is up
+                    if retryable:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                attempt += 1
+                if not retryable or attempt > self.max_retries:
+                    raise
+                if self.budget is not None and not self.budget.try_spend():
+                    log.warning(f"  Retry budget exhausted, not retrying {description or fn}")
+                    raise
+                delay = self.backoff_delay(attempt, e)
+                log.info(f"  Retry {attempt}/{self.max_retries} for {description or fn} in {delay:.1f}s ({e})")
+                self.sleep(delay)
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
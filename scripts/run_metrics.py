@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Run metrics for the ORKG statistics scripts.
+
+RunMetrics collects counters, timers (total seconds and call count) and
+latency histograms from any thread during a run, and exports them as a
+JSON run report, Prometheus text exposition format, or a Markdown table
+for the GitHub Actions step summary.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+
+REPORT_VERSION = 1
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROMETHEUS_PREFIX = "orkg_stats"
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None if unavailable.
+
+    VmHWM is preferred over getrusage() because ru_maxrss also covers the
+    memory of the parent process before it exec'd this one.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Histogram:
+    """Fixed-bucket histogram, exported cumulatively like Prometheus."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound, cumulative count), ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): total for bound, total in self.cumulative()},
+        }
+
+
+class RunMetrics:
+    """Thread-safe counters, timers, gauges and histograms of one run."""
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None):
+        self.labels = dict(labels or {})
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.timers: Dict[str, Dict[str, float]] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            timer = self.timers.setdefault(name, {"seconds": 0.0, "count": 0})
+            timer["seconds"] += seconds
+            timer["count"] += 1
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time a block and add it to the named timer (also on exceptions)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def observe_time(self, name: str):
+        """Time a block and record the duration in the named histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Exports
+    # ──────────────────────────────────────────────────────────────────────────
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "report_version": REPORT_VERSION,
+                "labels": dict(self.labels),
+                "started_at": self.started_at.isoformat(),
+                "wall_seconds": time.perf_counter() - self._start,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timers": {name: dict(timer) for name, timer in self.timers.items()},
+                "histograms": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+            }
+
+    def write_json(self, path: str):
+        _write_atomic(path, json.dumps(self.as_dict(), indent=2))
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        report = self.as_dict()
+
+        def labels(extra=None):
+            items = dict(self.labels, **(extra or {}))
+            if not items:
+                return ""
+            return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(items.items())) + "}"
+
+        lines = []
+        for name, value in sorted(report["counters"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric}{labels()} {value}"]
+        for name, value in sorted(report["gauges"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{name}"
+            lines += [f"# TYPE {metric} gauge", f"{metric}{labels()} {value}"]
+        for name, timer in sorted(report["timers"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{name}_seconds"
+            lines += [
+                f"# TYPE {metric} summary",
+                f"{metric}_sum{labels()} {timer['seconds']:.6f}",
+                f"{metric}_count{labels()} {timer['count']}",
+            ]
+        for name, histogram in sorted(self.histograms.items()):
+            metric = f"{PROMETHEUS_PREFIX}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, total in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{labels({'le': le})} {total}")
+            lines += [f"{metric}_sum{labels()} {histogram.sum:.6f}", f"{metric}_count{labels()} {histogram.count}"]
+        metric = f"{PROMETHEUS_PREFIX}_run_wall_seconds"
+        lines += [f"# TYPE {metric} gauge", f"{metric}{labels()} {report['wall_seconds']:.6f}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        _write_atomic(path, self.to_prometheus())
+
+    def to_markdown(self, title: str = "Run metrics") -> str:
+        """A compact Markdown summary (timers by time spent, then counters)."""
+        report = self.as_dict()
+        lines = [f"### {title}", "", f"Wall time: **{report['wall_seconds']:.1f} s**", ""]
+        if report["timers"]:
+            lines += ["| Stage | Time (s) | Calls |", "| --- | ---: | ---: |"]
+            for name, timer in sorted(report["timers"].items(), key=lambda item: -item[1]["seconds"]):
+                lines.append(f"| {name} | {timer['seconds']:.2f} | {timer['count']} |")
+            lines.append("")
+        for name, histogram in sorted(report["histograms"].items()):
+            if histogram["count"]:
+                mean = histogram["sum"] / histogram["count"]
+                lines.append(f"- {name}: {histogram['count']} observations, mean {mean * 1000:.0f} ms")
+        for name, value in sorted(dict(report["counters"], **report["gauges"]).items()):
+            lines.append(f"- {name}: {value:,}")
+        return "\n".join(lines) + "\n"
+
+    def append_markdown(self, path: str, title: str = "Run metrics"):
+        with open(path, "a") as f:
+            f.write(self.to_markdown(title) + "\n")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path: str, text: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Shared bundle cache membership for the ORKG statistics scripts.
+
+With --shared_cache all templates store their bundles in one cache keyed
+by ORKG resource id, so a paper listed by several templates is fetched and
+stored once. Each template records the papers it references in a
+membership manifest (<cache_dir>/manifests/<template>.json): eviction keeps
+every entry that any manifest references, and the manifests show how many
+requests and bytes the sharing saves.
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from cache_policy import paper_cache_keys
+
+log = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def manifest_dir_for(cache_dir: str) -> str:
+    return os.path.join(cache_dir, "manifests")
+
+
+class SharedCacheManifests:
+    """Per-template membership manifests of a shared bundle cache."""
+
+    def __init__(self, cache_dir: str, template_key: str):
+        """Open the manifests of a shared cache.
+
+        Args:
+            cache_dir: Directory of the shared cache (the SQLite backend keeps
+                       its manifests there too)
+            template_key: Template whose manifest this instance maintains
+        """
+        self.directory = manifest_dir_for(cache_dir)
+        self.template_key = template_key
+        self.path = os.path.join(self.directory, f"{template_key}.json")
+        # Papers the template referenced in its previous run (None before its first shared run)
+        self.previous = self._read(self.path)
+        self.current: Set[str] = set(self.previous or ())
+
+    @staticmethod
+    def _read(path: str) -> Optional[Set[str]]:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️  Ignoring unreadable cache manifest {path}: {e}")
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return set(data.get("papers", []))
+
+    def others(self) -> Dict[str, Set[str]]:
+        """Papers referenced by every other template, by template key."""
+        memberships = {}
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return memberships
+        for name in names:
+            template_key, ext = os.path.splitext(name)
+            if ext != ".json" or template_key == self.template_key:
+                continue
+            papers = self._read(os.path.join(self.directory, name))
+            if papers is not None:
+                memberships[template_key] = papers
+        return memberships
+
+    def referenced_by_others(self) -> Set[str]:
+        return set().union(*self.others().values())
+
+    def update(self, papers: Iterable[str]):
+        """Record the papers the template currently references."""
+        self.current = set(papers)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "template": self.template_key,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "papers": sorted(self.current),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def live_papers(self) -> Set[str]:
+        """Papers whose entries must survive eviction (referenced by any template)."""
+        return self.current | self.referenced_by_others()
+
+    def is_new(self, paper_id: str) -> bool:
+        """Whether the paper joined this template since its previous run, so a
+        cache hit on it was fetched on behalf of another template."""
+        return self.previous is not None and paper_id not in self.previous
+
+    def savings(self, cache) -> Tuple[int, int]:
+        """Return (bundles referenced by several templates, bytes they would
+        take up again in per-template caches)."""
+        refs = Counter(self.current)
+        for papers in self.others().values():
+            refs.update(papers)
+        shared = [paper_id for paper_id, count in refs.items() if count > 1]
+        if not shared:
+            return 0, 0
+
+        sizes = {entry_id: size for entry_id, _, size in cache.iter_entries()}
+        saved_bytes = 0
+        for paper_id in shared:
+            for key in paper_cache_keys(paper_id):
+                size = sizes.get(cache.entry_id(key))
+                if size is not None:
+                    saved_bytes += size * (refs[paper_id] - 1)
+                    break
+        return len(shared), saved_bytes
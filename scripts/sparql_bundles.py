@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Batched statement bundle retrieval over SPARQL.
+
+The REST bundle endpoint serves one paper per request. fetch_bundles
+selects the statement subgraphs of a whole batch of papers (a VALUES
+block) in one SPARQL query and splits the rows back into per-paper
+bundles shaped like the REST ones, as far as analyze_paper reads them:
+    {"subject": {"id", "_class"}, "predicate": {"id"}, "object": {"id", "_class"}}
+
+Bundles follow the same reachability as sparql_pushdown.BUNDLE_TRIPLES.
+The RDF export has no literal ids, so literals get a stable id derived
+from their value and datatype ("L#<hash>") and distinct literals are
+counted by value; statements repeating a literal value are one triple.
+The numbers therefore differ from REST bundles, which is why these
+bundles are cached under their own keys (cache_policy.sparql_cache_key)
+that only batched runs read.
+"""
+
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Iterable, List
+
+from sparql_pushdown import BUNDLE_TRIPLES, ORKG_PREDICATE_IRI, ORKG_RESOURCE_IRI
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUNDLE_BATCH = 50
+ORKG_CLASS_IRI = "http://orkg.org/orkg/class/"
+
+# Node class of an IRI, by ORKG namespace (anything else is a resource)
+_IRI_CLASSES = ((ORKG_PREDICATE_IRI, "predicate"), (ORKG_CLASS_IRI, "class"))
+
+
+def bundles_query(paper_ids: Iterable[str]) -> str:
+    """The bundle statements of each paper in a batch, as ?paper ?s ?p ?o rows."""
+    values = " ".join(f"<{ORKG_RESOURCE_IRI}{paper_id}>" for paper_id in paper_ids)
+    return f"""# orkg-statistics batch: bundles
+SELECT DISTINCT ?paper ?s ?p ?o WHERE {{
+  VALUES ?paper {{ {values} }}
+  {BUNDLE_TRIPLES}
+}}"""
+
+
+def literal_id(value: str, datatype: str = "") -> str:
+    return "L#" + hashlib.sha1(f"{datatype}\x00{value}".encode("utf-8")).hexdigest()[:16]
+
+
+def node(term: Dict[str, Any]) -> Dict[str, Any]:
+    """A bundle node ({"id", "_class", ...}) for a SPARQL JSON result term."""
+    value = term["value"]
+    if term["type"] == "uri":
+        klass = next((klass for prefix, klass in _IRI_CLASSES if value.startswith(prefix)), "resource")
+        return {"id": value.rsplit("/", 1)[-1], "_class": klass}
+    return {
+        "id": literal_id(value, term.get("datatype", "")),
+        "label": value,
+        "datatype": term.get("datatype", ""),
+        "_class": "literal",
+    }
+
+
+def split_bundles(bindings: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group ?paper ?s ?p ?o rows into per-paper statement lists (in row order)."""
+    bundles: Dict[str, List[Dict[str, Any]]] = {}
+    for binding in bindings:
+        paper_id = binding["paper"]["value"].rsplit("/", 1)[-1]
+        bundles.setdefault(paper_id, []).append({
+            "subject": node(binding["s"]),
+            "predicate": {"id": binding["p"]["value"].rsplit("/", 1)[-1], "_class": "predicate"},
+            "object": node(binding["o"]),
+        })
+    return bundles
+
+
+def fetch_bundles(request: Callable[[str], Any], paper_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Fetch the bundles of one batch of papers in a single query.
+
+    Args:
+        request: Sends a SPARQL query and returns the response
+        paper_ids: The batch
+
+    Returns:
+        Statements per paper; papers without statements are missing
+    """
+    response = request(bundles_query(paper_ids))
+    return split_bundles(response.json().get("results", {}).get("bindings", []))
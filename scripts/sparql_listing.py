@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Paged SPARQL paper listing for the ORKG statistics scripts.
+
+A template's sparql_query selects papers joined with their contributions,
+so a paper with several matching contributions comes back once per
+contribution. The listing wraps that query as a subquery and pages through
+SELECT DISTINCT ?paper results ordered by IRI, using keyset pagination (each
+page starts after the last IRI of the previous one) instead of OFFSET, so
+the server never re-sorts skipped rows. Every page is small, parsed on its
+own and, on a refresh, requested conditionally with the validators stored
+for the same cursor: an unchanged page is answered with 304 and reused.
+
+iter_listing_pages yields pages one at a time; paper ids are deduplicated
+in listing order. The statistics script still reads the whole listing
+before fetching any bundle, because deletions and cache eviction need the
+complete listing (a partial one would count papers as deleted).
+
+Paging changes the listing order, and with it the row order of the
+results CSV: paged listings are ordered by paper IRI, compared as strings
+(so R10 sorts before R9), while --listing_page_size 0 keeps the order the
+server returns the template's query in.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from conditional_http import conditional_headers, is_not_modified, response_validators
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 500
+
+_PROLOGUE_LINE = re.compile(r"^\s*(PREFIX|BASE)\b[^\n]*\n?", re.IGNORECASE | re.MULTILINE)
+
+
+def split_prologue(query: str) -> Tuple[str, str]:
+    """Split a query into its PREFIX/BASE declarations and the rest."""
+    prologue = "".join(match.group(0) for match in _PROLOGUE_LINE.finditer(query))
+    return prologue, _PROLOGUE_LINE.sub("", query).strip()
+
+
+def sparql_string(value: str) -> str:
+    """value as a SPARQL string literal."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def paged_query(query: str, page_size: int, after: Optional[str] = None) -> str:
+    """The distinct papers of query, one page after the IRI after (page_size 0: all at once)."""
+    prologue, select = split_prologue(query)
+    keyset = f"\n  FILTER(STR(?paper) > {sparql_string(after)})" if after else ""
+    paging = f"\nORDER BY STR(?paper)\nLIMIT {page_size}" if page_size else ""
+    return f"{prologue}SELECT DISTINCT ?paper WHERE {{\n  {{ {select} }}{keyset}\n}}{paging}"
+
+
+def paper_iris(data: Dict[str, Any]) -> List[str]:
+    bindings = data.get("results", {}).get("bindings", [])
+    return [b["paper"]["value"] for b in bindings if "paper" in b]
+
+
+def iter_listing_pages(
+    request: Callable[[str, Dict[str, str]], Any],
+    query: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    stored_pages: Optional[List[Dict[str, Any]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the pages of a template's paper listing.
+
+    Args:
+        request: Sends a SPARQL query with extra request headers and returns
+                 the response
+        query: The template's sparql_query
+        page_size: Papers per page (0 requests the listing in one page)
+        stored_pages: Pages of the previous listing, to request conditionally
+
+    Yields:
+        {"after": cursor IRI, "validators": {...}, "papers": [ids],
+         "iris": [paper IRIs], "not_modified": bool} per page
+
+    Raises:
+        ValueError: A page was not a JSON SPARQL result
+    """
+    previous = {page.get("after", ""): page for page in stored_pages or ()}
+    seen = set()
+    after = ""
+    while True:
+        stored = previous.get(after)
+        validators = stored["validators"] if stored else None
+        resp = request(paged_query(query, page_size, after), conditional_headers(validators))
+
+        if is_not_modified(resp, validators):
+            iris, validators, not_modified = stored["iris"], stored["validators"], True
+        else:
+            content_type = resp.headers.get("content-type", "").lower()
+            if "json" not in content_type or not resp.text.strip():
+                log.debug(f"Response text (first 500 chars): {resp.text[:500]}")
+                raise ValueError(f"Expected a JSON SPARQL result, got {content_type or 'an empty response'}")
+            try:
+                iris = paper_iris(resp.json())
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Failed to parse JSON response: {e}") from e
+            validators, not_modified = response_validators(resp), False
+
+        papers = []
+        for iri in iris:
+            if iri not in seen:
+                seen.add(iri)
+                papers.append(iri.split("/")[-1])
+        yield {"after": after, "validators": validators, "papers": papers, "iris": iris, "not_modified": not_modified}
+
+        if not page_size or len(iris) < page_size:
+            return
+        after = iris[-1]
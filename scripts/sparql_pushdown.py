@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Aggregate pushdown engine for the ORKG statistics scripts.
+
+Instead of downloading every paper's statements bundle and walking it in
+analyze_paper, the counts are expressed as SPARQL aggregate queries and
+evaluated by the triplestore, so a refresh moves kilobytes instead of
+megabytes:
+- template_stats: the global totals and distinct counts of a template in
+  two queries
+- paper_counts: per-paper totals for batches of papers (VALUES blocks)
+
+A paper's bundle is approximated in SPARQL as every ORKG statement
+reachable from the paper (following any predicate but rdf:type).
+Subjects and objects are classified like analyze_paper classifies bundle
+nodes: only ORKG resources (IRIs in the resource namespace) count as
+resources; classes, predicates and literals all count as literals.
+Distinct literals are counted by value, since the RDF export does not
+carry literal ids, and duplicate statements (same subject, predicate and
+object, e.g. two literals with the same value) are a single triple, so
+such papers count fewer statements than their bundles. compare_counts
+checks the result against the bundle engine on a sample of papers; a
+pushdown run stops when any sampled paper differs.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List
+
+from sparql_listing import split_prologue
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+# Papers cross-checked against their bundles: a 20% mismatch rate goes
+# unnoticed with probability 0.8 ** 30, about 0.1%
+DEFAULT_CHECK_SAMPLE = 30
+ORKG_PREDICATE_IRI = "http://orkg.org/orkg/predicate/"
+ORKG_RESOURCE_IRI = "http://orkg.org/orkg/resource/"
+
+# Per-paper counts compared by the cross-check (distinct counts are template-wide)
+COUNT_FIELDS = ("total_statements", "resource_count", "literal_count", "predicate_count")
+
+# The statements of ?paper's bundle, bound to ?s ?p ?o
+BUNDLE_TRIPLES = f"""?paper (!<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>)* ?s .
+      ?s ?p ?o .
+      FILTER(STRSTARTS(STR(?p), "{ORKG_PREDICATE_IRI}"))"""
+
+
+def is_resource(var: str) -> str:
+    """SPARQL condition: the node bound to var counts as a resource."""
+    return f'(isIRI({var}) && STRSTARTS(STR({var}), "{ORKG_RESOURCE_IRI}"))'
+
+
+# Resource nodes among a statement's subject and object (0, 1 or 2)
+RESOURCE_NODES = f"IF({is_resource('?s')}, 1, 0) + IF({is_resource('?o')}, 1, 0)"
+
+# Binds ?node to the subject and, in a second solution, the object of ?s ?p ?o
+STATEMENT_NODES = """VALUES ?side { "subject" "object" }
+      BIND(IF(?side = "subject", ?s, ?o) AS ?node)"""
+
+
+def _papers_of(query: str) -> str:
+    """Group pattern binding ?paper to each distinct paper of a template query."""
+    _, select = split_prologue(query)
+    return f"{{ SELECT DISTINCT ?paper WHERE {{ {{ {select} }} }} }}"
+
+
+def template_totals_query(query: str) -> str:
+    """Statement and resource-node totals over all papers of a template (a
+    statement shared by two papers counts twice, as when summing per-paper rows)."""
+    prologue, _ = split_prologue(query)
+    return f"""# orkg-statistics pushdown: template totals
+{prologue}SELECT (COUNT(*) AS ?total) (SUM({RESOURCE_NODES}) AS ?resources) WHERE {{
+  {{ SELECT DISTINCT ?paper ?s ?p ?o WHERE {{
+      {_papers_of(query)}
+      {BUNDLE_TRIPLES}
+  }} }}
+}}"""
+
+
+def template_distinct_query(query: str) -> str:
+    """Distinct resources, literals and predicates over all papers of a template."""
+    prologue, _ = split_prologue(query)
+    statements = f"{{ SELECT DISTINCT ?s ?p ?o WHERE {{ {_papers_of(query)} {BUNDLE_TRIPLES} }} }}"
+    return f"""# orkg-statistics pushdown: template distinct
+{prologue}SELECT (COUNT(DISTINCT ?resource) AS ?resources) (COUNT(DISTINCT ?literal) AS ?literals)
+       (COUNT(DISTINCT ?p) AS ?predicates) WHERE {{
+  {{ {statements}
+      {STATEMENT_NODES}
+      FILTER({is_resource('?node')}) BIND(?node AS ?resource) }}
+  UNION {{ {statements}
+      {STATEMENT_NODES}
+      FILTER(!{is_resource('?node')}) BIND(?node AS ?literal) }}
+}}"""
+
+
+def paper_counts_query(paper_ids: Iterable[str]) -> str:
+    """Statement and resource-node counts of each paper in a batch."""
+    values = " ".join(f"<{ORKG_RESOURCE_IRI}{paper_id}>" for paper_id in paper_ids)
+    return f"""# orkg-statistics pushdown: paper counts
+SELECT ?paper (COUNT(*) AS ?total) (SUM({RESOURCE_NODES}) AS ?resources) WHERE {{
+  {{ SELECT DISTINCT ?paper ?s ?p ?o WHERE {{
+      VALUES ?paper {{ {values} }}
+      {BUNDLE_TRIPLES}
+  }} }}
+}}
+GROUP BY ?paper"""
+
+
+def _number(binding: Dict[str, Any], name: str) -> int:
+    return int(float(binding[name]["value"])) if name in binding else 0
+
+
+def _bindings(response) -> List[Dict[str, Any]]:
+    return response.json().get("results", {}).get("bindings", [])
+
+
+def counts_of(total: int, resources: int) -> Dict[str, int]:
+    """Row counts from statement and resource-node totals: every statement
+    has two nodes, and each node is either a resource or a literal."""
+    return {
+        "total_statements": total,
+        "resource_count": resources,
+        "literal_count": 2 * total - resources,
+        "predicate_count": total,
+    }
+
+
+def template_stats(request: Callable[[str], Any], query: str) -> Dict[str, int]:
+    """Global statistics of a template, shaped like GlobalStatsAccumulator.global_stats().
+
+    Args:
+        request: Sends a SPARQL query and returns the response
+        query: The template's sparql_query
+    """
+    totals = (_bindings(request(template_totals_query(query))) or [{}])[0]
+    distinct = (_bindings(request(template_distinct_query(query))) or [{}])[0]
+    counts = counts_of(_number(totals, "total"), _number(totals, "resources"))
+    return {
+        "total_statements": counts["total_statements"],
+        "total_resources": counts["resource_count"],
+        "total_literals": counts["literal_count"],
+        "total_predicates": counts["predicate_count"],
+        "global_distinct_resources": _number(distinct, "resources"),
+        "global_distinct_literals": _number(distinct, "literals"),
+        "global_distinct_predicates": _number(distinct, "predicates"),
+    }
+
+
+def paper_counts(
+    request: Callable[[str], Any],
+    paper_ids: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Dict[str, int]]:
+    """Per-paper counts (the COUNT_FIELDS of a results row), one query per batch.
+
+    Papers without statements are reported with zero counts.
+    """
+    paper_ids = list(paper_ids)
+    counts = {}
+    for start in range(0, len(paper_ids), max(1, batch_size)):
+        batch = paper_ids[start:start + max(1, batch_size)]
+        found = {}
+        for binding in _bindings(request(paper_counts_query(batch))):
+            paper_id = binding["paper"]["value"].split("/")[-1]
+            found[paper_id] = counts_of(_number(binding, "total"), _number(binding, "resources"))
+        for paper_id in batch:
+            counts[paper_id] = found.get(paper_id, counts_of(0, 0))
+    return counts
+
+
+def compare_counts(pushdown: Dict[str, int], row: Dict[str, Any]) -> Dict[str, tuple]:
+    """Fields where pushdown counts differ from a bundle-engine row, as
+    {field: (pushdown, bundle)}."""
+    return {
+        field: (pushdown[field], row[field])
+        for field in COUNT_FIELDS
+        if pushdown[field] != row[field]
+    }
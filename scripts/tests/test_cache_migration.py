@@ -0,0 +1,76 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from bundle_cache import CACHE_SCHEMA_VERSION, open_cache
+from cache_migration import check_schema, migrate_cache, recover_legacy_keys
+from cache_policy import paper_cache_key
+
+
+def statement(subject, obj="L1"):
+    return {"subject": {"id": subject}, "predicate": {"id": "P31"}, "object": {"id": obj}}
+
+
+def legacy_entry(paper_id, fetched_at="2024-01-01T00:00:00+00:00"):
+    return {"fetched_at": fetched_at, "statements": {"statements": [statement(paper_id)]}}
+
+
+def put(cache, key, entry):
+    cache.put(key, entry)
+    if hasattr(cache, "path_for"):
+        # The JSON backend dates entries by file mtime
+        mtime = datetime.fromisoformat(entry["fetched_at"]).timestamp()
+        os.utime(cache.path_for(key), (mtime, mtime))
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def cache(request, tmp_path):
+    cache = open_cache(request.param, str(tmp_path / "orkg-cache"))
+    yield cache
+    cache.close()
+
+
+def test_moves_and_reshapes_legacy_entries(cache):
+    cache.put("R1", legacy_entry("R1"))
+    cache.put("R2", legacy_entry("R2"))
+    assert not check_schema(cache)
+
+    # No paper ids: SQLite lists its keys, the JSON cache recovers them on disk
+    stats = migrate_cache(cache)
+
+    assert stats == {"moved": 2, "duplicates": 0, "reshaped": 2}
+    assert cache.get("R1") is None
+    assert cache.get(paper_cache_key("R1"))["statements"] == [statement("R1")]
+    assert check_schema(cache)
+    assert cache.schema_version() == CACHE_SCHEMA_VERSION
+
+
+def test_newer_entry_wins_between_legacy_and_current_key(cache):
+    current = {"fetched_at": "2024-06-01T00:00:00+00:00", "statements": [statement("R1", "L2")]}
+    put(cache, "R1", legacy_entry("R1"))
+    put(cache, paper_cache_key("R1"), current)
+    put(cache, "R2", legacy_entry("R2", fetched_at="2024-09-01T00:00:00+00:00"))
+    put(cache, paper_cache_key("R2"), current)
+
+    stats = migrate_cache(cache, ["R1", "R2"])
+
+    assert stats["duplicates"] == 1 and stats["moved"] == 1
+    assert cache.get("R1") is None and cache.get("R2") is None
+    assert cache.get(paper_cache_key("R1"))["statements"] == current["statements"]
+    assert cache.get(paper_cache_key("R2"))["statements"] == [statement("R2")]
+
+
+def test_recover_legacy_keys_skips_current_and_empty_entries(tmp_path):
+    cache = open_cache("json", str(tmp_path / "orkg-cache"))
+    cache.put("R1", legacy_entry("R1"))
+    cache.put(paper_cache_key("R2"), {"fetched_at": None, "statements": [statement("R2")]})
+    cache.put("R3", {"fetched_at": None, "statements": {"statements": []}})
+
+    assert recover_legacy_keys(cache) == {"R1"}
+
+
+def test_check_schema_stamps_an_empty_cache(cache):
+    assert check_schema(cache)
+    assert cache.schema_version() == CACHE_SCHEMA_VERSION
+    assert migrate_cache(cache) == {"moved": 0, "duplicates": 0, "reshaped": 0}
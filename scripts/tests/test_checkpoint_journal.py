@@ -0,0 +1,87 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from checkpoint_journal import CheckpointJournal, journal_path_for, run_header
+
+QUERY = "SELECT ?paper WHERE { ?paper a <Paper> }"
+
+
+def header(**kwargs):
+    return run_header("empire", QUERY, "full", **kwargs)
+
+
+def interrupted_run(path, rows, **kwargs):
+    journal = CheckpointJournal(str(path), header(**kwargs), checkpoint_every=1)
+    for row in rows:
+        journal.append(row)
+    journal.close()
+
+
+def test_journal_path_for():
+    assert journal_path_for("scripts/daily_results_incremental.csv") == "scripts/daily_results_incremental.journal.jsonl"
+
+
+def test_resume_replays_completed_rows(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    interrupted_run(path, [{"paper_id": "R1", "total_statements": 3}, {"paper_id": "R2", "total_statements": 5}])
+
+    journal = CheckpointJournal(str(path), header(), resume=True)
+    assert journal.rows == {
+        "R1": {"paper_id": "R1", "total_statements": 3},
+        "R2": {"paper_id": "R2", "total_statements": 5},
+    }
+    journal.append({"paper_id": "R3", "total_statements": 1})
+    journal.close()
+    assert set(CheckpointJournal(str(path), header(), resume=True).rows) == {"R1", "R2", "R3"}
+
+
+def test_without_resume_the_journal_starts_empty(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    interrupted_run(path, [{"paper_id": "R1"}])
+    assert CheckpointJournal(str(path), header()).rows == {}
+    assert CheckpointJournal(str(path), header(), resume=True).rows == {}
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    interrupted_run(path, [{"paper_id": "R1"}, {"paper_id": "R2"}])
+    with open(path, "a") as f:
+        f.write('{"paper_id": "R3", "tot')
+
+    journal = CheckpointJournal(str(path), header(), resume=True)
+    assert set(journal.rows) == {"R1", "R2"}
+    journal.append({"paper_id": "R3"})
+    journal.close()
+    # The rewritten journal has no torn line for new rows to follow
+    assert set(CheckpointJournal(str(path), header(), resume=True).rows) == {"R1", "R2", "R3"}
+
+
+def test_journal_of_another_source_or_interning_is_not_replayed(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    interrupted_run(path, [{"paper_id": "R1"}], source="sparql")
+    assert CheckpointJournal(str(path), header(), resume=True).rows == {}
+
+    interrupted_run(path, [{"paper_id": "R1"}])
+    assert CheckpointJournal(str(path), header(intern_ids=True), resume=True).rows == {}
+    assert CheckpointJournal(str(path), run_header("empire", QUERY, "incremental"), resume=True).rows == {}
+
+
+def test_stale_journal_is_not_replayed(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    interrupted_run(path, [{"paper_id": "R1"}])
+    lines = path.read_text().splitlines()
+    stored = json.loads(lines[0])
+    stored["created_at"] = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+    path.write_text("\n".join([json.dumps(stored)] + lines[1:]) + "\n")
+
+    assert CheckpointJournal(str(path), header(), resume=True, max_age=None).rows == {"R1": {"paper_id": "R1"}}
+    assert CheckpointJournal(str(path), header(), resume=True, max_age=timedelta(hours=24)).rows == {}
+
+
+def test_resumed_journal_keeps_its_start_time(tmp_path):
+    path = tmp_path / "run.journal.jsonl"
+    interrupted_run(path, [{"paper_id": "R1"}])
+    created_at = json.loads(path.read_text().splitlines()[0])["created_at"]
+
+    CheckpointJournal(str(path), header(), resume=True).close()
+    assert json.loads(path.read_text().splitlines()[0])["created_at"] == created_at
@@ -0,0 +1,37 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from id_interning import DistinctIds, IdInterner, per_paper_distinct  # noqa: E402
+
+IDS = ["R589002", "L1208748", "P31", "C27001", "R0", "SAME_AS", "R007", "X12", "R", "L999999999999", "P31"]
+
+
+def test_encode_round_trips_conforming_and_fallback_ids():
+    interner = IdInterner()
+    codes = interner.encode(IDS)
+    assert [interner.decode(code) for code in codes] == IDS
+    assert [interner.code(item) for item in IDS] == codes.tolist()
+
+
+def test_equal_ids_get_equal_codes_across_batches():
+    interner = IdInterner()
+    first = interner.encode(["SAME_AS", "R1"])
+    second = interner.encode(["R1", "SAME_AS"])
+    assert first.tolist() == second.tolist()[::-1]
+
+
+def test_distinct_ids_counts_like_a_set():
+    distinct, reference = DistinctIds(), set()
+    for batch in (IDS, IDS[::-1], ["R589002", "R589003"]):
+        distinct.update(batch)
+        reference.update(batch)
+    assert len(distinct) == len(reference)
+
+
+def test_per_paper_distinct():
+    interner = IdInterner()
+    papers = [["R1", "R1", "R2"], [], ["R2", "SAME_AS", "SAME_AS"]]
+    offsets = np.cumsum([0] + [len(ids) for ids in papers])
+    codes = interner.encode([item for ids in papers for item in ids])
+    assert per_paper_distinct(codes, offsets).tolist() == [2, 0, 2]
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from results_format import StreamingCsvWriter, save_csv_results
+
+pd = pytest.importorskip("pandas")
+
+ROWS = [
+    {
+        "paper_id": "R589002",
+        "paper_title": 'Requirements, "quoted" and\nmulti-line',
+        "total_statements": 12,
+        "resource_count": 5,
+        "literal_count": 4,
+        "predicate_count": 3,
+        "resource_ids": ["R1", "R2"],
+        "literal_ids": ["L1"],
+        "predicate_ids": ["P31", "SAME_AS"],
+    },
+    {
+        "paper_id": "R7",
+        "paper_title": "Ünïcode – title",
+        "total_statements": 0,
+        "resource_count": 0,
+        "literal_count": 0,
+        "predicate_count": 0,
+        "resource_ids": [],
+        "literal_ids": [],
+        "predicate_ids": [],
+    },
+]
+TIMESTAMP = "2024-01-01 06:00:00 UTC"
+
+
+def global_stats(distinct):
+    return {
+        "total_statements": 12,
+        "total_resources": 5,
+        "total_literals": 4,
+        "total_predicates": 3,
+        "global_distinct_resources": distinct,
+        "global_distinct_literals": distinct,
+        "global_distinct_predicates": 3,
+    }
+
+
+def pandas_csv(path, results, stats, timestamp):
+    """The DataFrame.to_csv writer save_results used before results_format."""
+    df = pd.DataFrame(results)
+    for column in ("resource_ids", "literal_ids", "predicate_ids"):
+        df[column] = df[column].map(json.dumps)
+    df["global_total_statements"] = stats["total_statements"]
+    df["global_total_resources"] = stats["total_resources"]
+    df["global_total_literals"] = stats["total_literals"]
+    df["global_total_predicates"] = stats["total_predicates"]
+    df["global_distinct_resources"] = stats["global_distinct_resources"]
+    df["global_distinct_literals"] = stats["global_distinct_literals"]
+    df["global_distinct_predicates"] = stats["global_distinct_predicates"]
+    for name, total, distinct in (
+        ("resource_reuse_ratio", "total_resources", "global_distinct_resources"),
+        ("literal_reuse_ratio", "total_literals", "global_distinct_literals"),
+        ("predicate_reuse_ratio", "total_predicates", "global_distinct_predicates"),
+    ):
+        df[name] = stats[total] / stats[distinct] if stats[distinct] > 0 else 0
+    df["timestamp"] = timestamp
+    df.to_csv(path, index=False)
+
+
+@pytest.mark.parametrize("distinct", [3, 0])
+def test_save_csv_results_matches_pandas(tmp_path, distinct):
+    stats = global_stats(distinct)
+    pandas_csv(tmp_path / "pandas.csv", ROWS, stats, TIMESTAMP)
+    save_csv_results(str(tmp_path / "stdlib.csv"), ROWS, stats, TIMESTAMP)
+    assert (tmp_path / "stdlib.csv").read_bytes() == (tmp_path / "pandas.csv").read_bytes()
+
+
+def test_streaming_writer_matches_pandas(tmp_path):
+    stats = global_stats(3)
+    pandas_csv(tmp_path / "pandas.csv", ROWS, stats, TIMESTAMP)
+    writer = StreamingCsvWriter(str(tmp_path / "stream.csv"))
+    for row in ROWS:
+        writer.write_row(row)
+    writer.finalize(stats, TIMESTAMP)
+    assert (tmp_path / "stream.csv").read_bytes() == (tmp_path / "pandas.csv").read_bytes()
+    assert not (tmp_path / "stream.csv.partial").exists()
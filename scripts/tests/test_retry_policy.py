@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from retry_policy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HTTPStatusError,
+    RetryBudget,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+class FlakyCall:
+    """Fails with the given errors, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def policy(**kwargs):
+    delays = []
+    kwargs.setdefault("max_retries", 3)
+    kwargs.setdefault("max_delay", 5)
+    return RetryPolicy(sleep=delays.append, **kwargs), delays
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(" 1.5 ") == 1.5
+    assert parse_retry_after("-3") == 0.0
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=120)
+    seconds = parse_retry_after(format_datetime(when, usegmt=True))
+    assert 110 <= seconds <= 120
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+@pytest.mark.parametrize("value", [None, "", "soon"])
+def test_parse_retry_after_invalid(value):
+    assert parse_retry_after(value) is None
+
+
+def test_backoff_is_jittered_below_exponential_ceiling():
+    retry, _ = policy(max_delay=3, base_delay=0.5)
+    error = HTTPStatusError(503)
+    for attempt, ceiling in ((1, 0.5), (2, 1.0), (3, 2.0), (4, 3.0), (10, 3.0)):
+        for _ in range(50):
+            assert 0 <= retry.backoff_delay(attempt, error) <= ceiling
+
+
+def test_backoff_honours_capped_retry_after():
+    retry, _ = policy(max_retry_after=10)
+    assert retry.backoff_delay(1, HTTPStatusError(429, retry_after=4)) == 4
+    assert retry.backoff_delay(1, HTTPStatusError(429, retry_after=600)) == 10
+
+
+def test_retries_transient_errors_until_success():
+    retry, delays = policy()
+    fn = FlakyCall(HTTPStatusError(503), ConnectionError())
+    assert retry.call(fn) == "ok"
+    assert fn.calls == 3
+    assert len(delays) == 2
+
+
+def test_gives_up_after_max_retries():
+    retry, delays = policy(max_retries=2)
+    fn = FlakyCall(*[HTTPStatusError(502)] * 5)
+    with pytest.raises(HTTPStatusError):
+        retry.call(fn)
+    assert fn.calls == 3
+    assert len(delays) == 2
+
+
+def test_does_not_retry_definitive_errors():
+    retry, delays = policy()
+    fn = FlakyCall(HTTPStatusError(404))
+    with pytest.raises(HTTPStatusError):
+        retry.call(fn)
+    assert fn.calls == 1
+    assert delays == []
+
+
+def test_budget_is_shared_across_calls():
+    budget = RetryBudget(1)
+    retry, _ = policy(budget=budget)
+    assert retry.call(FlakyCall(HTTPStatusError(503))) == "ok"
+    fn = FlakyCall(HTTPStatusError(503))
+    with pytest.raises(HTTPStatusError):
+        retry.call(fn)
+    assert fn.calls == 1
+    assert budget.remaining == 0
+
+
+def test_circuit_opens_and_lets_one_trial_through(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("retry_policy.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("orkg", failure_threshold=2, reset_timeout=30)
+    retry, _ = policy(max_retries=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(HTTPStatusError):
+            retry.call(FlakyCall(HTTPStatusError(503)))
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        retry.call(FlakyCall())
+
+    now[0] += 31
+    breaker.before_call()  # the half-open trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert retry.call(FlakyCall()) == "ok"